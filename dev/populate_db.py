@@ -9,6 +9,8 @@ SCRIPT_DIR = Path(__file__).parent.absolute()
 ROOT_DIR = SCRIPT_DIR.parent
 DB_PATH = ROOT_DIR / "dev_data" / "notebooks.db"
 TEMPLATES_DIR = ROOT_DIR / "server" / "notebook_templates"
+# Matches the server's window so the change log stays bounded
+CHANGES_KEEP = int(os.getenv("WPRDF_CHANGES_KEEP", "10000"))
 
 def calculate_hash(text):
     return hashlib.sha256(text.encode('utf-8')).hexdigest()
@@ -36,6 +38,26 @@ def populate():
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS registry_meta (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        )
+    """)
+    cursor.execute("INSERT OR IGNORE INTO registry_meta (key, value) VALUES ('version', 0)")
+    # Change log read by the server's /api/notebooks/events feed
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS registry_changes (
+            version INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            hash TEXT NOT NULL
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS registry_changes_version ON registry_changes (version)")
+    cursor.execute("""
+        INSERT OR IGNORE INTO registry_meta (key, value)
+        SELECT 'changes_since', value FROM registry_meta WHERE key = 'version'
+    """)
     
     files = list(TEMPLATES_DIR.glob("*.py"))
     
@@ -43,14 +65,20 @@ def populate():
         print("⚠️ No .py files found in templates directory.")
         return
 
+    changes = []
     for notebook_file in files:
         # If it's the template, name it 'template', otherwise use stem
         name = 'template' if notebook_file.name == 'wprdf_template.py' else notebook_file.stem
         code = notebook_file.read_text()
         h = calculate_hash(code)
         
-        cursor.execute("SELECT 1 FROM notebooks WHERE name = ?", (name,))
-        if cursor.fetchone():
+        cursor.execute("SELECT hash FROM notebooks WHERE name = ?", (name,))
+        row = cursor.fetchone()
+        if row and row[0] == h:
+            print(f"✔️ {name} is up to date")
+            continue
+        changes.append((name, h))
+        if row:
             print(f"🔄 Updating {name}...")
             cursor.execute(
                 "UPDATE notebooks SET code = ?, hash = ?, updated_at = CURRENT_TIMESTAMP WHERE name = ?", 
@@ -62,7 +90,23 @@ def populate():
                 "INSERT INTO notebooks (name, hash, code) VALUES (?, ?, ?)", 
                 (name, h, code)
             )
-            
+    
+    # Bump the registry version in the same transaction so running servers drop
+    # their caches; an unchanged run leaves the version and change log alone
+    if changes:
+        cursor.execute("UPDATE registry_meta SET value = value + 1 WHERE key = 'version'")
+        cursor.executemany(
+            "INSERT INTO registry_changes (version, name, hash) "
+            "SELECT value, ?, ? FROM registry_meta WHERE key = 'version'",
+            changes
+        )
+        cursor.execute("SELECT value FROM registry_meta WHERE key = 'version'")
+        oldest = cursor.fetchone()[0] - CHANGES_KEEP
+        if oldest > 0:
+            cursor.execute("DELETE FROM registry_changes WHERE version <= ?", (oldest,))
+            cursor.execute(
+                "UPDATE registry_meta SET value = MAX(value, ?) WHERE key = 'changes_since'", (oldest,)
+            )
     conn.commit()
     conn.close()
     print(f"✅ Database populated with {len(files)} notebooks.")
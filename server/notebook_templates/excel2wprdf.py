@@ -8,16 +8,25 @@ async def __():
     # WPRDF: sys and mo are provided by the master infrastructure in wprdf.js
     # We only handle notebook-specific dependencies here defensively.
     import sys
-    micropip = sys.modules.get("micropip")
-    if micropip is None:
-        import micropip
+    if "pyodide" in sys.modules:
+        micropip = sys.modules.get("micropip")
+        if micropip is None:
+            import micropip
             
-    _pkgs = ["pandas", "openpyxl"]
-    await micropip.install(_pkgs)
+        # Only install what is not already loaded (warm starts skip micropip entirely)
+        _pkgs = []
+        for _name in ["pandas", "openpyxl", "pyarrow"]:
+            if _name not in sys.modules:
+                try:
+                    __import__(_name)
+                except ImportError:
+                    _pkgs.append(_name)
+        if _pkgs:
+            await micropip.install(_pkgs)
     return
 
 @app.cell(hide_code=True)
-def __(sys):
+def __(sys, wprdf_import):
     # 2. Core Logic: Imports & WPRDF Functions
     # WPRDF: Defensive imports - check sys.modules first to avoid redundant loading in WASM.
     pd = sys.modules.get("pandas") or __import__("pandas")
@@ -32,11 +41,36 @@ def __(sys):
     else:
         from datetime import datetime
     
+    uuid = sys.modules.get("uuid") or __import__("uuid")
+    
+    json = sys.modules.get("json") or __import__("json")
+    
+    time = sys.modules.get("time") or __import__("time")
+    
+    np = sys.modules.get("numpy") or __import__("numpy")
+    
+    pa = sys.modules.get("pyarrow") or __import__("pyarrow")
+    
+    pc = sys.modules.get("pyarrow.compute")
+    if pc is None: import pyarrow.compute as pc
+    
+    pq = sys.modules.get("pyarrow.parquet")
+    if pq is None: import pyarrow.parquet as pq
+    
     WPRDF_COLUMNS = [
         'subject', 'predicate', 'object_type', 'object', 'literal_value',
         'technical_timestamp', 'business_validity_from',
         'business_validity_to', 'author', 'app'
     ]
+    
+    # Compact layout: provenance shared by one conversion call is stored once in
+    # the run table (df.attrs["wprdf_runs"], kept in the Parquet metadata) and
+    # every triple only references it through run_id.
+    WPRDF_RUN_COLUMNS = ['technical_timestamp', 'business_validity_from', 'author', 'app']
+    WPRDF_COMPACT_COLUMNS = [
+        'subject', 'predicate', 'object_type', 'object', 'literal_value',
+        'business_validity_to', 'run_id'
+    ]
 
     def create_wprdf_row(subject, predicate, obj, author="http://browser.app/user#default", app="http://browser.app/app#default", business_from=None):
         obj_type = type(obj).__name__
@@ -50,6 +84,134 @@ def __(sys):
             'author': author, 'app': app
         }
 
+    def create_wprdf_run(author="http://browser.app/user#default", app="http://browser.app/app#default", business_from=None):
+        """One ingestion run: a single id and timestamp for a whole conversion call"""
+        now = datetime.now().isoformat()
+        return {
+            'run_id': f"urn:wprdf:run:{uuid.uuid4().hex}",
+            'technical_timestamp': now, 'business_validity_from': (business_from or now),
+            'author': author, 'app': app
+        }
+
+    def create_wprdf_triple(subject, predicate, obj, run_id):
+        obj_type = type(obj).__name__
+        literal_value = str(obj)
+        val = base64.b64encode(str(obj).encode('utf-8')).decode('utf-8') if not isinstance(obj, bytes) else base64.b64encode(obj).decode('utf-8')
+        return {
+            'subject': str(subject), 'predicate': str(predicate), 'object_type': obj_type,
+            'object': val, 'literal_value': literal_value, 'business_validity_to': None,
+            'run_id': run_id
+        }
+
+    def create_wprdf_compact_dataframe(rows, run):
+        df = pd.DataFrame(rows, columns=WPRDF_COMPACT_COLUMNS)
+        df.attrs['wprdf_runs'] = {run['run_id']: {k: run[k] for k in WPRDF_RUN_COLUMNS}}
+        return df
+
+    # The wide-schema expansion (runs and nodes) is shared by every consumer
+    expand_wprdf = wprdf_import("merge_wprdf", "expand_wprdf")
+    expand_wprdf_nodes = wprdf_import("merge_wprdf", "expand_wprdf_nodes")
+
+    # The typed literal layout (value_* columns) is shared with merge_wprdf
+    WPRDF_LITERAL_COLUMNS = wprdf_import("merge_wprdf", "WPRDF_LITERAL_COLUMNS")
+    WPRDF_LITERAL_TYPES = wprdf_import("merge_wprdf", "WPRDF_LITERAL_TYPES")
+    encode_typed_literals = wprdf_import("merge_wprdf", "encode_typed_literals")
+    decode_typed_literals = wprdf_import("merge_wprdf", "decode_typed_literals")
+
+    def _triple_keys(df):
+        """Triple columns with numbers in one form: an integral float (40.0 from a
+        column that had NaNs) keys like the int it was, so dtype drift is no change"""
+        typed = 'value_string' in df.columns
+        keys = df[['subject', 'predicate', 'object_type'] + (list(WPRDF_LITERAL_COLUMNS) if typed else ['object'])].copy()
+        target = keys['object_type'].map(WPRDF_LITERAL_TYPES)
+        numeric = target.isin(['value_int', 'value_float']).to_numpy()
+        if not numeric.any():
+            return keys
+        if typed:
+            number = df['value_float'].astype('Float64')
+        else:
+            number = pd.to_numeric(df['literal_value'].where(numeric), errors='coerce').astype('Float64')
+        # Below 2**53 every integral float is exactly its int
+        integral = ((target == 'value_float') & (number.round() == number) & (number.abs() < 2**53)).fillna(False).to_numpy(dtype=bool)
+        keys['object_type'] = keys['object_type'].astype(object)
+        keys.loc[numeric, 'object_type'] = np.where(integral[numeric] | (target[numeric] == 'value_int'), 'int', 'float')
+        if typed:
+            keys['value_int'] = keys['value_int'].mask(integral, number.where(integral).astype('Int64'))
+            keys['value_float'] = keys['value_float'].mask(integral)
+        else:
+            # The key only has to be consistent on both sides: the plain number text
+            keys['object'] = keys['object'].astype(object)
+            keys.loc[numeric, 'object'] = df['literal_value'][numeric].astype(object)
+            keys.loc[integral, 'object'] = number[integral].astype('Int64').astype(str).astype(object)
+        return keys
+
+    def wprdf_triple_hashes(df):
+        """Content hash of every triple, ignoring provenance and validity"""
+        return pd.util.hash_pandas_object(_triple_keys(df), index=False)
+
+    def wprdf_subject_hashes(df, triple_hashes=None):
+        """Order-independent content hash per subject (wrapping sum of its triple hashes)"""
+        triple_hashes = wprdf_triple_hashes(df) if triple_hashes is None else triple_hashes
+        return triple_hashes.groupby(df['subject'].to_numpy()).sum()
+
+    def _compact_wprdf_runs(df):
+        """Compact layout of a wide frame: one run per distinct provenance"""
+        codes = df.groupby(WPRDF_RUN_COLUMNS, dropna=False, sort=False).ngroup().to_numpy()
+        _, first_rows = np.unique(codes, return_index=True)
+        run_ids = np.array([f"urn:wprdf:run:{uuid.uuid4().hex}" for _ in first_rows], dtype=object)
+        compact = df.drop(columns=WPRDF_RUN_COLUMNS)
+        compact['run_id'] = run_ids[codes]
+        compact.attrs = {'wprdf_runs': {
+            run_id: df[WPRDF_RUN_COLUMNS].iloc[row].to_dict() for run_id, row in zip(run_ids, first_rows)
+        }}
+        return compact
+
+    def diff_wprdf(previous, current, retracted_at=None):
+        """Change-data-capture delta between the previous snapshot of a source and a new conversion.
+
+        Subjects whose content hash is unchanged are skipped entirely. For the
+        others only inserted triples are emitted, plus one retraction row per
+        removed triple: the previous row with business_validity_to closed.
+        The delta has the layout of current; previous is converted to it.
+        """
+        if 'value_string' in current.columns and 'value_string' not in previous.columns:
+            previous = encode_typed_literals(previous)
+        elif 'value_string' in previous.columns and 'value_string' not in current.columns:
+            previous = decode_typed_literals(previous)
+        if 'run_id' in current.columns and 'run_id' not in previous.columns:
+            previous = _compact_wprdf_runs(previous)
+        elif 'run_id' in previous.columns and 'run_id' not in current.columns:
+            previous = expand_wprdf(previous)
+        if retracted_at is None:
+            runs = current.attrs.get('wprdf_runs', {})
+            if runs:
+                retracted_at = next(iter(runs.values()))['business_validity_from']
+            elif 'business_validity_from' in current.columns and not current.empty:
+                retracted_at = current['business_validity_from'].iloc[0]
+            else:
+                retracted_at = datetime.now().isoformat()
+        
+        previous = previous[previous['business_validity_to'].isna()]
+        previous_hashes = wprdf_triple_hashes(previous)
+        current_hashes = wprdf_triple_hashes(current)
+        previous_subjects = wprdf_subject_hashes(previous, previous_hashes)
+        current_subjects = wprdf_subject_hashes(current, current_hashes)
+        
+        unchanged = current_subjects.index[
+            current_subjects.to_numpy() == previous_subjects.reindex(current_subjects.index, fill_value=0).to_numpy()
+        ]
+        previous_changed = ~previous['subject'].isin(unchanged)
+        current_changed = ~current['subject'].isin(unchanged)
+        
+        inserted = current[current_changed & ~current_hashes.isin(previous_hashes[previous_changed])]
+        retracted = previous[previous_changed & ~previous_hashes.isin(current_hashes[current_changed])].copy()
+        retracted['business_validity_to'] = retracted_at
+        
+        delta = pd.concat([inserted, retracted], ignore_index=True)
+        if 'run_id' in delta.columns:
+            delta.attrs = {'wprdf_runs': {**previous.attrs.get('wprdf_runs', {}), **current.attrs.get('wprdf_runs', {})}}
+        return delta
+
     def excel2wprdf(excel_bytes, author_uri, app_uri, config=None):
         try:
             df = pd.read_excel(BytesIO(excel_bytes), engine='openpyxl')
@@ -73,24 +235,361 @@ def __(sys):
         subject_col = config.get("subject_col")
         subject_prefix = config.get("subject_prefix", "urn:row:")
         predicate_prefix = config.get("predicate_prefix", "urn:column:")
+        run = create_wprdf_run(author_uri, app_uri, config.get("business_from"))
         rows = []
-        for idx, row in df.iterrows():
-            row_subject = f"{subject_prefix}{row[subject_col]}" if subject_col and subject_col in df.columns else f"{subject_prefix}{idx}"
+        # Subject ids come from their own column: iterrows() turns an all-numeric
+        # row into floats, and urn:row:1.0 would not match urn:row:1 in the next diff
+        subject_ids = df[subject_col].tolist() if subject_col and subject_col in df.columns else df.index
+        for subject_id, (_, row) in zip(subject_ids, df.iterrows()):
+            row_subject = f"{subject_prefix}{subject_id}"
             for col in df.columns:
                 if col == subject_col or pd.isna(row[col]): continue
-                rows.append(create_wprdf_row(row_subject, f"{predicate_prefix}{col}", row[col], author_uri, app_uri))
-        return pd.DataFrame(rows, columns=WPRDF_COLUMNS)
+                rows.append(create_wprdf_triple(row_subject, f"{predicate_prefix}{col}", row[col], run['run_id']))
+        compact_df = create_wprdf_compact_dataframe(rows, run)
+        if config.get("typed"):
+            compact_df = encode_typed_literals(compact_df)
+        result = compact_df if config.get("compact") else expand_wprdf(compact_df)
+        # Incremental mode: only emit the delta against the previous snapshot of this source
+        previous = config.get("previous")
+        return diff_wprdf(previous, result) if previous is not None else result
+
+    # Wide entity tables: the inverse of dr2wprdf. Subjects and predicates are
+    # factorized to integer codes once, rows are ordered by subject code, and
+    # the pivot runs on chunk_size subjects at a time with numpy/Arrow takes,
+    # so no string pivot_table and only one chunk of the wide result is in
+    # memory while it is written to Parquet.
+    WPRDF_WIDE_POLICIES = ('list', 'first', 'last')
+    WPRDF_WIDE_TYPES = {
+        'value_int': pa.int64(), 'value_float': pa.float64(), 'value_bool': pa.bool_(),
+        'value_timestamp': pa.timestamp('ns'), 'value_string': pa.string(), 'value_binary': pa.binary(),
+    }
+    
+    def _wide_targets(predicate_codes, object_types, n_predicates):
+        """Value column per predicate: its one typed column, value_float for int/float mixes, else value_string"""
+        type_codes, type_names = pd.factorize(object_types)
+        targets = [WPRDF_LITERAL_TYPES.get(name, 'value_string') for name in type_names]
+        pairs = np.unique(predicate_codes.astype('int64') * max(len(type_names), 1) + type_codes)
+        found = [set() for _ in range(n_predicates)]
+        for pair in pairs:
+            found[pair // len(type_names)].add(targets[pair % len(type_names)])
+        resolved = []
+        for names in found:
+            if len(names) == 1:
+                resolved.append(next(iter(names)))
+            elif names <= {'value_int', 'value_float'}:
+                resolved.append('value_float')
+            else:
+                resolved.append('value_string')
+        return resolved
+    
+    def _wide_values(raw, column, positions, target, typed_input):
+        """Values of one predicate in a chunk as an Arrow array of its wide column type"""
+        value_type = WPRDF_WIDE_TYPES[target]
+        indices = pa.array(positions, pa.int64())
+        if typed_input:
+            if target == 'value_float':
+                return pc.coalesce(column('value_float').take(indices).cast(value_type), column('value_int').take(indices).cast(value_type))
+            values = column(target).take(indices)
+            if target != 'value_string' or values.null_count == 0:
+                return values.cast(value_type)
+            # Mixed types keep the literal text
+            literals = decode_typed_literals(raw.iloc[positions], encode_object=False)['literal_value']
+            return pa.array(literals, from_pandas=True).cast(value_type)
+        literals = column('literal_value').take(indices)
+        if target != 'value_binary':
+            try:
+                return literals.cast(value_type)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                pass
+        # Slow path with the typed-literal rules: base64 objects, zone offsets, unparsable values
+        typed = encode_typed_literals(raw.iloc[positions])
+        values = typed['value_float'].fillna(typed['value_int'].astype('Float64')) if target == 'value_float' else typed[target]
+        return pa.array(values, from_pandas=True).cast(value_type)
+    
+    def iter_wprdf_wide(df, multi='list', subject_col='subject', subject_prefix="urn:row:", predicate_prefix="urn:column:", current=True, chunk_size=100000):
+        """
+        Pivot a WPRDF frame (wide, compact or typed layout) into one row per
+        subject and one column per predicate, yielding pyarrow Tables of at
+        most chunk_size subjects that all share one schema.
+        
+        Column types come from object_type (the typed-literal rules). Subjects
+        with several values for a predicate follow multi: 'list' (list column),
+        'first' or 'last' (in row order); a dict maps predicates to a policy,
+        other predicates use 'list'. Prefixes are stripped from subjects and
+        predicates where present. current=True skips closed triples.
+        """
+        df = expand_wprdf_nodes(df)
+        if current and 'business_validity_to' in df.columns:
+            df = df[df['business_validity_to'].isna()]
+        typed_input = 'value_string' in df.columns
+        value_columns = list(WPRDF_LITERAL_COLUMNS) if typed_input else ['object', 'literal_value']
+        df = df[['subject', 'predicate', 'object_type'] + value_columns]
+        
+        subject_codes, subjects = pd.factorize(df['subject'])
+        predicate_codes, predicates = pd.factorize(df['predicate'])
+        n_predicates = len(predicates)
+        targets = _wide_targets(predicate_codes, df['object_type'], n_predicates)
+        # A predicate is multi-valued if any subject has it more than once
+        pair_keys = subject_codes.astype('int64') * max(n_predicates, 1) + predicate_codes
+        multi_valued = np.zeros(n_predicates, dtype=bool)
+        multi_valued[np.unique(predicate_codes[pd.Series(pair_keys).duplicated().to_numpy()])] = True
+        
+        policies = []
+        for predicate, is_multi in zip(predicates, multi_valued):
+            policy = (multi.get(predicate, 'list') if isinstance(multi, dict) else multi) if is_multi else None
+            if policy is not None and policy not in WPRDF_WIDE_POLICIES:
+                raise ValueError(f"Unknown multi-value policy {policy!r}, expected one of {WPRDF_WIDE_POLICIES}")
+            policies.append(policy)
+        
+        names, fields = {subject_col}, [pa.field(subject_col, pa.string())]
+        for predicate, target, policy in zip(predicates, targets, policies):
+            name = str(predicate).removeprefix(predicate_prefix) if predicate_prefix else str(predicate)
+            name = str(predicate) if name in names else name
+            names.add(name)
+            value_type = WPRDF_WIDE_TYPES[target]
+            fields.append(pa.field(name, pa.list_(value_type) if policy == 'list' else value_type))
+        schema = pa.schema(fields)
+        
+        if not len(subjects):
+            yield schema.empty_table()
+            return
+        subject_names = pa.array(subjects, pa.string())
+        if subject_prefix:
+            subject_names = pc.if_else(
+                pc.starts_with(subject_names, subject_prefix),
+                pc.utf8_slice_codeunits(subject_names, len(subject_prefix)), subject_names
+            )
+        order = np.argsort(subject_codes, kind='stable')
+        bounds = np.searchsorted(subject_codes[order], np.arange(0, len(subjects) + chunk_size, chunk_size).clip(max=len(subjects)))
+        
+        for chunk, (lo, hi) in enumerate(zip(bounds[:-1], bounds[1:])):
+            first_subject = chunk * chunk_size
+            n_subjects = min(chunk_size, len(subjects) - first_subject)
+            rows = order[lo:hi]
+            raw = df.take(rows)
+            arrow_columns = {}
+            
+            def _column(name):
+                if name not in arrow_columns:
+                    arrow_columns[name] = pa.array(raw[name], from_pandas=True)
+                return arrow_columns[name]
+            
+            local_subjects = subject_codes[rows] - first_subject
+            local_predicates = predicate_codes[rows]
+            by_predicate = np.argsort(local_predicates, kind='stable')
+            predicate_bounds = np.searchsorted(local_predicates[by_predicate], np.arange(n_predicates + 1))
+            columns = [subject_names.slice(first_subject, n_subjects)]
+            for code, (target, policy) in enumerate(zip(targets, policies)):
+                positions = by_predicate[predicate_bounds[code]:predicate_bounds[code + 1]]
+                owners = local_subjects[positions]
+                values = _wide_values(raw, _column, positions, target, typed_input)
+                if policy == 'list':
+                    counts = np.bincount(owners, minlength=n_subjects)
+                    offsets = np.concatenate([[0], np.cumsum(counts)]).astype('int32')
+                    columns.append(pa.ListArray.from_arrays(
+                        pa.array(offsets), values, type=schema.field(len(columns)).type, mask=pa.array(counts == 0)
+                    ))
+                    continue
+                keep = np.ones(len(owners), dtype=bool)
+                if policy == 'first':
+                    keep[1:] = owners[1:] != owners[:-1]
+                elif policy == 'last':
+                    keep[:-1] = owners[1:] != owners[:-1]
+                take = np.full(n_subjects, -1, dtype='int64')
+                take[owners[keep]] = np.flatnonzero(keep)
+                columns.append(values.take(pa.array(take, mask=take < 0)))
+            yield pa.Table.from_arrays(columns, schema=schema)
+    
+    def wprdf2wide(df, multi='list', **options):
+        """Wide entity table (one row per subject) as a DataFrame with nullable typed columns; see iter_wprdf_wide"""
+        tables = list(iter_wprdf_wide(df, multi, **options))
+        nullable = {pa.int64(): pd.Int64Dtype(), pa.float64(): pd.Float64Dtype(), pa.bool_(): pd.BooleanDtype(), pa.string(): pd.StringDtype()}
+        return pa.concat_tables(tables).to_pandas(types_mapper=nullable.get)
+    
+    def write_wprdf_wide_parquet(df, sink=None, multi='list', compression='zstd', **options):
+        """Stream the wide entity table chunk by chunk to Parquet (one row group per chunk); returns the bytes when no sink is given"""
+        out = pa.BufferOutputStream() if sink is None else sink
+        writer = None
+        for table in iter_wprdf_wide(df, multi, **options):
+            if writer is None:
+                writer = pq.ParquetWriter(out, table.schema, compression=compression)
+            writer.write_table(table)
+        writer.close()
+        return out.getvalue().to_pybytes() if sink is None else None
+
+    # Lazy preview: paging over in-memory Parquet is implemented once, in
+    # merge_wprdf, and imported from the notebook database (wprdf.js injects wprdf_import)
+    WPRDF_PREVIEW_ROW_GROUP_SIZE = wprdf_import("merge_wprdf", "WPRDF_PREVIEW_ROW_GROUP_SIZE")
+    WPRDF_PREVIEW_PAGE_SIZE = wprdf_import("merge_wprdf", "WPRDF_PREVIEW_PAGE_SIZE")
+    wprdf_preview_source = wprdf_import("merge_wprdf", "wprdf_preview_source")
+    wprdf_preview_columns = wprdf_import("merge_wprdf", "wprdf_preview_columns")
+    read_wprdf_preview = wprdf_import("merge_wprdf", "read_wprdf_preview")
+
+    # Statistics catalog written into the Parquet footer: defined once, in
+    # merge_wprdf, which also reads and combines catalogs
+    WPRDF_STATS_KEY = wprdf_import("merge_wprdf", "WPRDF_STATS_KEY")
+    WPRDF_STATS_PRECISION = wprdf_import("merge_wprdf", "WPRDF_STATS_PRECISION")
+    wprdf_stats = wprdf_import("merge_wprdf", "wprdf_stats")
+
+    # Tunable Parquet writer. WPRDF is extremely repetitive (few predicates,
+    # runs of the same subject), so clustering rows and using dictionary pages
+    # with zstd shrinks files and lets readers prune row groups by statistics.
+    WPRDF_PARQUET_PRESETS = {
+        # What DataFrame.to_parquet() produces: input order, snappy, one big row group
+        'pandas': {'sort_by': None, 'compression': 'snappy', 'row_group_size': None},
+        'fast': {'sort_by': None, 'compression': 'lz4', 'row_group_size': 131072},
+        'balanced': {
+            'sort_by': ['subject', 'predicate'], 'compression': 'zstd', 'compression_level': 3,
+            'row_group_size': 131072, 'page_index': True,
+        },
+        'compact': {
+            'sort_by': ['predicate', 'object_type', 'subject'], 'compression': 'zstd', 'compression_level': 12,
+            'row_group_size': 1048576,
+        },
+        'lookup': {
+            'sort_by': ['subject', 'predicate'], 'compression': 'zstd', 'compression_level': 3,
+            'row_group_size': 65536, 'page_index': True, 'bloom_filter_columns': ['subject', 'predicate'],
+        },
+    }
+    
+    def write_wprdf_parquet(df, sink=None, preset='balanced', stats=True, **options):
+        """
+        Write a WPRDF frame to Parquet with a preset, optionally overridden per option.
+        
+        Options: sort_by (list of columns), compression, compression_level,
+        row_group_size, page_index, statistics_columns, bloom_filter_columns,
+        bloom_filter_fpp. df.attrs (run tables) are kept like to_parquet() does.
+        stats=True stores the wprdf_stats() catalog in the footer (a catalog
+        dict can be passed instead). Returns the bytes when no sink is given.
+        """
+        config = {**WPRDF_PARQUET_PRESETS[preset], **options}
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        if df.attrs:
+            metadata[b'PANDAS_ATTRS'] = json.dumps(df.attrs, default=str).encode('utf-8')
+        if stats:
+            catalog = wprdf_stats(df) if stats is True else stats
+            metadata[WPRDF_STATS_KEY] = json.dumps(catalog).encode('utf-8')
+        table = table.replace_schema_metadata(metadata)
+        
+        sort_by = [c for c in (config.get('sort_by') or []) if c in table.column_names]
+        if sort_by:
+            table = table.sort_by([(c, 'ascending') for c in sort_by])
+        
+        statistics = config.get('statistics_columns')
+        writer_options = {
+            'compression': config.get('compression', 'zstd'),
+            'compression_level': config.get('compression_level'),
+            'use_dictionary': True,
+            'write_statistics': [c for c in statistics if c in table.column_names] if statistics else True,
+            'write_page_index': config.get('page_index', False),
+            'sorting_columns': [pq.SortingColumn(table.column_names.index(c)) for c in sort_by] or None,
+        }
+        bloom_columns = [c for c in (config.get('bloom_filter_columns') or []) if c in table.column_names]
+        if bloom_columns:
+            writer_options['bloom_filter_options'] = {
+                c: {'ndv': max(table.num_rows, 1), 'fpp': config.get('bloom_filter_fpp', 0.01)} for c in bloom_columns
+            }
+        
+        out = pa.BufferOutputStream() if sink is None else sink
+        try:
+            writer = pq.ParquetWriter(out, table.schema, **writer_options)
+        except TypeError:
+            # Older pyarrow builds (e.g. in Pyodide) lack bloom filters
+            writer_options.pop('bloom_filter_options', None)
+            writer = pq.ParquetWriter(out, table.schema, **writer_options)
+        with writer:
+            writer.write_table(table, row_group_size=config.get('row_group_size') or max(table.num_rows, 1))
+        return out.getvalue().to_pybytes() if sink is None else None
+    
+    def wprdf_parquet_report(df, presets=None, repeat=3):
+        """
+        Compare Parquet presets on one WPRDF frame: file size, write time, full
+        scan time, and a point lookup by subject (time and row groups that
+        survive min/max pruning).
+        """
+        presets = list(WPRDF_PARQUET_PRESETS) if presets is None else presets
+        probe = df['subject'].iloc[len(df) // 2] if len(df) else None
+        rows = []
+        for preset in presets:
+            timer = time.perf_counter()
+            for _ in range(repeat):
+                data = write_wprdf_parquet(df, preset=preset, stats=False)
+            write_s = (time.perf_counter() - timer) / repeat
+            
+            timer = time.perf_counter()
+            for _ in range(repeat):
+                pq.read_table(pa.BufferReader(data))
+            scan_s = (time.perf_counter() - timer) / repeat
+            
+            timer = time.perf_counter()
+            for _ in range(repeat):
+                pq.read_table(pa.BufferReader(data), filters=[('subject', '=', probe)])
+            lookup_s = (time.perf_counter() - timer) / repeat
+            
+            metadata = pq.ParquetFile(pa.BufferReader(data)).metadata
+            subject_index = metadata.schema.to_arrow_schema().get_field_index('subject')
+            candidates = 0
+            for i in range(metadata.num_row_groups):
+                stats = metadata.row_group(i).column(subject_index).statistics
+                if stats is None or not stats.has_min_max or stats.min <= probe <= stats.max:
+                    candidates += 1
+            rows.append({
+                'preset': preset, 'bytes': len(data), 'row_groups': metadata.num_row_groups,
+                'lookup_row_groups': candidates, 'write_s': write_s, 'scan_s': scan_s, 'lookup_s': lookup_s,
+            })
+        report = pd.DataFrame(rows)
+        if 'pandas' in presets:
+            report['size_vs_pandas'] = report['bytes'] / report.loc[report['preset'] == 'pandas', 'bytes'].iloc[0]
+        return report
 
     return (
         BytesIO,
         WPRDF_COLUMNS,
+        WPRDF_COMPACT_COLUMNS,
+        WPRDF_LITERAL_COLUMNS,
+        WPRDF_LITERAL_TYPES,
+        WPRDF_PARQUET_PRESETS,
+        WPRDF_PREVIEW_PAGE_SIZE,
+        WPRDF_PREVIEW_ROW_GROUP_SIZE,
+        WPRDF_RUN_COLUMNS,
+        WPRDF_STATS_KEY,
+        WPRDF_STATS_PRECISION,
+        WPRDF_WIDE_POLICIES,
+        WPRDF_WIDE_TYPES,
         base64,
+        create_wprdf_compact_dataframe,
         create_wprdf_row,
+        create_wprdf_run,
+        create_wprdf_triple,
         csv2wprdf,
         datetime,
+        decode_typed_literals,
+        diff_wprdf,
         dr2wprdf,
+        encode_typed_literals,
         excel2wprdf,
+        expand_wprdf,
+        expand_wprdf_nodes,
+        iter_wprdf_wide,
+        json,
+        np,
+        pa,
+        pc,
         pd,
+        pq,
+        read_wprdf_preview,
+        time,
+        uuid,
+        wprdf2wide,
+        wprdf_parquet_report,
+        wprdf_preview_columns,
+        wprdf_preview_source,
+        wprdf_stats,
+        wprdf_subject_hashes,
+        wprdf_triple_hashes,
+        write_wprdf_parquet,
+        write_wprdf_wide_parquet,
     )
 
 @app.cell(hide_code=True)
@@ -111,10 +610,57 @@ def __(mo):
             
         # 2. Convert to WPRDF
         df = excel2wprdf.excel2wprdf(file_bytes, "user:uri", "app:uri")
+        
+        # 3. Optional: compact layout (one ingestion run instead of
+        #    author/app/timestamps on every triple)
+        compact = excel2wprdf.excel2wprdf(file_bytes, "user:uri", "app:uri", {"compact": True})
+        wide = excel2wprdf.expand_wprdf(compact)
+        
+        # 4. Optional: typed literals (value_int, value_float, ... instead of
+        #    str() + base64 copies of every value)
+        typed = excel2wprdf.excel2wprdf(file_bytes, "user:uri", "app:uri", {"typed": True})
+        typed[typed["value_int"] > 10]
+        untyped = excel2wprdf.decode_typed_literals(typed)
+        
+        # 5. Optional: incremental re-ingestion (only changed triples plus
+        #    retraction rows for removed ones)
+        delta = excel2wprdf.excel2wprdf(file_bytes, "user:uri", "app:uri", {"previous": previous_df})
+        
+        # 6. Tuned Parquet output: presets set sort order, row-group size,
+        #    codec, page index and bloom filters; single options override them
+        data = excel2wprdf.write_wprdf_parquet(df, preset="lookup", compression_level=6)
+        excel2wprdf.wprdf_parquet_report(df)  # size / write / scan / lookup per preset
+        
+        # 7. Back to a wide entity table (one row per subject, typed columns);
+        #    multi-valued predicates become lists or keep the first/last value
+        table = excel2wprdf.wprdf2wide(df, multi="list")
+        excel2wprdf.write_wprdf_wide_parquet(df, "wide.parquet", multi={"urn:column:email": "first"})
         ```
         
+        ### Parquet Presets:
+        - **pandas**: what `to_parquet()` writes (input order, snappy, one row group)
+        - **fast**: unsorted, lz4, 128k-row groups
+        - **balanced**: sorted by subject/predicate, zstd, 128k-row groups, page index
+        - **compact**: sorted by predicate/object_type/subject, high zstd level, 1M-row groups
+        - **lookup**: sorted by subject/predicate, 64k-row groups, page index and bloom filters on subject/predicate
+        
+        Every preset also stores the `wprdf_stats()` catalog in the file footer
+        (per-predicate counts, distinct subjects/objects, null counts, validity
+        histograms); pass `stats=False` to leave it out. `merge_wprdf` reads and
+        combines these catalogs without scanning the rows.
+        
+        ### Wide Tables:
+        `wprdf2wide` undoes `dr2wprdf` without `pivot_table`: subjects and
+        predicates are pivoted as integer codes, `chunk_size` subjects at a
+        time (`iter_wprdf_wide` yields the chunks, `write_wprdf_wide_parquet`
+        streams them to Parquet). Column types are restored from `object_type`
+        (int/float mixes become float, other mixes keep the literal text) and
+        only open triples are used unless `current=False`.
+        
         ### Interactive Upload:
         Use the file uploader below to test your files and see the WPRDF output.
+        The preview is paged from an in-memory Parquet copy of the result, so only
+        the rows on screen are decoded; filter and sort stream over its row groups.
         """
     )
     return
@@ -122,7 +668,8 @@ def __(mo):
 @app.cell
 def __(mo):
     excel2wprdf_file_input = mo.ui.file(label="Upload Excel or CSV", filetypes=[".xlsx", ".xls", ".csv"])
-    return (excel2wprdf_file_input,)
+    excel2wprdf_previous_input = mo.ui.file(label="Previous WPRDF Snapshot (optional)", filetypes=[".parquet"])
+    return excel2wprdf_file_input, excel2wprdf_previous_input
 
 @app.cell
 def __(
@@ -143,13 +690,17 @@ def __(
 
 @app.cell
 def __(
+    BytesIO,
     csv2wprdf,
     excel2wprdf,
     excel2wprdf_file_input,
+    excel2wprdf_previous_input,
     mo,
+    pd,
     excel2wprdf_predicate_prefix,
     excel2wprdf_subject_col,
     excel2wprdf_subject_prefix,
+    wprdf_preview_source,
 ):
     def excel2wprdf_process_file(file):
         if not file:
@@ -163,46 +714,157 @@ def __(
             "subject_prefix": excel2wprdf_subject_prefix.value,
             "predicate_prefix": excel2wprdf_predicate_prefix.value
         }
+        if excel2wprdf_previous_input.value:
+            config["previous"] = pd.read_parquet(BytesIO(excel2wprdf_previous_input.value[0].contents))
         
         if file.name.endswith('.csv'):
             return csv2wprdf(file.contents, author, app, config)
         else:
             return excel2wprdf(file.contents, author, app, config)
 
-    excel2wprdf_output_df = excel2wprdf_process_file(excel2wprdf_file_input.value[0]) if excel2wprdf_file_input.value else None
+    # Only the Parquet bytes outlive this cell; the DataFrame is dropped after conversion
+    excel2wprdf_output_parquet = wprdf_preview_source(
+        excel2wprdf_process_file(excel2wprdf_file_input.value[0]) if excel2wprdf_file_input.value else None
+    )
     
-    # Use mo.download instead of mo.ui.download
+    return excel2wprdf_output_parquet, excel2wprdf_process_file
+
+@app.cell
+def __(WPRDF_PARQUET_PRESETS, WPRDF_WIDE_POLICIES, mo):
+    excel2wprdf_parquet_preset = mo.ui.dropdown(
+        options=list(WPRDF_PARQUET_PRESETS), value="balanced", label="Parquet Preset"
+    )
+    excel2wprdf_compare_btn = mo.ui.run_button(label="Compare Presets")
+    excel2wprdf_wide_policy = mo.ui.dropdown(
+        options=list(WPRDF_WIDE_POLICIES), value="list", label="Multi-valued"
+    )
+    return excel2wprdf_compare_btn, excel2wprdf_parquet_preset, excel2wprdf_wide_policy
+
+@app.cell
+def __(
+    BytesIO,
+    excel2wprdf_output_parquet,
+    excel2wprdf_parquet_preset,
+    excel2wprdf_predicate_prefix,
+    excel2wprdf_subject_prefix,
+    excel2wprdf_wide_policy,
+    mo,
+    pd,
+    write_wprdf_parquet,
+    write_wprdf_wide_parquet,
+):
+    # Use mo.download instead of mo.ui.download; the preset file is only
+    # written when the download is requested
     excel2wprdf_download_btn = mo.download(
         label="Download WPRDF Parquet",
         filename="data.parquet",
-        data=lambda: excel2wprdf_output_df.to_parquet() if excel2wprdf_output_df is not None else None,
-        disabled=excel2wprdf_output_df is None
+        data=(lambda: write_wprdf_parquet(
+            pd.read_parquet(BytesIO(excel2wprdf_output_parquet)), preset=excel2wprdf_parquet_preset.value
+        )) if excel2wprdf_output_parquet is not None else b"",
+        disabled=excel2wprdf_output_parquet is None
     )
-    
-    return excel2wprdf_download_btn, excel2wprdf_output_df, excel2wprdf_process_file
+    # Back to one row per subject, e.g. to check the conversion in a spreadsheet tool
+    excel2wprdf_wide_download_btn = mo.download(
+        label="Download Wide Parquet",
+        filename="data_wide.parquet",
+        data=(lambda: write_wprdf_wide_parquet(
+            pd.read_parquet(BytesIO(excel2wprdf_output_parquet)),
+            multi=excel2wprdf_wide_policy.value,
+            subject_prefix=excel2wprdf_subject_prefix.value,
+            predicate_prefix=excel2wprdf_predicate_prefix.value
+        )) if excel2wprdf_output_parquet is not None else b"",
+        disabled=excel2wprdf_output_parquet is None
+    )
+    return excel2wprdf_download_btn, excel2wprdf_wide_download_btn
+
+@app.cell
+def __(
+    BytesIO,
+    excel2wprdf_compare_btn,
+    excel2wprdf_output_parquet,
+    mo,
+    pd,
+    wprdf_parquet_report,
+):
+    if excel2wprdf_compare_btn.value and excel2wprdf_output_parquet is not None:
+        excel2wprdf_preset_report = mo.ui.table(
+            wprdf_parquet_report(pd.read_parquet(BytesIO(excel2wprdf_output_parquet))).round(4),
+            pagination=False, selection=None
+        )
+    else:
+        excel2wprdf_preset_report = mo.md("")
+    return (excel2wprdf_preset_report,)
+
+@app.cell
+def __(excel2wprdf_output_parquet, mo, wprdf_preview_columns):
+    excel2wprdf_preview_controls = mo.ui.dictionary({
+        "search": mo.ui.text(label="Filter", placeholder="Text in any column"),
+        "sort_by": mo.ui.dropdown(
+            options=["(none)"] + wprdf_preview_columns(excel2wprdf_output_parquet), value="(none)", label="Sort by"
+        ),
+        "descending": mo.ui.checkbox(label="Descending"),
+        "page": mo.ui.number(start=1, step=1, value=1, label="Page"),
+    })
+    return (excel2wprdf_preview_controls,)
 
 @app.cell
 def __(
     excel2wprdf_file_input,
+    excel2wprdf_previous_input,
     mo,
-    excel2wprdf_output_df,
+    excel2wprdf_output_parquet,
     excel2wprdf_predicate_prefix,
+    excel2wprdf_preview_controls,
     excel2wprdf_subject_col,
     excel2wprdf_subject_prefix,
     excel2wprdf_download_btn,
+    excel2wprdf_compare_btn,
+    excel2wprdf_parquet_preset,
+    excel2wprdf_preset_report,
+    excel2wprdf_wide_download_btn,
+    excel2wprdf_wide_policy,
+    read_wprdf_preview,
+    WPRDF_PREVIEW_PAGE_SIZE,
 ):
+    if excel2wprdf_output_parquet is not None:
+        _controls = excel2wprdf_preview_controls.value
+        _page, _total = read_wprdf_preview(
+            excel2wprdf_output_parquet,
+            page=_controls["page"] or 1,
+            sort_by=None if _controls["sort_by"] == "(none)" else _controls["sort_by"],
+            descending=_controls["descending"],
+            search=_controls["search"] or None
+        )
+        _first = ((_controls["page"] or 1) - 1) * WPRDF_PREVIEW_PAGE_SIZE
+        _preview = mo.vstack([
+            excel2wprdf_preview_controls.hstack(),
+            mo.ui.table(_page, pagination=False, selection=None),
+            mo.md(f"_Rows {_first + 1 if len(_page) else 0}–{_first + len(_page)} of {_total:,}_")
+        ])
+    else:
+        _preview = mo.md("")
+
     mo.vstack([
         mo.md("# 📊 Excel to WPRDF"),
         mo.md("1. **Upload** your Excel or CSV file."),
         excel2wprdf_file_input,
         mo.md("2. **Configure** (Optional)"),
         mo.hstack([excel2wprdf_subject_col, excel2wprdf_subject_prefix, excel2wprdf_predicate_prefix]) if excel2wprdf_file_input.value else mo.md(""),
+        mo.hstack([
+            excel2wprdf_previous_input,
+            mo.md("🔁 *Re-ingesting a source? Upload its previous snapshot to only get changed triples and retractions.*")
+        ]),
         mo.md("3. **Download & Save**"),
         mo.hstack([
+            excel2wprdf_parquet_preset,
             excel2wprdf_download_btn,
+            excel2wprdf_compare_btn,
+            excel2wprdf_wide_policy,
+            excel2wprdf_wide_download_btn,
             mo.md("💡 *After downloading, you can save this file to your local OPFS storage for persistence.*")
-        ]) if excel2wprdf_output_df is not None else mo.md("_Upload a file to enable download_"),
-        mo.ui.table(excel2wprdf_output_df) if excel2wprdf_output_df is not None else mo.md("")
+        ]) if excel2wprdf_output_parquet is not None else mo.md("_Upload a file to enable download_"),
+        excel2wprdf_preset_report,
+        _preview
     ])
     return
 
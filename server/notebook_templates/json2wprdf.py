@@ -20,12 +20,17 @@ async def __():
             import micropip
             
         _pkgs = []
-        # Check if pandas is already available
+        # Check if pandas and pyarrow are already available
         if "pandas" not in sys.modules:
             try:
                 import pandas as pd
             except ImportError:
                 _pkgs.append("pandas")
+        if "pyarrow" not in sys.modules:
+            try:
+                import pyarrow
+            except ImportError:
+                _pkgs.append("pyarrow")
         
         if _pkgs:
             await micropip.install(_pkgs)
@@ -33,7 +38,7 @@ async def __():
     return (mo, sys)
 
 @app.cell(hide_code=True)
-def __(sys):
+def __(sys, wprdf_import):
     # 2. Core Logic: Imports & WPRDF Functions
     # WPRDF: Defensive imports - check sys.modules first to avoid redundant loading in WASM.
     # This ensures we use the already-initialized environment and avoid "Variable redefined" errors.
@@ -52,11 +57,32 @@ def __(sys):
     else:
         from datetime import datetime
     
+    uuid = sys.modules.get("uuid")
+    if uuid is None: import uuid
+    
+    pa = sys.modules.get("pyarrow")
+    if pa is None: import pyarrow as pa
+    
+    pc = sys.modules.get("pyarrow.compute")
+    if pc is None: import pyarrow.compute as pc
+    
+    pq = sys.modules.get("pyarrow.parquet")
+    if pq is None: import pyarrow.parquet as pq
+    
     WPRDF_COLUMNS = [
         'subject', 'predicate', 'object_type', 'object', 'literal_value',
         'technical_timestamp', 'business_validity_from',
         'business_validity_to', 'author', 'app'
     ]
+    
+    # Compact layout: provenance shared by one conversion call is stored once in
+    # the run table (df.attrs["wprdf_runs"], kept in the Parquet metadata) and
+    # every triple only references it through run_id.
+    WPRDF_RUN_COLUMNS = ['technical_timestamp', 'business_validity_from', 'author', 'app']
+    WPRDF_COMPACT_COLUMNS = [
+        'subject', 'predicate', 'object_type', 'object', 'literal_value',
+        'business_validity_to', 'run_id'
+    ]
 
     def create_wprdf_row(subject, predicate, obj, author="http://browser.app/user#default", app="http://browser.app/app#default", business_from=None):
         obj_type = type(obj).__name__
@@ -70,9 +96,63 @@ def __(sys):
             'author': author, 'app': app
         }
 
-    def json2wprdf(json_bytes, author_uri, app_uri, base_subject="urn:json:root"):
+    def create_wprdf_run(author="http://browser.app/user#default", app="http://browser.app/app#default", business_from=None):
+        """One ingestion run: a single id and timestamp for a whole conversion call"""
+        now = datetime.now().isoformat()
+        return {
+            'run_id': f"urn:wprdf:run:{uuid.uuid4().hex}",
+            'technical_timestamp': now, 'business_validity_from': (business_from or now),
+            'author': author, 'app': app
+        }
+
+    def create_wprdf_triple(subject, predicate, obj, run_id):
+        obj_type = type(obj).__name__
+        literal_value = str(obj)
+        val = base64.b64encode(str(obj).encode('utf-8')).decode('utf-8') if not isinstance(obj, bytes) else base64.b64encode(obj).decode('utf-8')
+        return {
+            'subject': str(subject), 'predicate': str(predicate), 'object_type': obj_type,
+            'object': val, 'literal_value': literal_value, 'business_validity_to': None,
+            'run_id': run_id
+        }
+
+    def create_wprdf_compact_dataframe(rows, run):
+        df = pd.DataFrame(rows, columns=WPRDF_COMPACT_COLUMNS)
+        df.attrs['wprdf_runs'] = {run['run_id']: {k: run[k] for k in WPRDF_RUN_COLUMNS}}
+        return df
+
+    # The wide-schema expansion (runs and nodes) is shared by every consumer
+    expand_wprdf = wprdf_import("merge_wprdf", "expand_wprdf")
+    expand_wprdf_nodes = wprdf_import("merge_wprdf", "expand_wprdf_nodes")
+    wprdf_node_subjects = wprdf_import("merge_wprdf", "wprdf_node_subjects")
+
+    # The typed literal layout (value_* columns) is shared with merge_wprdf
+    WPRDF_LITERAL_COLUMNS = wprdf_import("merge_wprdf", "WPRDF_LITERAL_COLUMNS")
+    WPRDF_LITERAL_TYPES = wprdf_import("merge_wprdf", "WPRDF_LITERAL_TYPES")
+    encode_typed_literals = wprdf_import("merge_wprdf", "encode_typed_literals")
+    decode_typed_literals = wprdf_import("merge_wprdf", "decode_typed_literals")
+
+    # Node layout: instead of the full path IRI, every triple stores the integer
+    # id of its JSON container in subject_node. The node table (df.attrs
+    # ["wprdf_nodes"], kept in the Parquet metadata) holds each node's parent
+    # id and its key or list index once; paths are rebuilt only when asked for.
+    # Nodes are numbered in document order, so a parent always precedes its children.
+    # wprdf_node_subjects / expand_wprdf_nodes (from merge_wprdf) resolve the ids.
+    def create_wprdf_node_table(base_subject):
+        return {'base': base_subject, 'parent': [-1], 'key': [None]}
+
+    def json2wprdf(json_bytes, author_uri, app_uri, base_subject="urn:json:root", compact=False, typed=False, nodes=False):
         """Convert JSON to WPRDF format"""
         data = json.loads(json_bytes)
+        run = create_wprdf_run(author_uri, app_uri)
+        node_table = create_wprdf_node_table(base_subject) if nodes else None
+        subject_nodes = []
+        
+        def child(subject, key):
+            if node_table is None:
+                return f"{subject}[{key}]" if isinstance(key, int) else f"{subject}/{key}"
+            node_table['parent'].append(subject)
+            node_table['key'].append(key)
+            return len(node_table['parent']) - 1
         
         def flatten(obj, subject):
             rows = []
@@ -80,33 +160,101 @@ def __(sys):
                 for key, value in obj.items():
                     predicate = f"urn:json:key:{key}"
                     if isinstance(value, (dict, list)):
-                        child_subject = f"{subject}/{key}"
+                        child_subject = child(subject, key)
                         rows.extend(flatten(value, child_subject))
                     else:
-                        rows.append(create_wprdf_row(
-                            subject=subject,
+                        if node_table is not None:
+                            subject_nodes.append(subject)
+                        rows.append(create_wprdf_triple(
+                            subject=subject if node_table is None else "",
                             predicate=predicate,
                             obj=value,
-                            author=author_uri,
-                            app=app_uri
+                            run_id=run['run_id']
                         ))
             elif isinstance(obj, list):
                 for idx, item in enumerate(obj):
-                    child_subject = f"{subject}[{idx}]"
+                    child_subject = child(subject, idx)
                     rows.extend(flatten(item, child_subject))
             return rows
         
-        rows = flatten(data, base_subject)
-        return pd.DataFrame(rows, columns=WPRDF_COLUMNS)
+        rows = flatten(data, base_subject if node_table is None else 0)
+        compact_df = create_wprdf_compact_dataframe(rows, run)
+        if node_table is not None:
+            compact_df = compact_df.drop(columns=['subject'])
+            compact_df.insert(0, 'subject_node', pd.array(subject_nodes, dtype='int32'))
+            compact_df.attrs['wprdf_nodes'] = node_table
+        if typed:
+            compact_df = encode_typed_literals(compact_df)
+        if compact:
+            return compact_df
+        wide = expand_wprdf(compact_df, nodes=False)
+        if node_table is not None:
+            wide.attrs['wprdf_nodes'] = node_table
+        return wide
+
+    def json2wprdf_node_report(json_bytes, **kwargs):
+        """
+        Memory (deep, in-process) and Parquet size of the path vs node subject encodings.
+        
+        The node layout is an in-memory saving: Parquet already dictionary-encodes
+        repeated paths, while the node table travels as JSON in the file metadata.
+        """
+        rows = []
+        for nodes in (False, True):
+            df = json2wprdf(json_bytes, "urn:wprdf:user:local", "urn:wprdf:app:local", nodes=nodes, **kwargs)
+            node_table = df.attrs.get('wprdf_nodes')
+            node_bytes = 0
+            if node_table is not None:
+                node_bytes = pd.DataFrame({k: node_table[k] for k in ('parent', 'key')}).memory_usage(deep=True).sum()
+            rows.append({
+                'layout': 'nodes' if nodes else 'paths', 'triples': len(df),
+                'subjects': df['subject_node' if nodes else 'subject'].nunique(),
+                'subject_bytes': df['subject_node' if nodes else 'subject'].memory_usage(deep=True, index=False) + node_bytes,
+                'frame_bytes': df.memory_usage(deep=True).sum() + node_bytes,
+                'parquet_bytes': len(df.to_parquet(index=False)),
+            })
+        report = pd.DataFrame(rows)
+        report['frame_vs_paths'] = report['frame_bytes'] / report['frame_bytes'].iloc[0]
+        return report
+
+    # Lazy preview: paging over in-memory Parquet is implemented once, in
+    # merge_wprdf, and imported from the notebook database (wprdf.js injects wprdf_import)
+    WPRDF_PREVIEW_ROW_GROUP_SIZE = wprdf_import("merge_wprdf", "WPRDF_PREVIEW_ROW_GROUP_SIZE")
+    WPRDF_PREVIEW_PAGE_SIZE = wprdf_import("merge_wprdf", "WPRDF_PREVIEW_PAGE_SIZE")
+    wprdf_preview_source = wprdf_import("merge_wprdf", "wprdf_preview_source")
+    wprdf_preview_columns = wprdf_import("merge_wprdf", "wprdf_preview_columns")
+    read_wprdf_preview = wprdf_import("merge_wprdf", "read_wprdf_preview")
 
     return (
         WPRDF_COLUMNS,
+        WPRDF_COMPACT_COLUMNS,
+        WPRDF_LITERAL_COLUMNS,
+        WPRDF_LITERAL_TYPES,
+        WPRDF_PREVIEW_PAGE_SIZE,
+        WPRDF_RUN_COLUMNS,
         base64,
+        create_wprdf_compact_dataframe,
+        create_wprdf_node_table,
         create_wprdf_row,
+        create_wprdf_run,
+        create_wprdf_triple,
         datetime,
+        decode_typed_literals,
+        encode_typed_literals,
+        expand_wprdf,
+        expand_wprdf_nodes,
         json,
         json2wprdf,
+        json2wprdf_node_report,
+        pa,
+        pc,
         pd,
+        pq,
+        read_wprdf_preview,
+        uuid,
+        wprdf_node_subjects,
+        wprdf_preview_columns,
+        wprdf_preview_source,
     )
 
 @app.cell(hide_code=True)
@@ -121,12 +269,22 @@ def __(mo):
         ```python
         import json2wprdf
         df = json2wprdf.json2wprdf(json_bytes, author_uri, app_uri)
+        
+        # Deep documents: integer subject_node + node table instead of path strings
+        nodes_df = json2wprdf.json2wprdf(json_bytes, author_uri, app_uri, nodes=True)
+        json2wprdf.wprdf_node_subjects(nodes_df.attrs["wprdf_nodes"], [3, 7])  # paths of two nodes
+        df = json2wprdf.expand_wprdf_nodes(nodes_df)  # path subjects again
+        json2wprdf.json2wprdf_node_report(json_bytes)  # memory / Parquet size of both layouts
         ```
         
         ### Features:
         - **Recursive Flattening**: Automatically handles nested dictionaries and lists.
         - **URI Generation**: Generates subjects based on the JSON path (e.g., `urn:json:root/user/name`).
         - **Type Preservation**: Records the original JSON type in the `object_type` column.
+        - **Ingestion Runs**: `compact=True` stores author, app and timestamps once per call; `expand_wprdf(df)` restores the wide schema.
+        - **Node Subjects**: `nodes=True` stores an integer `subject_node` per triple and each JSON node's parent and key/index once in `df.attrs["wprdf_nodes"]`; `expand_wprdf_nodes(df)` rebuilds the path IRIs. `expand_wprdf`, merging, validation, statistics, the wide pivot, RDF export and the reasoner expand node frames themselves.
+        - **Typed Literals**: `typed=True` stores values in native `value_int`/`value_float`/`value_bool`/`value_timestamp`/`value_string`/`value_binary` columns; `decode_typed_literals(df)` restores `object`/`literal_value`.
+        - **Lazy Preview**: The result is kept as in-memory Parquet and paged by row group (`read_wprdf_preview`), with streaming filter and sort.
         """
     )
     return
@@ -134,23 +292,65 @@ def __(mo):
 @app.cell
 def __(mo):
     json2wprdf_file_input = mo.ui.file(label="Upload JSON", filetypes=[".json"])
-    return (json2wprdf_file_input,)
+    json2wprdf_nodes_input = mo.ui.checkbox(label="Node subjects (integer subject_node + node table)")
+    return json2wprdf_file_input, json2wprdf_nodes_input
 
 @app.cell
-def __(json2wprdf, json2wprdf_file_input, mo):
-    json2wprdf_output_df = (
-        json2wprdf(json2wprdf_file_input.value[0].contents, "urn:wprdf:user:local", "urn:wprdf:app:local")
+def __(json2wprdf, json2wprdf_file_input, json2wprdf_nodes_input, mo, wprdf_preview_source):
+    json2wprdf_output_parquet = wprdf_preview_source(
+        json2wprdf(
+            json2wprdf_file_input.value[0].contents, "urn:wprdf:user:local", "urn:wprdf:app:local",
+            nodes=json2wprdf_nodes_input.value
+        )
         if json2wprdf_file_input.value
         else None
     )
-    return (json2wprdf_output_df,)
+    return (json2wprdf_output_parquet,)
+
+@app.cell
+def __(json2wprdf_output_parquet, mo, wprdf_preview_columns):
+    json2wprdf_preview_controls = mo.ui.dictionary({
+        "search": mo.ui.text(label="Filter", placeholder="Text in any column"),
+        "sort_by": mo.ui.dropdown(
+            options=["(none)"] + wprdf_preview_columns(json2wprdf_output_parquet), value="(none)", label="Sort by"
+        ),
+        "descending": mo.ui.checkbox(label="Descending"),
+        "page": mo.ui.number(start=1, step=1, value=1, label="Page"),
+    })
+    return (json2wprdf_preview_controls,)
 
 @app.cell
-def __(json2wprdf_file_input, json2wprdf_output_df, mo):
+def __(
+    WPRDF_PREVIEW_PAGE_SIZE,
+    json2wprdf_file_input,
+    json2wprdf_nodes_input,
+    json2wprdf_output_parquet,
+    json2wprdf_preview_controls,
+    mo,
+    read_wprdf_preview,
+):
+    if json2wprdf_output_parquet is not None:
+        _controls = json2wprdf_preview_controls.value
+        _page, _total = read_wprdf_preview(
+            json2wprdf_output_parquet,
+            page=_controls["page"] or 1,
+            sort_by=None if _controls["sort_by"] == "(none)" else _controls["sort_by"],
+            descending=_controls["descending"],
+            search=_controls["search"] or None
+        )
+        _first = ((_controls["page"] or 1) - 1) * WPRDF_PREVIEW_PAGE_SIZE
+        _preview = mo.vstack([
+            json2wprdf_preview_controls.hstack(),
+            mo.ui.table(_page, pagination=False, selection=None),
+            mo.md(f"_Rows {_first + 1 if len(_page) else 0}–{_first + len(_page)} of {_total:,}_")
+        ])
+    else:
+        _preview = mo.md("_Upload a JSON file to see the WPRDF conversion_")
     mo.vstack([
         mo.md("# 📄 JSON to WPRDF"),
         json2wprdf_file_input,
-        mo.ui.table(json2wprdf_output_df) if json2wprdf_output_df is not None else mo.md("_Upload a JSON file to see the WPRDF conversion_")
+        json2wprdf_nodes_input,
+        _preview
     ])
     return
 
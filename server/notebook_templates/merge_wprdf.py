@@ -20,12 +20,17 @@ async def __():
             import micropip
             
         _pkgs = []
-        # Check if pandas is already available
+        # Check if pandas and pyarrow are already available
         if "pandas" not in sys.modules:
             try:
                 import pandas as pd
             except ImportError:
                 _pkgs.append("pandas")
+        if "pyarrow" not in sys.modules:
+            try:
+                import pyarrow
+            except ImportError:
+                _pkgs.append("pyarrow")
         
         if _pkgs:
             await micropip.install(_pkgs)
@@ -46,14 +51,1077 @@ def __(sys):
     BytesIO = io.BytesIO if io and hasattr(io, "BytesIO") else None
     if BytesIO is None: from io import BytesIO
     
-    def merge_wprdf(*dataframes):
-        """Merge multiple WPRDF dataframes"""
-        valid_dfs = [df for df in dataframes if df is not None and not df.empty]
+    base64 = sys.modules.get("base64")
+    if base64 is None: import base64
+    
+    json = sys.modules.get("json")
+    if json is None: import json
+    
+    re = sys.modules.get("re")
+    if re is None: import re
+    
+    pa = sys.modules.get("pyarrow")
+    if pa is None: import pyarrow as pa
+    
+    np = sys.modules.get("numpy")
+    if np is None: import numpy as np
+    
+    collections = sys.modules.get("collections")
+    if collections is None: import collections
+    
+    zlib = sys.modules.get("zlib")
+    if zlib is None: import zlib
+    
+    pc = sys.modules.get("pyarrow.compute")
+    if pc is None: import pyarrow.compute as pc
+    
+    pq = sys.modules.get("pyarrow.parquet")
+    if pq is None: import pyarrow.parquet as pq
+    
+    WPRDF_COLUMNS = [
+        'subject', 'predicate', 'object_type', 'object', 'literal_value',
+        'technical_timestamp', 'business_validity_from',
+        'business_validity_to', 'author', 'app'
+    ]
+    WPRDF_RUN_COLUMNS = ['technical_timestamp', 'business_validity_from', 'author', 'app']
+    
+    # Node layout (json2wprdf nodes=True): triples carry the integer subject_node
+    # of their JSON container instead of a path IRI; df.attrs["wprdf_nodes"] holds
+    # each node's parent id and key or list index, parents before children.
+    def wprdf_node_subjects(nodes, node_ids=None):
+        """Path IRIs for node ids (all nodes when node_ids is None), rebuilt from the node table"""
+        parents, keys = nodes['parent'], nodes['key']
+        if node_ids is None:
+            paths = [nodes['base']]
+            for parent, key in zip(parents[1:], keys[1:]):
+                paths.append(f"{paths[parent]}[{key}]" if isinstance(key, int) else f"{paths[parent]}/{key}")
+            return paths
+        
+        known = {0: nodes['base']}
+        def path(node):
+            chain = []
+            while node not in known:
+                chain.append(node)
+                node = parents[node]
+            for child in reversed(chain):
+                key = keys[child]
+                known[child] = f"{known[node]}[{key}]" if isinstance(key, int) else f"{known[node]}/{key}"
+                node = child
+            return known[node]
+        return [path(int(node)) for node in node_ids]
+
+    def expand_wprdf_nodes(df, nodes=None):
+        """Replace subject_node with the full path subject column"""
+        if 'subject_node' not in df.columns:
+            return df
+        nodes = df.attrs.get('wprdf_nodes') if nodes is None else nodes
+        # Only the nodes that carry triples are rebuilt, each once
+        node_ids = df['subject_node'].to_numpy()
+        unique_ids = pd.unique(node_ids)
+        subjects = pd.array(wprdf_node_subjects(nodes, unique_ids), dtype=object)
+        expanded = df.drop(columns=['subject_node'])
+        expanded.insert(0, 'subject', subjects[pd.Index(unique_ids).get_indexer(node_ids)])
+        expanded.attrs = {k: v for k, v in df.attrs.items() if k != 'wprdf_nodes'}
+        return expanded
+
+    def expand_wprdf(df, runs=None, nodes=True):
+        """Restore the wide WPRDF schema from a compact frame and its run table (nodes=False keeps subject_node)"""
+        if nodes:
+            df = expand_wprdf_nodes(df)
+        if 'run_id' not in df.columns:
+            return df
+        runs = df.attrs.get('wprdf_runs', {}) if runs is None else runs
+        wide = df.drop(columns=['run_id'])
+        for col in WPRDF_RUN_COLUMNS:
+            wide[col] = df['run_id'].map({run_id: run[col] for run_id, run in runs.items()})
+        wide = wide[[c for c in WPRDF_COLUMNS if c in wide.columns] + [c for c in wide.columns if c not in WPRDF_COLUMNS]]
+        wide.attrs = {}
+        return wide
+    
+    # Typed literal layout: object/literal_value are replaced by one nullable
+    # column per physical type, chosen by object_type. Unknown types fall back
+    # to value_string, and so do literals that do not parse as their type or
+    # would not decode to the same text (e.g. timestamps with a UTC offset).
+    WPRDF_LITERAL_COLUMNS = {
+        'value_int': 'Int64', 'value_float': 'Float64', 'value_bool': 'boolean',
+        'value_timestamp': 'datetime64[ns]', 'value_string': 'string', 'value_binary': 'object'
+    }
+    WPRDF_LITERAL_TYPES = {
+        'int': 'value_int', 'int8': 'value_int', 'int16': 'value_int', 'int32': 'value_int', 'int64': 'value_int',
+        'uint8': 'value_int', 'uint16': 'value_int', 'uint32': 'value_int',
+        'float': 'value_float', 'float16': 'value_float', 'float32': 'value_float', 'float64': 'value_float',
+        'bool': 'value_bool', 'bool_': 'value_bool',
+        'Timestamp': 'value_timestamp', 'datetime': 'value_timestamp', 'datetime64': 'value_timestamp', 'date': 'value_timestamp',
+        'bytes': 'value_binary',
+    }
+
+    def _timestamp_literals(values, object_type):
+        """str() form of value_timestamp values; date rows keep their date-only form"""
+        text = values.dt.strftime('%Y-%m-%d %H:%M:%S').astype(object)
+        # str() adds 6 or 9 fractional digits only when there is a fraction, which is rare
+        fraction = (values.dt.microsecond.fillna(0) != 0) | (values.dt.nanosecond.fillna(0) != 0)
+        if fraction.any():
+            text[fraction] = [str(v) for v in values[fraction]]
+        dates = object_type.isin(['date']).to_numpy()
+        if dates.any():
+            text[dates] = values[dates].dt.strftime('%Y-%m-%d')
+        return text
+
+    def encode_typed_literals(df):
+        """Replace object/literal_value with the typed value_* columns"""
+        if 'literal_value' not in df.columns:
+            return df
+        target = df['object_type'].map(WPRDF_LITERAL_TYPES).fillna('value_string')
+        literal = df['literal_value']
+        fallback = pd.Series(False, index=df.index)
+        values = {}
+        for col, dtype in WPRDF_LITERAL_COLUMNS.items():
+            if col == 'value_string':
+                continue
+            mask = target == col
+            if col == 'value_int':
+                parsed = pd.to_numeric(literal[mask], errors='coerce')
+                # Only integral values inside the int64 range are typed (2**63, 1e30 and
+                # inf go to value_string), and only if the text decodes back unchanged:
+                # a column with one unparsable value is read as float64 and loses digits
+                fits = (parsed.round() == parsed) & (parsed >= -2**63) & (parsed < 2**63)
+                parsed = parsed[fits].astype('Int64')
+                parsed = parsed[parsed.astype(str).eq(literal[parsed.index]).to_numpy(dtype=bool)].reindex(literal[mask].index)
+            elif col == 'value_float':
+                parsed = pd.to_numeric(literal[mask], errors='coerce').astype('Float64')
+            elif col == 'value_bool':
+                parsed = literal[mask].map({'True': True, 'False': False}).astype('boolean')
+            elif col == 'value_timestamp':
+                parsed = pd.to_datetime(literal[mask], errors='coerce', format='ISO8601', utc=True).dt.tz_localize(None)
+                # Typed only if the text decodes back unchanged: timestamps with a UTC
+                # offset or another spelling keep their exact literal in value_string
+                same = _timestamp_literals(parsed, df.loc[mask, 'object_type']).eq(literal[mask]).fillna(False)
+                parsed = parsed.where(same.astype(bool))
+            else:
+                parsed = df.loc[mask, 'object'].map(base64.b64decode)
+            fallback |= (mask & parsed.reindex(df.index).isna())
+            values[col] = parsed.reindex(df.index).astype(dtype)
+        values['value_string'] = literal.where((target == 'value_string') | fallback).astype('string')
+        typed = df.drop(columns=['object', 'literal_value'])
+        position = typed.columns.get_loc('object_type') + 1
+        for offset, col in enumerate(WPRDF_LITERAL_COLUMNS):
+            typed.insert(position + offset, col, values[col])
+        return typed
+
+    def decode_typed_literals(df, encode_object=True):
+        """Rebuild literal_value (and the base64 object column) from the value_* columns"""
+        if 'value_string' not in df.columns:
+            return df
+        literal = df['value_string'].astype(object)
+        for col in WPRDF_LITERAL_COLUMNS:
+            if col == 'value_string':
+                continue
+            present = df[col].notna()
+            if present.any():
+                present_values = df.loc[present, col]
+                # Timestamps and bytes need their scalar str() form, not the column formatter's
+                if col == 'value_timestamp':
+                    present_values = _timestamp_literals(present_values, df.loc[present, 'object_type'])
+                literal = literal.where(~present, present_values.map(str) if col == 'value_binary' else present_values.astype(str))
+        untyped = df.drop(columns=list(WPRDF_LITERAL_COLUMNS))
+        position = untyped.columns.get_loc('object_type') + 1
+        if encode_object:
+            binary = df['value_binary'].notna()
+            obj = literal.map(lambda v: base64.b64encode(v.encode('utf-8')).decode('utf-8'), na_action='ignore')
+            if binary.any():
+                obj[binary] = df.loc[binary, 'value_binary'].map(lambda v: base64.b64encode(v).decode('utf-8'))
+            untyped.insert(position, 'object', obj)
+            position += 1
+        untyped.insert(position, 'literal_value', literal)
+        return untyped
+    
+    def close_retracted(df, value_columns):
+        """Apply retraction rows: close the open triple they were copied from.
+
+        A retraction (business_validity_to set) matches an open row with the same
+        triple and the same business_validity_from, so re-inserted triples stay open.
+        """
+        closing = df['business_validity_to'].notna()
+        if not closing.any() or closing.all():
+            return df
+        if 'run_id' in df.columns:
+            runs = df.attrs.get('wprdf_runs', {})
+            valid_from = df['run_id'].map({run_id: run['business_validity_from'] for run_id, run in runs.items()})
+        else:
+            valid_from = df['business_validity_from']
+        keys = pd.util.hash_pandas_object(
+            df[['subject', 'predicate', 'object_type'] + value_columns].assign(_valid_from=valid_from), index=False
+        )
+        closed_at = df['business_validity_to'][closing].groupby(keys[closing].to_numpy()).min()
+        open_closed_at = keys[~closing].map(closed_at)
+        df = df.copy()
+        df.loc[open_closed_at.dropna().index, 'business_validity_to'] = open_closed_at.dropna()
+        return df
+
+    def merge_wprdf(*dataframes, validate=False, shapes=None):
+        """Merge multiple WPRDF dataframes; validate=True rejects inputs with violations"""
+        valid_dfs = [expand_wprdf_nodes(df) for df in dataframes if df is not None and not df.empty]
         if not valid_dfs:
-            return pd.DataFrame(columns=['subject', 'predicate', 'object_type', 'object', 'literal_value', 'technical_timestamp', 'business_validity_from', 'business_validity_to', 'author', 'app'])
-        return pd.concat(valid_dfs, ignore_index=True).drop_duplicates(subset=['subject', 'predicate', 'object_type', 'object'])
+            return pd.DataFrame(columns=WPRDF_COLUMNS)
+        if validate:
+            # Duplicates are what the merge resolves, so they are not rejected
+            checks = [check for check in WPRDF_VALIDATION_CHECKS if check != 'duplicates']
+            for position, df in enumerate(valid_dfs):
+                violations = validate_wprdf(df, shapes, checks=checks)
+                if len(violations):
+                    summary = ", ".join(f"{check}: {count}" for check, count in violations['check'].value_counts().items())
+                    raise ValueError(f"Input {position} has {len(violations)} violations ({summary})")
+        term_columns = [df.attrs.get('wprdf_term_columns') for df in valid_dfs]
+        if any(term_columns):
+            if any(columns != term_columns[0] for columns in term_columns):
+                raise ValueError("Cannot merge term-encoded and plain WPRDF frames; encode all inputs with the same term dictionary")
+            merged = _merge_wprdf(valid_dfs)
+            merged.attrs['wprdf_term_columns'] = term_columns[0]
+            return merged
+        return _merge_wprdf(valid_dfs)
+    
+    def _merge_wprdf(valid_dfs):
+        if not all('value_string' in df.columns for df in valid_dfs):
+            valid_dfs = [decode_typed_literals(df) for df in valid_dfs]
+        value_columns = list(WPRDF_LITERAL_COLUMNS) if 'value_string' in valid_dfs[0].columns else ['object']
+        if all('run_id' in df.columns for df in valid_dfs):
+            # Compact inputs stay compact: the run tables are simply unioned
+            runs = {}
+            for df in valid_dfs:
+                runs.update(df.attrs.get('wprdf_runs', {}))
+            merged = pd.concat(valid_dfs, ignore_index=True)
+            merged.attrs = {'wprdf_runs': runs}
+            return close_retracted(merged, value_columns).drop_duplicates(subset=['subject', 'predicate', 'object_type', 'business_validity_to'] + value_columns)
+        valid_dfs = [expand_wprdf(df) for df in valid_dfs]
+        merged = pd.concat(valid_dfs, ignore_index=True)
+        return close_retracted(merged, value_columns).drop_duplicates(subset=['subject', 'predicate', 'object_type', 'business_validity_to'] + value_columns)
+
+    # Validation: vectorized schema and constraint checks over WPRDF frames or
+    # Parquet batches. Violations carry the positional row number (counted
+    # across batches); row is <NA> for frame-level problems like missing columns.
+    # Per-predicate shapes are a SHACL-lite subset:
+    #   {predicate: {'datatype': 'int' | [...], 'node_kind': 'iri' | 'literal',
+    #                'pattern': regex, 'min_count': n, 'max_count': n}}
+    # Cardinality counts open triples (business_validity_to unset) per subject;
+    # min_count applies to every subject in the data.
+    WPRDF_VALIDATION_CHECKS = ('schema', 'iri', 'validity', 'duplicates', 'shapes')
+    WPRDF_VIOLATION_COLUMNS = ['row', 'check', 'column', 'predicate', 'value', 'message']
+    WPRDF_IRI_PATTERN = r'^(?:[A-Za-z][A-Za-z0-9+.-]*:|_:)[^\s<>"{}|\\^`]*$'
+    WPRDF_IRI_OBJECT_TYPES = ('iri', 'bnode')
+    
+    def _violations(batch, offset, mask, check, column, message, values=None):
+        positions = np.flatnonzero(mask)
+        if not len(positions):
+            return None
+        if values is None:
+            values = batch[column].to_numpy()[positions] if column in batch.columns else None
+        return pd.DataFrame({
+            'row': pd.array(positions + offset, dtype='Int64'), 'check': check, 'column': column,
+            'predicate': batch['predicate'].to_numpy()[positions] if 'predicate' in batch.columns else None,
+            'value': values, 'message': message
+        })
+    
+    def _frame_violation(check, column, message, value=None):
+        return pd.DataFrame({
+            'row': pd.array([None], dtype='Int64'), 'check': [check], 'column': [column],
+            'predicate': [None], 'value': [value], 'message': [message]
+        })
+    
+    def _factorized_mask(values, predicate):
+        """Evaluate predicate(uniques) once per distinct value; nulls come back as null_mask"""
+        codes, uniques = pd.factorize(values)
+        bad = np.flatnonzero(~np.asarray(predicate(pd.Series(uniques)), dtype=bool)) if len(uniques) else []
+        return np.isin(codes, bad), codes < 0
+    
+    def _parse_timestamps(values):
+        codes, uniques = pd.factorize(values)
+        parsed = pd.to_datetime(pd.Series(uniques, dtype=object), format='ISO8601', utc=True, errors='coerce')
+        return pd.DatetimeIndex(parsed).take(codes, allow_fill=True, fill_value=pd.NaT)
+    
+    def _key_hashes(batch, columns):
+        """Stable 64-bit row hash over columns, hashing every distinct value once"""
+        combined = np.zeros(len(batch), dtype='uint64')
+        for column in columns:
+            codes, uniques = pd.factorize(batch[column])
+            # Nulls (code -1) pick the extra hash appended at the end
+            hashed = np.append(pd.util.hash_array(np.asarray(uniques, dtype=object), categorize=False), np.uint64(0x9E3779B97F4A7C15))
+            combined *= np.uint64(0x100000001B3)
+            combined ^= hashed[codes]
+        return combined
+    
+    def _first_rows(values, offset):
+        """Count and first row of every distinct value, indexed by value"""
+        codes, uniques = pd.factorize(values)
+        # factorize numbers values in order of appearance, so a value first
+        # appears wherever the running maximum of the codes grows
+        first = np.flatnonzero(np.diff(np.maximum.accumulate(codes), prepend=-1) > 0) if len(codes) else codes
+        return pd.DataFrame({
+            'size': np.bincount(codes[codes >= 0], minlength=len(uniques)), 'min': first + offset
+        }, index=uniques)
+    
+    def _merge_first_rows(previous, current):
+        if previous is None:
+            return current
+        return pd.concat([previous, current]).groupby(level=0, sort=False).agg({'size': 'sum', 'min': 'min'})
+    
+    def _literal_text(batch):
+        if 'literal_value' in batch.columns:
+            return batch['literal_value']
+        return decode_typed_literals(batch, encode_object=False)['literal_value']
+    
+    def _required_columns(columns):
+        required = ['subject', 'predicate', 'object_type', 'business_validity_to']
+        required += ['run_id'] if 'run_id' in columns else WPRDF_RUN_COLUMNS
+        required += list(WPRDF_LITERAL_COLUMNS) if 'value_string' in columns else ['object', 'literal_value']
+        return required
+    
+    def wprdf_validator(shapes=None, runs=None, checks=WPRDF_VALIDATION_CHECKS):
+        """
+        Incremental validator: call validate(batch) for every DataFrame batch and
+        validate(None) once at the end to get the violations DataFrame.
+        
+        Duplicates and cardinality are tracked across batches (64-bit key hashes
+        and per-subject counts) and reported at the end; everything else is
+        checked per batch.
+        """
+        shapes = shapes or {}
+        state = {'offset': 0, 'hashes': [], 'schema_checked': False, 'cardinality': {}, 'subjects': None}
+        found = []
+        
+        def _check_schema(batch):
+            state['schema_checked'] = True
+            for column in _required_columns(batch.columns):
+                if column not in batch.columns:
+                    found.append(_frame_violation('missing_column', column, f"Required column {column} is missing"))
+            if 'run_id' in batch.columns and runs is not None:
+                for run_id, run in runs.items():
+                    for column in ('author', 'app'):
+                        if not isinstance(run.get(column), str) or not re.match(WPRDF_IRI_PATTERN, run[column]):
+                            found.append(_frame_violation('invalid_iri', column, f"Run {run_id} has an invalid {column} IRI", run.get(column)))
+        
+        def _check_iris(batch, offset):
+            for column in ('subject', 'predicate', 'author', 'app'):
+                if column not in batch.columns:
+                    continue
+                values = batch[column]
+                if pd.api.types.is_numeric_dtype(values):
+                    # Term-encoded ids: only nulls are invalid
+                    bad, null = np.zeros(len(values), dtype=bool), values.isna().to_numpy()
+                else:
+                    bad, null = _factorized_mask(values, lambda u: u.astype(str).str.match(WPRDF_IRI_PATTERN))
+                found.append(_violations(batch, offset, null, 'null_value', column, f"{column} is empty"))
+                found.append(_violations(batch, offset, bad, 'invalid_iri', column, f"{column} is not an IRI"))
+            if 'object_type' in batch.columns:
+                object_type = batch['object_type']
+                found.append(_violations(batch, offset, object_type.isna().to_numpy(), 'null_value', 'object_type', "object_type is empty"))
+                iri_objects = object_type.isin(WPRDF_IRI_OBJECT_TYPES).to_numpy()
+                if iri_objects.any():
+                    text = _literal_text(batch[iri_objects])
+                    bad, null = _factorized_mask(text, lambda u: u.astype(str).str.match(WPRDF_IRI_PATTERN))
+                    mask = np.zeros(len(batch), dtype=bool)
+                    mask[np.flatnonzero(iri_objects)[bad | null]] = True
+                    found.append(_violations(batch, offset, mask, 'invalid_iri', 'object', "IRI object is not an IRI",
+                                             values=text.to_numpy()[bad | null]))
+        
+        def _check_validity(batch, offset):
+            if 'run_id' in batch.columns:
+                known = batch['run_id'].isin(list((runs or {}).keys())).to_numpy()
+                found.append(_violations(batch, offset, ~known, 'unknown_run', 'run_id', "run_id is not in the run table"))
+                # Compact layout: the timestamps of known runs come from the run table
+                stamps = {
+                    column: batch['run_id'].map({run_id: run.get(column) for run_id, run in (runs or {}).items()})
+                    for column in ('technical_timestamp', 'business_validity_from')
+                }
+            else:
+                known = np.ones(len(batch), dtype=bool)
+                stamps = {
+                    column: batch[column] for column in ('technical_timestamp', 'business_validity_from')
+                    if column in batch.columns
+                }
+            parsed = {column: _parse_timestamps(values) for column, values in stamps.items()}
+            for column, values in parsed.items():
+                bad = np.asarray(values.isna()) & known
+                found.append(_violations(batch, offset, bad, 'invalid_timestamp', column,
+                                         f"{column} is missing or not an ISO timestamp",
+                                         values=np.asarray(stamps[column], dtype=object)[bad]))
+            if 'business_validity_from' not in parsed:
+                return
+            parsed_from = parsed['business_validity_from']
+            if 'business_validity_to' not in batch.columns:
+                return
+            closed = batch['business_validity_to'].notna().to_numpy()
+            if not closed.any():
+                return
+            positions = np.flatnonzero(closed)
+            parsed_to = _parse_timestamps(batch['business_validity_to'].to_numpy()[positions])
+            mask = np.zeros(len(batch), dtype=bool)
+            mask[positions[np.asarray(parsed_to.isna())]] = True
+            found.append(_violations(batch, offset, mask, 'invalid_timestamp', 'business_validity_to',
+                                     "business_validity_to is not an ISO timestamp"))
+            mask = np.zeros(len(batch), dtype=bool)
+            mask[positions[np.asarray(parsed_to < parsed_from.take(positions))]] = True
+            found.append(_violations(batch, offset, mask, 'validity_order', 'business_validity_to',
+                                     "business_validity_to is before business_validity_from"))
+        
+        def _check_duplicates(batch, offset):
+            value_columns = list(WPRDF_LITERAL_COLUMNS) if 'value_string' in batch.columns else ['object']
+            key = [c for c in ['subject', 'predicate', 'object_type', 'business_validity_to'] + value_columns if c in batch.columns]
+            if 'run_id' not in batch.columns and 'business_validity_from' in batch.columns:
+                key.append('business_validity_from')
+            if not key:
+                return
+            # Resolved in _finish_duplicates so duplicates across batches are found too
+            state['hashes'].append(_key_hashes(batch, key))
+        
+        def _check_shapes(batch, offset):
+            if 'predicate' not in batch.columns or 'subject' not in batch.columns:
+                return
+            open_rows = batch['business_validity_to'].isna().to_numpy() if 'business_validity_to' in batch.columns else np.ones(len(batch), dtype=bool)
+            predicates = batch['predicate']
+            positions = np.arange(offset, offset + len(batch))
+            if any('min_count' in shape for shape in shapes.values()):
+                state['subjects'] = _merge_first_rows(state['subjects'], _first_rows(batch['subject'], offset))
+            for predicate, shape in shapes.items():
+                selected = (predicates == predicate).to_numpy()
+                if not selected.any():
+                    continue
+                rows = batch[selected]
+                allowed = shape.get('datatype')
+                if allowed is not None:
+                    allowed = [allowed] if isinstance(allowed, str) else list(allowed)
+                    mask = np.zeros(len(batch), dtype=bool)
+                    mask[selected] = ~rows['object_type'].isin(allowed).to_numpy()
+                    found.append(_violations(batch, offset, mask, 'datatype', 'object_type', f"object_type must be one of {allowed}"))
+                node_kind = shape.get('node_kind')
+                if node_kind is not None:
+                    is_iri = rows['object_type'].isin(WPRDF_IRI_OBJECT_TYPES).to_numpy()
+                    mask = np.zeros(len(batch), dtype=bool)
+                    mask[selected] = ~is_iri if node_kind == 'iri' else is_iri
+                    found.append(_violations(batch, offset, mask, 'node_kind', 'object_type', f"object must be an {node_kind}"))
+                if shape.get('pattern') is not None:
+                    text = _literal_text(rows)
+                    bad, null = _factorized_mask(text, lambda u, p=shape['pattern']: u.astype(str).str.contains(p, regex=True))
+                    mask = np.zeros(len(batch), dtype=bool)
+                    mask[np.flatnonzero(selected)[bad | null]] = True
+                    found.append(_violations(batch, offset, mask, 'pattern', 'literal_value', f"value does not match {shape['pattern']}",
+                                             values=text.to_numpy()[bad | null]))
+                if 'min_count' in shape or 'max_count' in shape:
+                    counted = np.flatnonzero(selected & open_rows)
+                    counts = _first_rows(batch['subject'].take(counted), 0)
+                    counts['min'] = positions[counted[counts['min'].to_numpy()]]
+                    state['cardinality'][predicate] = _merge_first_rows(state['cardinality'].get(predicate), counts)
+        
+        def _finish_duplicates():
+            if not state['hashes']:
+                return
+            hashes = np.concatenate(state['hashes'])
+            duplicate = np.flatnonzero(pd.Series(hashes).duplicated().to_numpy())
+            if len(duplicate):
+                found.append(pd.DataFrame({
+                    'row': pd.array(duplicate, dtype='Int64'), 'check': 'duplicate', 'column': None,
+                    'predicate': None, 'value': None, 'message': "Triple duplicates an earlier row"
+                }))
+        
+        def _finish_cardinality():
+            for predicate, shape in shapes.items():
+                counts = state['cardinality'].get(predicate)
+                if counts is None:
+                    counts = pd.DataFrame({'size': pd.Series(dtype='int64'), 'min': pd.Series(dtype='int64')})
+                if 'max_count' in shape:
+                    over = counts[counts['size'] > shape['max_count']]
+                    if len(over):
+                        found.append(pd.DataFrame({
+                            'row': pd.array(over['min'].to_numpy(), dtype='Int64'), 'check': 'max_count', 'column': 'subject',
+                            'predicate': predicate, 'value': over.index.to_numpy(),
+                            'message': [f"{n} values, at most {shape['max_count']} allowed" for n in over['size']]
+                        }))
+                if 'min_count' in shape and state['subjects'] is not None:
+                    have = counts['size'].reindex(state['subjects'].index, fill_value=0)
+                    under = have[have < shape['min_count']]
+                    if len(under):
+                        found.append(pd.DataFrame({
+                            'row': pd.array(state['subjects']['min'][under.index].to_numpy(), dtype='Int64'), 'check': 'min_count',
+                            'column': 'subject', 'predicate': predicate, 'value': under.index.to_numpy(),
+                            'message': [f"{n} values, at least {shape['min_count']} required" for n in under]
+                        }))
+        
+        def validate(batch):
+            if batch is None:
+                if 'duplicates' in checks:
+                    _finish_duplicates()
+                if 'shapes' in checks:
+                    _finish_cardinality()
+                found_frames = [f for f in found if f is not None]
+                if not found_frames:
+                    return pd.DataFrame({c: pd.Series(dtype='Int64' if c == 'row' else object) for c in WPRDF_VIOLATION_COLUMNS})
+                violations = pd.concat(found_frames, ignore_index=True)
+                return violations.sort_values('row', kind='stable', na_position='first', ignore_index=True)
+            offset = state['offset']
+            if 'schema' in checks and not state['schema_checked']:
+                _check_schema(batch)
+            if 'iri' in checks:
+                _check_iris(batch, offset)
+            if 'validity' in checks:
+                _check_validity(batch, offset)
+            if 'duplicates' in checks:
+                _check_duplicates(batch, offset)
+            if 'shapes' in checks and shapes:
+                _check_shapes(batch, offset)
+            state['offset'] += len(batch)
+            return None
+        
+        return validate
+    
+    def validate_wprdf(df, shapes=None, checks=WPRDF_VALIDATION_CHECKS):
+        """Violations of one WPRDF frame (row = position in df)"""
+        df = expand_wprdf_nodes(df)
+        validate = wprdf_validator(shapes, runs=df.attrs.get('wprdf_runs'), checks=checks)
+        validate(df)
+        return validate(None)
+    
+    def validate_wprdf_parquet(source, shapes=None, checks=WPRDF_VALIDATION_CHECKS, batch_size=1048576):
+        """Violations of a Parquet file (bytes, path or file object), validated batch by batch"""
+        parquet = pq.ParquetFile(pa.BufferReader(source) if isinstance(source, bytes) else source)
+        metadata = parquet.schema_arrow.metadata or {}
+        attrs = json.loads(metadata[b'PANDAS_ATTRS']) if b'PANDAS_ATTRS' in metadata else {}
+        validate = wprdf_validator(shapes, runs=attrs.get('wprdf_runs'), checks=checks)
+        for batch in parquet.iter_batches(batch_size=batch_size):
+            validate(expand_wprdf_nodes(batch.to_pandas(), attrs.get('wprdf_nodes')))
+        return validate(None)
+
+    # Statistics catalog: computed when a dataset is written and stored as JSON
+    # under the Parquet key-value metadata key "wprdf_stats". Distinct counts
+    # are HyperLogLog sketches (2^precision one-byte registers, ~2% error at
+    # the default) so catalogs of several files combine without rescanning.
+    # Validity histograms count rows per month of business_validity_from /
+    # business_validity_to and closed intervals per log2(days) bucket.
+    WPRDF_STATS_KEY = b'wprdf_stats'
+    WPRDF_STATS_PRECISION = 11
+    
+    def _hll_sketch(hashes, precision=WPRDF_STATS_PRECISION):
+        """HyperLogLog registers (base64 of zlib) of 64-bit hashes"""
+        registers = np.zeros(1 << precision, dtype='uint8')
+        if len(hashes):
+            rest_bits = 64 - precision
+            index = (hashes >> np.uint64(rest_bits)).astype('int64')
+            rest = hashes & np.uint64((1 << rest_bits) - 1)
+            # rank = position of the first 1 bit in the remaining bits
+            bit_length = np.frexp(rest.astype('float64'))[1]
+            rank = np.where(rest == 0, rest_bits + 1, rest_bits - bit_length + 1).astype('uint8')
+            np.maximum.at(registers, index, rank)
+        return base64.b64encode(zlib.compress(registers.tobytes())).decode('ascii')
+    
+    def _stats_months(values):
+        """Rows per month ('invalid' for unparsable values) and the parsed datetime64 array"""
+        codes, uniques = pd.factorize(values)
+        parsed = pd.to_datetime(pd.Series(uniques, dtype=object), format='ISO8601', utc=True, errors='coerce').dt.tz_localize(None)
+        labels = parsed.dt.strftime('%Y-%m').fillna('invalid').to_numpy()
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        months = pd.Series(counts, index=labels).groupby(level=0).sum()
+        # Nulls (code -1) pick the NaT appended at the end
+        values = np.append(parsed.to_numpy(), np.datetime64('NaT', 'ns'))[codes]
+        return {str(k): int(v) for k, v in months.items() if v}, values
+    
+    def wprdf_stats(df, precision=WPRDF_STATS_PRECISION):
+        """Statistics catalog of a WPRDF frame (wide, compact, node or typed layout)"""
+        df = expand_wprdf_nodes(df)
+        value_columns = list(WPRDF_LITERAL_COLUMNS) if 'value_string' in df.columns else ['object']
+        subject_hashes = _key_hashes(df, ['subject'])
+        object_hashes = _key_hashes(df, ['object_type'] + [c for c in value_columns if c in df.columns])
+        open_rows = df['business_validity_to'].isna().to_numpy() if 'business_validity_to' in df.columns else np.ones(len(df), dtype=bool)
+        catalog = {
+            'version': 1, 'precision': precision, 'rows': int(len(df)),
+            'nulls': {column: int(count) for column, count in df.isna().sum().items()},
+            'subjects': _hll_sketch(subject_hashes, precision),
+            'objects': _hll_sketch(object_hashes, precision),
+            'predicates': {},
+        }
+        
+        codes, predicates = pd.factorize(df['predicate'])
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(predicates) + 1))
+        for i, predicate in enumerate(predicates):
+            rows = order[bounds[i]:bounds[i + 1]]
+            catalog['predicates'][str(predicate)] = {
+                'rows': int(len(rows)), 'open': int(open_rows[rows].sum()),
+                'subjects': _hll_sketch(subject_hashes[rows], precision),
+                'objects': _hll_sketch(object_hashes[rows], precision),
+                'object_types': {str(k): int(v) for k, v in df['object_type'].take(rows).value_counts().items()},
+            }
+        
+        if 'run_id' in df.columns:
+            runs = df.attrs.get('wprdf_runs', {})
+            valid_from = df['run_id'].map({run_id: run['business_validity_from'] for run_id, run in runs.items()})
+        else:
+            valid_from = df['business_validity_from']
+        from_months, parsed_from = _stats_months(valid_from)
+        to_months, durations = {}, {}
+        if (~open_rows).any():
+            to_months, parsed_to = _stats_months(df['business_validity_to'][~open_rows])
+            days = (parsed_to - parsed_from[~open_rows]) / np.timedelta64(1, 'D')
+            days = days[~np.isnan(days)]
+            # -1: ends before it starts, 0: under a day, k: [2^(k-1), 2^k) days
+            buckets = np.where(days < 0, -1, np.where(days < 1, 0, np.floor(np.log2(np.maximum(days, 1))) + 1)).astype('int64')
+            durations = {str(k): int(v) for k, v in zip(*np.unique(buckets, return_counts=True))}
+        catalog['validity'] = {'from_months': from_months, 'to_months': to_months, 'duration_log2_days': durations}
+        return catalog
+    
+    def _hll_registers(sketch):
+        return np.frombuffer(zlib.decompress(base64.b64decode(sketch)), dtype='uint8')
+    
+    def _hll_count(sketch):
+        registers = _hll_registers(sketch).astype('float64')
+        m = len(registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / np.exp2(-registers).sum()
+        zeros = np.count_nonzero(registers == 0)
+        if estimate <= 2.5 * m and zeros:
+            # Small cardinalities: linear counting is more accurate
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+    
+    def _hll_union(sketches):
+        registers = np.maximum.reduce([_hll_registers(sketch) for sketch in sketches])
+        return base64.b64encode(zlib.compress(registers.tobytes())).decode('ascii')
+    
+    def _sum_counts(counts):
+        total = collections.Counter()
+        for count in counts:
+            total.update(count)
+        return dict(total)
+    
+    def merge_wprdf_stats(*catalogs):
+        """
+        Combine the catalogs of several datasets without reading their rows.
+        
+        Distinct counts are exact sketch unions; row, null and histogram counts
+        are sums, i.e. what the inputs hold before merge_wprdf deduplicates.
+        """
+        catalogs = [catalog for catalog in catalogs if catalog]
+        if not catalogs:
+            return None
+        if len({catalog['precision'] for catalog in catalogs}) > 1:
+            raise ValueError("Cannot merge statistics catalogs with different precisions")
+        predicates = collections.defaultdict(list)
+        for catalog in catalogs:
+            for predicate, stats in catalog['predicates'].items():
+                predicates[predicate].append(stats)
+        return {
+            'version': 1, 'precision': catalogs[0]['precision'],
+            'rows': sum(catalog['rows'] for catalog in catalogs),
+            'nulls': _sum_counts(catalog['nulls'] for catalog in catalogs),
+            'subjects': _hll_union([catalog['subjects'] for catalog in catalogs]),
+            'objects': _hll_union([catalog['objects'] for catalog in catalogs]),
+            'predicates': {
+                predicate: {
+                    'rows': sum(s['rows'] for s in stats), 'open': sum(s['open'] for s in stats),
+                    'subjects': _hll_union([s['subjects'] for s in stats]),
+                    'objects': _hll_union([s['objects'] for s in stats]),
+                    'object_types': _sum_counts(s['object_types'] for s in stats),
+                }
+                for predicate, stats in predicates.items()
+            },
+            'validity': {
+                key: _sum_counts(catalog['validity'][key] for catalog in catalogs)
+                for key in ('from_months', 'to_months', 'duration_log2_days')
+            },
+        }
+    
+    def read_wprdf_stats(source):
+        """Catalog stored in a Parquet file's footer (bytes, path or file object), or None"""
+        schema = pq.read_schema(pa.BufferReader(source) if isinstance(source, bytes) else source)
+        metadata = schema.metadata or {}
+        return json.loads(metadata[WPRDF_STATS_KEY]) if WPRDF_STATS_KEY in metadata else None
+    
+    def wprdf_stats_summary(catalog):
+        """Per-predicate table of a catalog, with an '(all)' row for the whole dataset"""
+        rows = [{
+            'predicate': '(all)', 'rows': catalog['rows'],
+            'open': sum(stats['open'] for stats in catalog['predicates'].values()),
+            'distinct_subjects': _hll_count(catalog['subjects']), 'distinct_objects': _hll_count(catalog['objects']),
+            'object_types': ", ".join(sorted(_sum_counts(s['object_types'] for s in catalog['predicates'].values()))),
+        }]
+        for predicate, stats in sorted(catalog['predicates'].items(), key=lambda item: -item[1]['rows']):
+            rows.append({
+                'predicate': predicate, 'rows': stats['rows'], 'open': stats['open'],
+                'distinct_subjects': _hll_count(stats['subjects']), 'distinct_objects': _hll_count(stats['objects']),
+                'object_types': ", ".join(f"{k} ({v:,})" for k, v in sorted(stats['object_types'].items(), key=lambda item: -item[1])),
+            })
+        return pd.DataFrame(rows)
+
+    WPRDF_IPC_MIME = "application/vnd.apache.arrow.stream"
+    
+    def write_wprdf_ipc(df, batch_size=65536):
+        """Serialize a WPRDF DataFrame as an Arrow IPC stream; df.attrs (run tables) travel in the schema metadata"""
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        # Dictionary batches would stall the incremental decoder until the end of the stream
+        table = table.cast(pa.schema([
+            pa.field(f.name, f.type.value_type) if pa.types.is_dictionary(f.type) else f
+            for f in table.schema
+        ], metadata=table.schema.metadata))
+        if df.attrs:
+            table = table.replace_schema_metadata({
+                **(table.schema.metadata or {}),
+                b'PANDAS_ATTRS': json.dumps(df.attrs, default=str).encode('utf-8')
+            })
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            for batch in table.to_batches(batch_size):
+                writer.write_batch(batch)
+        return sink.getvalue().to_pybytes()
+    
+    def _ipc_attrs(schema):
+        metadata = schema.metadata or {}
+        return json.loads(metadata[b'PANDAS_ATTRS']) if b'PANDAS_ATTRS' in metadata else {}
+    
+    def _ipc_frame(batches, schema):
+        df = pa.Table.from_batches(batches, schema=schema).to_pandas()
+        df.attrs = _ipc_attrs(schema)
+        return df
+    
+    def read_wprdf_ipc(data):
+        """Read a complete Arrow IPC stream (bytes or file-like) into a WPRDF DataFrame"""
+        reader = pa.ipc.open_stream(data)
+        return _ipc_frame(list(reader), reader.schema)
+    
+    def wprdf_ipc_decoder():
+        """
+        Incremental Arrow IPC stream decoder.
+        
+        Returns feed(chunk) which accepts the next bytes of the stream and returns
+        the DataFrames of all record batches completed so far; feed(None) marks the
+        end of the stream. Streams with dictionary batches are decoded at the end.
+        """
+        pending = bytearray()
+        state = {'schema': None, 'header': b'', 'buffered': False, 'done': False}
+        
+        def feed(chunk):
+            if state['done']:
+                return []
+            if chunk is None:
+                state['done'] = True
+                if state['buffered']:
+                    reader = pa.ipc.open_stream(bytes(pending))
+                    return [_ipc_frame([batch], reader.schema) for batch in reader]
+                if pending:
+                    raise ValueError(f"Truncated Arrow IPC stream ({len(pending)} trailing bytes)")
+                return []
+            pending.extend(chunk)
+            if state['buffered']:
+                return []
+            
+            frames = []
+            while pending:
+                reader = pa.BufferReader(bytes(pending))
+                try:
+                    message = pa.ipc.read_message(reader)
+                except EOFError:
+                    pending.clear()
+                    state['done'] = True
+                    break
+                except (pa.ArrowInvalid, OSError):
+                    # Message not complete yet, wait for more bytes
+                    break
+                consumed = reader.tell()
+                if state['schema'] is None:
+                    state['schema'] = pa.ipc.read_schema(message)
+                    state['header'] = bytes(pending[:consumed])
+                elif message.type == 'dictionary':
+                    pending[:0] = state['header']
+                    state['buffered'] = True
+                    break
+                else:
+                    frames.append(_ipc_frame([pa.ipc.read_record_batch(message, state['schema'])], state['schema']))
+                del pending[:consumed]
+            return frames
+        
+        return feed
+    
+    def iter_wprdf_ipc(chunks):
+        """Yield one WPRDF DataFrame per record batch from an iterable of IPC stream byte chunks"""
+        feed = wprdf_ipc_decoder()
+        for chunk in chunks:
+            yield from feed(chunk)
+        yield from feed(None)
+    
+    def read_wprdf_upload(file):
+        """Read an uploaded WPRDF file (.csv, .parquet or Arrow IPC .arrows/.arrow)"""
+        name = file.name.lower()
+        if name.endswith('.parquet'):
+            return pd.read_parquet(BytesIO(file.contents))
+        if name.endswith(('.arrows', '.arrow')):
+            return read_wprdf_ipc(file.contents)
+        return pd.read_csv(BytesIO(file.contents))
+    
+    async def fetch_wprdf_dataset(url, on_batch=None, chunk_size=1 << 20):
+        """
+        Download a WPRDF dataset served as an Arrow IPC stream.
+        
+        Record batches are decoded as the response body arrives; on_batch(df)
+        receives the rows loaded so far, e.g. to refresh a preview.
+        """
+        feed = wprdf_ipc_decoder()
+        frames = []
+        
+        def _consume(chunk):
+            new_frames = feed(chunk)
+            if new_frames:
+                frames.extend(new_frames)
+                if on_batch is not None:
+                    on_batch(pd.concat(frames, ignore_index=True))
+        
+        if "pyodide" in sys.modules:
+            from pyodide.http import pyfetch
+            response = await pyfetch(url)
+            if not response.ok:
+                raise RuntimeError(f"Fetching {url} failed: HTTP {response.status}")
+            body = response.js_response.body.getReader()
+            while True:
+                result = await body.read()
+                if result.done:
+                    break
+                _consume(result.value.to_py())
+        else:
+            import urllib.request
+            with urllib.request.urlopen(url) as response:
+                while chunk := response.read(chunk_size):
+                    _consume(chunk)
+        _consume(None)
+        
+        if not frames:
+            return pd.DataFrame(columns=WPRDF_COLUMNS)
+        df = pd.concat(frames, ignore_index=True)
+        df.attrs = frames[0].attrs
+        return df
+    
+    async def _send(url, data, method, content_type):
+        if "pyodide" in sys.modules:
+            from pyodide.http import pyfetch
+            response = await pyfetch(url, method=method, body=data, headers={"Content-Type": content_type})
+            if not response.ok:
+                raise RuntimeError(f"{method} {url} failed: HTTP {response.status}")
+            return await response.json()
+        import urllib.request
+        request = urllib.request.Request(url, data=data, method=method, headers={"Content-Type": content_type})
+        with urllib.request.urlopen(request) as response:
+            return json.loads(response.read())
+    
+    async def upload_wprdf_dataset(url, df):
+        """Upload a WPRDF DataFrame to the server dataset store as an Arrow IPC stream"""
+        return await _send(url, write_wprdf_ipc(df), "PUT", WPRDF_IPC_MIME)
+    
+    WPRDF_TERM_COLUMNS = ['subject', 'predicate', 'author', 'app']
+    
+    def wprdf_term_dictionary(base_url="/api/terms", cache_size=262144, request_size=50000):
+        """
+        Client-side view of the server's global IRI term dictionary.
+        
+        Returns async (encode_terms, decode_terms) functions sharing an LRU cache
+        in both directions; only cache misses are sent to the server, in bulk.
+        """
+        ids = collections.OrderedDict()
+        iris = collections.OrderedDict()
+        
+        def _remember(iri, term_id):
+            ids[iri] = term_id
+            iris[term_id] = iri
+            ids.move_to_end(iri)
+            iris.move_to_end(term_id)
+            while len(ids) > cache_size:
+                ids.popitem(last=False)
+            while len(iris) > cache_size:
+                iris.popitem(last=False)
+        
+        async def _resolve(keys, cache, path, payload_key, result_key, extra=None):
+            # Read hits before the first await: a concurrent call may evict
+            # them from the shared cache while this one waits on the server
+            resolved = {}
+            missing = []
+            for key in dict.fromkeys(keys):
+                value = cache.get(key)
+                if value is None:
+                    missing.append(key)
+                else:
+                    cache.move_to_end(key)
+                    resolved[key] = value
+            for start in range(0, len(missing), request_size):
+                chunk = missing[start:start + request_size]
+                payload = json.dumps({payload_key: chunk, **(extra or {})}).encode('utf-8')
+                response = await _send(f"{base_url}/{path}", payload, "POST", "application/json")
+                resolved.update(zip(chunk, response[result_key]))
+            result = [resolved[key] for key in keys]
+            for key in missing:
+                value = resolved[key]
+                if value is None:
+                    continue
+                if cache is ids:
+                    _remember(key, value)
+                else:
+                    _remember(value, key)
+            return result
+        
+        async def encode_terms(values, create=True):
+            """IRIs -> int64 ids (None for unknown IRIs when create is False)"""
+            return await _resolve(list(values), ids, "encode", "iris", "ids", {"create": create})
+        
+        async def decode_terms(values):
+            """int64 ids -> IRIs (None for unknown ids)"""
+            return await _resolve([int(v) for v in values], iris, "decode", "ids", "iris")
+        
+        return encode_terms, decode_terms
+    
+    async def encode_wprdf_terms(df, encode_terms, columns=None):
+        """Replace IRI columns with their int64 term ids so joins and dedup compare integers"""
+        columns = [c for c in (columns or WPRDF_TERM_COLUMNS) if c in df.columns]
+        encoded = df.copy()
+        for col in columns:
+            codes, uniques = pd.factorize(df[col])
+            term_ids = pd.array(await encode_terms(uniques.tolist()), dtype='Int64')
+            encoded[col] = pd.api.extensions.take(term_ids, codes, allow_fill=True)
+        encoded.attrs['wprdf_term_columns'] = columns
+        return encoded
+    
+    async def decode_wprdf_terms(df, decode_terms):
+        """Restore the IRI columns of a term-encoded WPRDF frame"""
+        columns = df.attrs.get('wprdf_term_columns', [])
+        decoded = df.copy()
+        for col in columns:
+            codes, uniques = pd.factorize(df[col])
+            term_iris = np.asarray(await decode_terms(uniques.tolist()), dtype=object)
+            decoded[col] = pd.api.extensions.take(term_iris, codes, allow_fill=True)
+        decoded.attrs = {k: v for k, v in df.attrs.items() if k != 'wprdf_term_columns'}
+        return decoded
+
+    # Lazy preview: results are kept as in-memory Parquet and only the row
+    # groups a page needs are decoded, so millions of triples never have to be
+    # materialized for mo.ui.table.
+    WPRDF_PREVIEW_ROW_GROUP_SIZE = 16384
+    WPRDF_PREVIEW_PAGE_SIZE = 50
+    
+    def wprdf_preview_source(df, row_group_size=WPRDF_PREVIEW_ROW_GROUP_SIZE, stats=None):
+        """Serialize a WPRDF result to Parquet bytes with small row groups for paging"""
+        if df is None:
+            return None
+        if stats is None:
+            return df.to_parquet(index=False, row_group_size=row_group_size)
+        # Same file as to_parquet(), plus the statistics catalog in the footer
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = {**(table.schema.metadata or {}), WPRDF_STATS_KEY: json.dumps(stats).encode('utf-8')}
+        if df.attrs:
+            metadata[b'PANDAS_ATTRS'] = json.dumps(df.attrs, default=str).encode('utf-8')
+        sink = pa.BufferOutputStream()
+        pq.write_table(table.replace_schema_metadata(metadata), sink, row_group_size=row_group_size)
+        return sink.getvalue().to_pybytes()
+    
+    def wprdf_preview_columns(source):
+        """Column names of a preview source"""
+        return [] if source is None else pq.read_schema(pa.BufferReader(source)).names
+    
+    def _preview_search_mask(table, search):
+        mask = None
+        for column in table.columns:
+            if not (pa.types.is_string(column.type) or pa.types.is_large_string(column.type)):
+                continue
+            hit = pc.fill_null(pc.match_substring(column, search, ignore_case=True), False)
+            mask = hit if mask is None else pc.or_(mask, hit)
+        return mask if mask is not None else pa.array([False] * table.num_rows)
+    
+    def read_wprdf_preview(source, page=1, page_size=WPRDF_PREVIEW_PAGE_SIZE, sort_by=None, descending=False, search=None):
+        """
+        One page of a Parquet preview source plus the number of matching rows.
+        
+        Without sort/search only the row groups overlapping the page are read.
+        Search (case-insensitive substring over text columns) and sort stream
+        the row groups and keep at most page * page_size rows in memory.
+        """
+        parquet = pq.ParquetFile(pa.BufferReader(source))
+        start = (max(int(page), 1) - 1) * page_size
+        
+        if not sort_by and not search:
+            total = parquet.metadata.num_rows
+            groups, first, offset = [], None, 0
+            for i in range(parquet.num_row_groups):
+                rows = parquet.metadata.row_group(i).num_rows
+                if offset + rows > start and offset < start + page_size:
+                    first = offset if first is None else first
+                    groups.append(i)
+                offset += rows
+            if not groups:
+                return parquet.schema_arrow.empty_table().to_pandas(), total
+            return parquet.read_row_groups(groups).slice(start - first, page_size).to_pandas(), total
+        
+        keep = start + page_size
+        order = [(sort_by, "descending" if descending else "ascending")] if sort_by else None
+        kept, total = None, 0
+        for i in range(parquet.num_row_groups):
+            table = parquet.read_row_group(i)
+            if search:
+                table = table.filter(_preview_search_mask(table, search))
+            total += table.num_rows
+            if order is None and kept is not None and kept.num_rows >= keep:
+                # Unsorted search only needs to keep counting matches
+                continue
+            kept = table if kept is None else pa.concat_tables([kept, table])
+            if order is not None and kept.num_rows > keep:
+                kept = kept.take(pc.select_k_unstable(kept, keep, order))
+        if kept is None:
+            return parquet.schema_arrow.empty_table().to_pandas(), 0
+        if order is not None:
+            kept = kept.sort_by(order)
+        return kept.slice(start, page_size).to_pandas(), total
 
-    return BytesIO, io, merge_wprdf, pd
+    return (
+        BytesIO,
+        WPRDF_COLUMNS,
+        WPRDF_IPC_MIME,
+        WPRDF_LITERAL_COLUMNS,
+        WPRDF_LITERAL_TYPES,
+        WPRDF_PREVIEW_PAGE_SIZE,
+        WPRDF_PREVIEW_ROW_GROUP_SIZE,
+        WPRDF_RUN_COLUMNS,
+        WPRDF_STATS_KEY,
+        WPRDF_STATS_PRECISION,
+        WPRDF_TERM_COLUMNS,
+        WPRDF_VALIDATION_CHECKS,
+        WPRDF_VIOLATION_COLUMNS,
+        base64,
+        close_retracted,
+        collections,
+        decode_typed_literals,
+        decode_wprdf_terms,
+        encode_typed_literals,
+        encode_wprdf_terms,
+        expand_wprdf,
+        expand_wprdf_nodes,
+        fetch_wprdf_dataset,
+        io,
+        iter_wprdf_ipc,
+        json,
+        merge_wprdf,
+        merge_wprdf_stats,
+        np,
+        pa,
+        pc,
+        pd,
+        pq,
+        read_wprdf_ipc,
+        read_wprdf_preview,
+        re,
+        read_wprdf_stats,
+        read_wprdf_upload,
+        upload_wprdf_dataset,
+        validate_wprdf,
+        validate_wprdf_parquet,
+        wprdf_ipc_decoder,
+        wprdf_node_subjects,
+        wprdf_preview_columns,
+        wprdf_preview_source,
+        wprdf_stats,
+        wprdf_stats_summary,
+        wprdf_term_dictionary,
+        wprdf_validator,
+        write_wprdf_ipc,
+        zlib,
+    )
 
 @app.cell(hide_code=True)
 def __(mo):
@@ -66,34 +1134,177 @@ def __(mo):
         ### Usage:
         ```python
         import merge_wprdf
-        merged_df = merge_wprdf.merge_wprdf([df1, df2, df3])
+        merged_df = merge_wprdf.merge_wprdf(df1, df2, df3)
+        
+        # Validation: violations with row numbers, optional per-predicate shapes
+        shapes = {"urn:column:age": {"datatype": "int", "max_count": 1, "pattern": r"^\d+$"}}
+        violations = merge_wprdf.validate_wprdf(merged_df, shapes)
+        violations = merge_wprdf.validate_wprdf_parquet("big.parquet", shapes)  # batch by batch
+        merged_df = merge_wprdf.merge_wprdf(df1, df2, validate=True, shapes=shapes)  # ValueError on violations
+        
+        # Statistics catalogs: read from Parquet footers, combined without rescanning
+        catalog = merge_wprdf.merge_wprdf_stats(
+            merge_wprdf.read_wprdf_stats("a.parquet"), merge_wprdf.wprdf_stats(df2)
+        )
+        merge_wprdf.wprdf_stats_summary(catalog)  # rows, open and distinct subjects/objects per predicate
+        
+        # Arrow IPC transport to/from the server dataset store
+        await merge_wprdf.upload_wprdf_dataset("/api/datasets/merged", merged_df)
+        df = await merge_wprdf.fetch_wprdf_dataset(
+            "/api/datasets/merged", on_batch=lambda rows: mo.output.replace(mo.ui.table(rows))
+        )
         ```
         
         ### Features:
         - **Deduplication**: Automatically removes duplicate triples (subject-predicate-object-type combinations).
-        - **Schema Alignment**: Ensures all DataFrames follow the standard WPRDF schema before merging.
-        - **Validation**: Checks that all inputs are valid Pandas DataFrames.
+        - **Retractions**: Incremental deltas from `excel2wprdf`/`csv2wprdf` close the matching open triples via `business_validity_to`.
+        - **Ingestion Runs**: Compact inputs keep their `run_id` references and the run tables are unioned; mixed inputs are expanded to the wide schema first.
+        - **Node Subjects**: Inputs in the `json2wprdf(..., nodes=True)` layout get their path subjects back from the node table (`expand_wprdf_nodes`) before merging, validation and statistics.
+        - **Typed Literals**: Typed inputs are deduplicated on their `value_*` columns; if only some inputs are typed, they are decoded back to `object`/`literal_value` first.
+        - **Validation**: `validate_wprdf` / `validate_wprdf_parquet` report missing columns, empty or invalid IRIs, unparsable timestamps, `business_validity_to` before `business_validity_from`, unknown runs and duplicate triples, plus per-predicate datatype, node kind, pattern and cardinality shapes, each with its row number. `merge_wprdf(..., validate=True)` rejects invalid inputs; merged results are validated in the preview.
+        - **Statistics Catalog**: `wprdf_stats` records per-predicate row and open-triple counts, distinct subjects/objects (HyperLogLog sketches), object types, null counts per column and validity histograms by month and by interval length. The catalog is stored in the Parquet footer under `wprdf_stats` (`excel2wprdf.write_wprdf_parquet` writes it too, and the merged output carries the catalog of its own rows) and `merge_wprdf_stats` combines catalogs of several files without reading their rows.
+        - **Term Dictionary**: `encode_wprdf_terms` swaps subject/predicate/author/app IRIs for int64 ids from the server's global dictionary (LRU-cached client-side via `wprdf_term_dictionary`), so merges deduplicate on integers; `decode_wprdf_terms` restores the IRIs.
+        - **Lazy Preview**: The merged result is kept as in-memory Parquet and paged by row group (`read_wprdf_preview`), with streaming filter and sort.
+        - **Arrow IPC Streaming**: Reads and writes `.arrows` streams (run tables included); server datasets are decoded batch by batch as they download, so previews appear before the transfer completes.
         """
     )
     return
 
 @app.cell
-def __(merge_wprdf, merge_wprdf_file_input, mo, pd, io):
+def __(mo):
+    merge_wprdf_file_input = mo.ui.file(
+        label="Upload WPRDF Files", filetypes=[".csv", ".parquet", ".arrows", ".arrow"], multiple=True
+    )
+    return (merge_wprdf_file_input,)
+
+@app.cell
+def __(
+    merge_wprdf,
+    merge_wprdf_file_input,
+    read_wprdf_upload,
+    wprdf_preview_source,
+    wprdf_stats,
+):
     def _merge_action():
         if not merge_wprdf_file_input.value:
             return None
-        dfs = [pd.read_csv(io.BytesIO(f.contents)) for f in merge_wprdf_file_input.value]
-        return merge_wprdf(*dfs)
+        merged = merge_wprdf(*[read_wprdf_upload(f) for f in merge_wprdf_file_input.value])
+        # The footer describes the merged rows (after deduplication and
+        # retractions), so merging the file again does not double-count
+        return wprdf_preview_source(merged, stats=wprdf_stats(merged))
+
+    merge_wprdf_output_parquet = _merge_action()
+    return (merge_wprdf_output_parquet,)
+
+@app.cell
+def __(merge_wprdf_output_parquet, mo, pd, read_wprdf_stats, wprdf_stats_summary):
+    # Read back from the footer only: no rows are decoded
+    _catalog = read_wprdf_stats(merge_wprdf_output_parquet) if merge_wprdf_output_parquet is not None else None
+    if _catalog is not None:
+        _nulls = pd.DataFrame({
+            'nulls': pd.Series(_catalog['nulls'], dtype='int64'),
+            'null_rate': pd.Series(_catalog['nulls'], dtype='float64') / max(_catalog['rows'], 1),
+        })
+        _validity = _catalog['validity']
+        merge_wprdf_stats_view = mo.accordion({
+            "📊 Statistics": mo.vstack([
+                mo.ui.table(wprdf_stats_summary(_catalog), selection=None),
+                mo.hstack([
+                    mo.ui.table(_nulls.rename_axis('column').reset_index(), selection=None, label="Null rates"),
+                    mo.ui.table(
+                        pd.DataFrame({
+                            'valid_from': pd.Series(_validity['from_months'], dtype='int64'),
+                            'valid_to': pd.Series(_validity['to_months'], dtype='int64'),
+                        }).fillna(0).astype('int64').rename_axis('month').reset_index(),
+                        selection=None, label="Validity by month"
+                    ),
+                    mo.ui.table(
+                        pd.Series(_validity['duration_log2_days'], dtype='int64')
+                        .rename_axis('log2_days').rename('intervals').reset_index(),
+                        selection=None, label="Closed interval durations"
+                    ),
+                ], align="start"),
+            ])
+        })
+    else:
+        merge_wprdf_stats_view = None
+    return (merge_wprdf_stats_view,)
+
+@app.cell
+def __(merge_wprdf_output_parquet, mo, validate_wprdf_parquet):
+    if merge_wprdf_output_parquet is not None:
+        _violations = validate_wprdf_parquet(merge_wprdf_output_parquet)
+        if len(_violations):
+            _summary = ", ".join(f"{check}: {count:,}" for check, count in _violations['check'].value_counts().items())
+            merge_wprdf_validation = mo.vstack([
+                mo.md(f"⚠️ **{len(_violations):,} violations** ({_summary})"),
+                mo.ui.table(_violations.head(1000), selection=None)
+            ])
+        else:
+            merge_wprdf_validation = mo.md("✅ _No schema, IRI, validity or duplicate violations_")
+    else:
+        merge_wprdf_validation = None
+    return (merge_wprdf_validation,)
 
-    merge_wprdf_output_df = _merge_action()
-    return (merge_wprdf_output_df,)
+@app.cell
+def __(merge_wprdf_output_parquet, mo, wprdf_preview_columns):
+    merge_wprdf_preview_controls = mo.ui.dictionary({
+        "search": mo.ui.text(label="Filter", placeholder="Text in any column"),
+        "sort_by": mo.ui.dropdown(
+            options=["(none)"] + wprdf_preview_columns(merge_wprdf_output_parquet), value="(none)", label="Sort by"
+        ),
+        "descending": mo.ui.checkbox(label="Descending"),
+        "page": mo.ui.number(start=1, step=1, value=1, label="Page"),
+    })
+    return (merge_wprdf_preview_controls,)
 
 @app.cell
-def __(merge_wprdf_file_input, merge_wprdf_output_df, mo):
-    mo.vstack([
-        merge_wprdf_file_input,
-        mo.ui.table(merge_wprdf_output_df) if merge_wprdf_output_df is not None else mo.md("_Upload CSVs to merge_")
-    ])
+def __(
+    BytesIO,
+    WPRDF_PREVIEW_PAGE_SIZE,
+    merge_wprdf_file_input,
+    merge_wprdf_output_parquet,
+    merge_wprdf_preview_controls,
+    merge_wprdf_stats_view,
+    merge_wprdf_validation,
+    mo,
+    pd,
+    read_wprdf_preview,
+    write_wprdf_ipc,
+):
+    if merge_wprdf_output_parquet is not None:
+        _controls = merge_wprdf_preview_controls.value
+        _page, _total = read_wprdf_preview(
+            merge_wprdf_output_parquet,
+            page=_controls["page"] or 1,
+            sort_by=None if _controls["sort_by"] == "(none)" else _controls["sort_by"],
+            descending=_controls["descending"],
+            search=_controls["search"] or None
+        )
+        _first = ((_controls["page"] or 1) - 1) * WPRDF_PREVIEW_PAGE_SIZE
+        _content = mo.vstack([
+            merge_wprdf_preview_controls.hstack(),
+            mo.ui.table(_page, pagination=False, selection=None),
+            mo.md(f"_Rows {_first + 1 if len(_page) else 0}–{_first + len(_page)} of {_total:,}_"),
+            merge_wprdf_validation,
+            merge_wprdf_stats_view,
+            mo.hstack([
+                mo.download(
+                    data=merge_wprdf_output_parquet,
+                    filename="merged_wprdf.parquet",
+                    label="Download WPRDF Parquet"
+                ),
+                mo.download(
+                    data=lambda: write_wprdf_ipc(pd.read_parquet(BytesIO(merge_wprdf_output_parquet))),
+                    filename="merged_wprdf.arrows",
+                    mimetype="application/vnd.apache.arrow.stream",
+                    label="Download Arrow IPC Stream"
+                )
+            ])
+        ])
+    else:
+        _content = mo.md("_Upload CSV, Parquet or Arrow IPC files to merge_")
+    mo.vstack([merge_wprdf_file_input, _content])
     return
 
 if __name__ == "__main__":
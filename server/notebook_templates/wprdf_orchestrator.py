@@ -20,12 +20,17 @@ async def __():
             import micropip
             
         _pkgs = []
-        # Check if pandas is already available
+        # Check if pandas and pyarrow are already available
         if "pandas" not in sys.modules:
             try:
                 import pandas as pd
             except ImportError:
                 _pkgs.append("pandas")
+        if "pyarrow" not in sys.modules:
+            try:
+                import pyarrow
+            except ImportError:
+                _pkgs.append("pyarrow")
         
         if _pkgs:
             await micropip.install(_pkgs)
@@ -34,7 +39,7 @@ async def __():
 
 @app.cell(hide_code=True)
 def __(sys):
-    # 2. Core Logic: Imports
+    # 2. Core Logic: Imports & Pipeline Scheduler
     # WPRDF: Defensive imports - check sys.modules first to avoid redundant loading in WASM.
     # This ensures we use the already-initialized environment and avoid "Variable redefined" errors.
     pd = sys.modules.get("pandas")
@@ -43,7 +48,234 @@ def __(sys):
     io = sys.modules.get("io")
     if io is None: import io
     
-    return io, pd
+    asyncio = sys.modules.get("asyncio")
+    if asyncio is None: import asyncio
+    
+    hashlib = sys.modules.get("hashlib")
+    if hashlib is None: import hashlib
+    
+    inspect = sys.modules.get("inspect")
+    if inspect is None: import inspect
+    
+    json = sys.modules.get("json")
+    if json is None: import json
+    
+    pickle = sys.modules.get("pickle")
+    if pickle is None: import pickle
+    
+    time = sys.modules.get("time")
+    if time is None: import time
+    
+    types = sys.modules.get("types")
+    if types is None: import types
+    
+    if "pathlib" in sys.modules:
+        from pathlib import Path
+    else:
+        from pathlib import Path
+    
+    # Pipeline DAG: each step names the steps whose outputs it consumes, and
+    # its output is cached under a key derived from its code, its parameters
+    # and the keys of its inputs. Unchanged steps are read back from the
+    # cache; the rest run as soon as their inputs are ready, independent
+    # steps concurrently. In WASM the default directory lives in the
+    # in-memory home; mount OPFS there to keep results across reloads.
+    WPRDF_PIPELINE_CACHE_DIR = Path.home() / ".wprdf" / "pipeline_cache"
+    
+    def create_pipeline_step(name, func, inputs=(), params=None):
+        """One pipeline step: func(*input_outputs, **params)"""
+        return {'name': name, 'func': func, 'inputs': list(inputs), 'params': dict(params or {})}
+    
+    def _content_hash(value):
+        digest = hashlib.sha256()
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            digest.update(b'bytes:' + bytes(value))
+        elif isinstance(value, pd.DataFrame):
+            digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+            digest.update(json.dumps([list(map(str, value.columns)), value.attrs], default=str, sort_keys=True).encode('utf-8'))
+        else:
+            digest.update(json.dumps(value, default=repr, sort_keys=True).encode('utf-8'))
+        return digest.hexdigest()
+    
+    def _code_digest(digest, code):
+        # Bytecode, names and constants; marshal.dumps() is not stable (it
+        # depends on reference counts) and notebook code has no source file
+        digest.update(code.co_code)
+        digest.update(repr(code.co_names).encode('utf-8'))
+        for const in code.co_consts:
+            if isinstance(const, types.CodeType):
+                _code_digest(digest, const)
+            elif isinstance(const, frozenset):
+                digest.update(repr(sorted(map(repr, const))).encode('utf-8'))
+            else:
+                digest.update(repr(const).encode('utf-8'))
+    
+    def _pipeline_functions(func):
+        """func and every notebook function reachable through module globals.
+
+        Helpers a notebook takes from another notebook via wprdf_import are
+        followed into that notebook; library functions (defined in modules
+        with a __file__) are not.
+        """
+        functions, pending = {}, [func]
+        while pending:
+            value = pending.pop()
+            name = f"{value.__module__}.{value.__qualname__}"
+            if name in functions:
+                continue
+            functions[name] = value
+            namespace = getattr(value, '__globals__', {})
+            for other in namespace.values():
+                if isinstance(other, types.FunctionType) and (other.__globals__ is namespace or '__file__' not in other.__globals__):
+                    pending.append(other)
+        return functions
+    
+    def pipeline_code_hash(func):
+        """Hash of every function func can reach in its own and imported notebooks, so helper changes count too"""
+        digest = hashlib.sha256()
+        functions = _pipeline_functions(func)
+        for name in sorted(functions):
+            digest.update(name.encode('utf-8'))
+            code = getattr(functions[name], '__code__', None)
+            if code is None:
+                digest.update(repr(functions[name]).encode('utf-8'))
+            else:
+                _code_digest(digest, code)
+        return digest.hexdigest()
+    
+    def _pipeline_order(steps):
+        """Steps in dependency order; rejects unknown inputs and cycles"""
+        by_name = {step['name']: step for step in steps}
+        if len(by_name) != len(steps):
+            raise ValueError("Pipeline step names must be unique")
+        order, state = [], {}
+        def visit(name, path):
+            if state.get(name) == 'done':
+                return
+            if state.get(name) == 'active':
+                raise ValueError(f"Pipeline has a cycle: {' -> '.join(path + [name])}")
+            state[name] = 'active'
+            for dependency in by_name[name]['inputs']:
+                if dependency not in by_name:
+                    raise ValueError(f"Step {name} depends on unknown step {dependency}")
+                visit(dependency, path + [name])
+            state[name] = 'done'
+            order.append(by_name[name])
+        for step in steps:
+            visit(step['name'], [])
+        return order
+    
+    def pipeline_keys(steps):
+        """Cache key per step: code hash + parameter hashes + the keys of its inputs"""
+        keys = {}
+        for step in _pipeline_order(steps):
+            digest = hashlib.sha256(pipeline_code_hash(step['func']).encode('utf-8'))
+            for name in sorted(step['params']):
+                digest.update(f"{name}={_content_hash(step['params'][name])}".encode('utf-8'))
+            for dependency in step['inputs']:
+                digest.update(f"<{keys[dependency]}".encode('utf-8'))
+            keys[step['name']] = digest.hexdigest()[:32]
+        return keys
+    
+    def _cache_read(path):
+        if path.with_suffix('.parquet').exists():
+            return pd.read_parquet(path.with_suffix('.parquet'))
+        with open(path.with_suffix('.pkl'), 'rb') as f:
+            return pickle.load(f)
+    
+    def _cache_write(path, value):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(value, pd.DataFrame):
+            try:
+                tmp = path.with_suffix('.parquet.tmp')
+                value.to_parquet(tmp, index=False)
+                tmp.replace(path.with_suffix('.parquet'))
+                return
+            except (TypeError, ValueError, ImportError):
+                # Mixed-type object columns cannot be written as Parquet
+                pass
+        tmp = path.with_suffix('.pkl.tmp')
+        with open(tmp, 'wb') as f:
+            pickle.dump(value, f)
+        tmp.replace(path.with_suffix('.pkl'))
+    
+    def _cached(path):
+        return path.with_suffix('.parquet').exists() or path.with_suffix('.pkl').exists()
+    
+    async def run_wprdf_pipeline(steps, cache_dir=None, force=False, max_workers=4):
+        """
+        Run a pipeline DAG; returns (outputs by step name, report DataFrame).
+        
+        Steps whose key is already cached are loaded instead of run; force=True
+        recomputes everything. Coroutine functions are awaited, plain ones run
+        in worker threads (inline under Pyodide, which has no threads).
+        """
+        cache_dir = Path(cache_dir or WPRDF_PIPELINE_CACHE_DIR)
+        keys = pipeline_keys(steps)
+        by_name = {step['name']: step for step in steps}
+        threads = "pyodide" not in sys.modules
+        workers = asyncio.Semaphore(max_workers)
+        tasks, report = {}, []
+        
+        async def run_step(step):
+            inputs = await asyncio.gather(*[task_for(name) for name in step['inputs']])
+            path = cache_dir / f"{step['name']}-{keys[step['name']]}"
+            started = time.perf_counter()
+            if not force and _cached(path):
+                output, status = _cache_read(path), 'cached'
+            else:
+                async with workers:
+                    if inspect.iscoroutinefunction(step['func']):
+                        output = await step['func'](*inputs, **step['params'])
+                    elif threads:
+                        output = await asyncio.to_thread(step['func'], *inputs, **step['params'])
+                    else:
+                        output = step['func'](*inputs, **step['params'])
+                _cache_write(path, output)
+                status = 'computed'
+            report.append({
+                'step': step['name'], 'status': status, 'seconds': time.perf_counter() - started,
+                'rows': len(output) if isinstance(output, pd.DataFrame) else None, 'key': keys[step['name']]
+            })
+            return output
+        
+        def task_for(name):
+            if name not in tasks:
+                tasks[name] = asyncio.ensure_future(run_step(by_name[name]))
+            return tasks[name]
+        
+        results = await asyncio.gather(*[task_for(step['name']) for step in steps])
+        return dict(zip([step['name'] for step in steps], results)), pd.DataFrame(report)
+    
+    def clear_pipeline_cache(cache_dir=None, keep=None):
+        """Delete cached step outputs, except the keys in keep (e.g. pipeline_keys(steps).values())"""
+        cache_dir = Path(cache_dir or WPRDF_PIPELINE_CACHE_DIR)
+        keep = set(keep or ())
+        removed = 0
+        for path in cache_dir.glob("*-*.*") if cache_dir.exists() else []:
+            if path.name.split('.', 1)[0].rsplit('-', 1)[-1] not in keep:
+                path.unlink()
+                removed += 1
+        return removed
+    
+    return (
+        Path,
+        WPRDF_PIPELINE_CACHE_DIR,
+        asyncio,
+        clear_pipeline_cache,
+        create_pipeline_step,
+        hashlib,
+        inspect,
+        io,
+        json,
+        pd,
+        pickle,
+        pipeline_code_hash,
+        pipeline_keys,
+        run_wprdf_pipeline,
+        time,
+        types,
+    )
 
 @app.cell(hide_code=True)
 def __(mo):
@@ -58,6 +290,19 @@ def __(mo):
         1. **Excel Source** (`excel2wprdf`): Converts Excel bytes to WPRDF Pandas DataFrame.
         2. **JSON Source** (`json2wprdf`): Flattens JSON bytes to WPRDF Pandas DataFrame.
         3. **Merge Utility** (`merge_wprdf`): Combines multiple WPRDF DataFrames.
+        
+        ### Pipeline API:
+        ```python
+        steps = [
+            create_pipeline_step("excel", excel2wprdf.excel2wprdf, params={"excel_bytes": data, "author_uri": a, "app_uri": b}),
+            create_pipeline_step("json", json2wprdf.json2wprdf, params={"json_bytes": doc, "author_uri": a, "app_uri": b}),
+            create_pipeline_step("merge", merge_wprdf.merge_wprdf, inputs=["excel", "json"]),
+        ]
+        outputs, report = await run_wprdf_pipeline(steps)
+        ```
+        - **Declared Inputs**: A step receives the outputs of its `inputs` positionally, followed by its `params`; unknown inputs and cycles are rejected.
+        - **Concurrency**: Steps start as soon as their inputs are ready, so independent sources run concurrently (coroutines are awaited, other functions run in worker threads outside WASM).
+        - **Memoization**: Outputs are cached as Parquet (pickle for anything else) in `WPRDF_PIPELINE_CACHE_DIR`, keyed by the hash of the step's notebook code, its parameters and the keys of its inputs. Reruns only recompute changed steps and what depends on them; `clear_pipeline_cache` removes stale entries.
         """
     )
     return
@@ -90,34 +335,75 @@ def __(mo):
     mo.md(
         r"""
         ## 2. Run Pipeline
-        This example simulates processing an Excel file and a JSON file, then merging them.
+        The pipeline processes an Excel (or CSV) file and a JSON file, then merges them. Without uploads it uses small sample inputs.
+        The two sources do not depend on each other and run concurrently; a step whose inputs and notebook code are unchanged is read from the cache.
         """
     )
     return
 
 @app.cell
-def __(excel2wprdf, io, json2wprdf, merge_wprdf, mo):
-    def run_pipeline():
-        # 1. Process Excel (Mock data)
-        excel_data = b"mock excel content"
-        df1 = excel2wprdf.excel2wprdf(excel_data, "user:1", "app:1")
-        
-        # 2. Process JSON (Mock data)
-        json_data = b'{"key": "value"}'
-        df2 = json2wprdf.json2wprdf(json_data, "user:1", "app:1")
-        
-        # 3. Merge
-        merged = merge_wprdf.merge_wprdf([df1, df2])
-        
-        return f"Pipeline execution simulated! Merged {len(merged)} rows."
+def __(mo):
+    pipeline_table_input = mo.ui.file(label="Excel or CSV (optional)", filetypes=[".xlsx", ".xls", ".csv"])
+    pipeline_json_input = mo.ui.file(label="JSON (optional)", filetypes=[".json"])
+    pipeline_force = mo.ui.checkbox(label="Ignore cache")
+    run_btn = mo.ui.run_button(label="Run Full Pipeline")
+    return pipeline_force, pipeline_json_input, pipeline_table_input, run_btn
 
-    run_btn = mo.ui.button(label="Run Full Pipeline", on_click=lambda _: run_pipeline())
-    return run_btn, run_pipeline
+@app.cell
+def __(
+    create_pipeline_step,
+    excel2wprdf,
+    json2wprdf,
+    merge_wprdf,
+    pipeline_json_input,
+    pipeline_table_input,
+):
+    _table = pipeline_table_input.value[0] if pipeline_table_input.value else None
+    if _table is None or _table.name.endswith(".csv"):
+        _convert, _bytes_param = excel2wprdf.csv2wprdf, "csv_bytes"
+    else:
+        _convert, _bytes_param = excel2wprdf.excel2wprdf, "excel_bytes"
+    
+    pipeline_steps = [
+        create_pipeline_step("excel", _convert, params={
+            _bytes_param: _table.contents if _table is not None else b"name,age\nalice,30\nbob,25\n",
+            "author_uri": "user:1", "app_uri": "app:1"
+        }),
+        create_pipeline_step("json", json2wprdf.json2wprdf, params={
+            "json_bytes": pipeline_json_input.value[0].contents if pipeline_json_input.value else b'{"key": "value", "items": [1, 2]}',
+            "author_uri": "user:1", "app_uri": "app:1"
+        }),
+        # Receives the outputs of both sources as merge_wprdf(excel_df, json_df)
+        create_pipeline_step("merge", merge_wprdf.merge_wprdf, inputs=["excel", "json"]),
+    ]
+    return (pipeline_steps,)
 
 @app.cell
-def __(run_btn):
-    run_btn
-    return
+async def __(
+    mo,
+    pipeline_force,
+    pipeline_json_input,
+    pipeline_steps,
+    pipeline_table_input,
+    run_btn,
+    run_wprdf_pipeline,
+):
+    if run_btn.value:
+        pipeline_outputs, pipeline_report = await run_wprdf_pipeline(pipeline_steps, force=pipeline_force.value)
+        _result = mo.vstack([
+            mo.md(f"**Pipeline finished!** Merged {len(pipeline_outputs['merge'])} rows."),
+            mo.ui.table(pipeline_report, selection=None)
+        ])
+    else:
+        pipeline_outputs, pipeline_report = None, None
+        _result = mo.md("_Run the pipeline to see which steps were computed and which came from the cache._")
+    
+    mo.vstack([
+        mo.hstack([pipeline_table_input, pipeline_json_input]),
+        mo.hstack([run_btn, pipeline_force]),
+        _result
+    ])
+    return pipeline_outputs, pipeline_report
 
 if __name__ == "__main__":
     app.run()
@@ -0,0 +1,323 @@
+import marimo
+
+__generated_with = "0.18.4"
+app = marimo.App(width="medium")
+
+@app.cell(hide_code=True)
+async def __():
+    # WPRDF: sys is injected globally by wprdf.js.
+    # We do NOT import it here to avoid "Multiple definitions" errors in Marimo.
+
+    # Checked import of marimo
+    mo = sys.modules.get("marimo")
+    if mo is None:
+        import marimo as mo
+
+    # 1. Infrastructure: WASM Environment & Dependencies
+    if "pyodide" in sys.modules:
+        micropip = sys.modules.get("micropip")
+        if micropip is None:
+            import micropip
+
+        _pkgs = []
+        # Check if pandas and pyarrow are already available
+        if "pandas" not in sys.modules:
+            try:
+                import pandas as pd
+            except ImportError:
+                _pkgs.append("pandas")
+        if "pyarrow" not in sys.modules:
+            try:
+                import pyarrow
+            except ImportError:
+                _pkgs.append("pyarrow")
+
+        if _pkgs:
+            await micropip.install(_pkgs)
+
+    return (mo, sys)
+
+@app.cell(hide_code=True)
+def __(sys, wprdf_import):
+    # 2. Core Logic: Imports & Materialization Functions
+    # WPRDF: Defensive imports - check sys.modules first to avoid redundant loading in WASM.
+    # This ensures we use the already-initialized environment and avoid "Variable redefined" errors.
+    pd = sys.modules.get("pandas")
+    if pd is None: import pandas as pd
+
+    base64 = sys.modules.get("base64")
+    if base64 is None: import base64
+
+    io = sys.modules.get("io")
+    if io is None: import io
+
+    if "datetime" in sys.modules:
+        from datetime import datetime
+    else:
+        from datetime import datetime
+
+    WPRDF_COLUMNS = [
+        'subject', 'predicate', 'object_type', 'object', 'literal_value',
+        'technical_timestamp', 'business_validity_from',
+        'business_validity_to', 'author', 'app'
+    ]
+    WPRDF_RUN_COLUMNS = ['technical_timestamp', 'business_validity_from', 'author', 'app']
+
+    # The wide-schema expansion (runs and nodes) and the typed literal layout
+    # are shared by every consumer
+    expand_wprdf = wprdf_import("merge_wprdf", "expand_wprdf")
+    WPRDF_LITERAL_COLUMNS = wprdf_import("merge_wprdf", "WPRDF_LITERAL_COLUMNS")
+    decode_typed_literals = wprdf_import("merge_wprdf", "decode_typed_literals")
+
+    RDF = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+    RDFS = "http://www.w3.org/2000/01/rdf-schema#"
+    OWL = "http://www.w3.org/2002/07/owl#"
+    RDF_TYPE = f"{RDF}type"
+    RDFS_SUBCLASS_OF = f"{RDFS}subClassOf"
+    RDFS_SUBPROPERTY_OF = f"{RDFS}subPropertyOf"
+    OWL_SAME_AS = f"{OWL}sameAs"
+
+    # Inferred triples carry their own provenance so they can be told apart
+    # from (and dropped independently of) the asserted data.
+    WPRDF_REASONER_APP = "urn:wprdf:app:reasoner"
+    WPRDF_REASONER_AUTHOR = "urn:wprdf:user:reasoner"
+    WPRDF_RULES = ('subclass', 'subproperty', 'sameas')
+
+    # Objects are keyed so IRI objects share ids with subjects; literals live
+    # in their own key space ("type"base64, like an N-Triples literal an IRI
+    # can never start with a quote).
+    def _object_keys(df):
+        is_node = df['object_type'].isin(['iri', 'bnode'])
+        literal_keys = '"' + df['object_type'].astype(str) + '"' + df['object'].astype(str)
+        return df['literal_value'].astype(str).where(is_node, literal_keys)
+
+    def _encode_terms(state, keys):
+        """Map term keys to int64 ids, extending the state's vocabulary"""
+        codes = state['terms'].get_indexer(keys)
+        unknown = codes < 0
+        if unknown.any():
+            new_terms = pd.Index(pd.unique(keys[unknown]))
+            state['terms'] = state['terms'].append(new_terms)
+            codes[unknown] = state['terms'].get_indexer(keys[unknown])
+        return codes.astype('int64')
+
+    def _anti_join(triples, known):
+        """Rows of triples that are not in known"""
+        # Narrowing known by subject first is much cheaper than joining all of it
+        known = known[known['s'].isin(triples['s'].unique())]
+        merged = triples.merge(known, on=['s', 'p', 'o'], how='left', indicator=True)
+        return merged.loc[merged['_merge'] == 'left_only', ['s', 'p', 'o']]
+
+    def _chain(left, right, predicate):
+        """(a p b), (b p c) -> (a p c)"""
+        joined = left.merge(right, left_on='o', right_on='s', suffixes=('', '_r'))
+        return pd.DataFrame({'s': joined['s'], 'p': predicate, 'o': joined['o_r']})
+
+    def _derive(delta, total, ids, rules):
+        """One semi-naive step: every rule joins at least one delta premise"""
+        derived = []
+
+        def by_predicate(triples, p):
+            return triples[triples['p'] == p]
+
+        if 'subclass' in rules:
+            d_sc, t_sc = by_predicate(delta, ids['subclass']), by_predicate(total, ids['subclass'])
+            d_type, t_type = by_predicate(delta, ids['type']), by_predicate(total, ids['type'])
+            # scm-sco: subClassOf is transitive
+            derived += [_chain(d_sc, t_sc, ids['subclass']), _chain(t_sc, d_sc, ids['subclass'])]
+            # cax-sco: (x type A), (A subClassOf B) -> (x type B)
+            derived += [_chain(d_type, t_sc, ids['type']), _chain(t_type, d_sc, ids['type'])]
+
+        if 'subproperty' in rules:
+            d_sp, t_sp = by_predicate(delta, ids['subproperty']), by_predicate(total, ids['subproperty'])
+            # scm-spo: subPropertyOf is transitive
+            derived += [_chain(d_sp, t_sp, ids['subproperty']), _chain(t_sp, d_sp, ids['subproperty'])]
+            # prp-spo1: (x p y), (p subPropertyOf q) -> (x q y)
+            for triples, sp in ((delta, t_sp), (total, d_sp)):
+                joined = triples.merge(sp, left_on='p', right_on='s', suffixes=('', '_sp'))
+                derived.append(pd.DataFrame({'s': joined['s'], 'p': joined['o_sp'], 'o': joined['o']}))
+
+        if 'sameas' in rules:
+            d_sa, t_sa = by_predicate(delta, ids['sameas']), by_predicate(total, ids['sameas'])
+            # eq-sym, eq-trans
+            derived.append(pd.DataFrame({'s': d_sa['o'], 'p': ids['sameas'], 'o': d_sa['s']}))
+            derived += [_chain(d_sa, t_sa, ids['sameas']), _chain(t_sa, d_sa, ids['sameas'])]
+            # eq-rep-s / eq-rep-o: statements about x also hold for every y sameAs x
+            for triples, sa in ((delta, t_sa), (total, d_sa)):
+                joined = triples.merge(sa, on='s', suffixes=('', '_sa'))
+                derived.append(pd.DataFrame({'s': joined['o_sa'], 'p': joined['p'], 'o': joined['o']}))
+                joined = triples.merge(sa, left_on='o', right_on='s', suffixes=('', '_sa'))
+                derived.append(pd.DataFrame({'s': joined['s'], 'p': joined['p'], 'o': joined['o_sa']}))
+
+        derived = [d for d in derived if len(d)]
+        if not derived:
+            return delta.iloc[:0]
+        return pd.concat(derived, ignore_index=True).astype('int64').drop_duplicates()
+
+    def create_materialization_state(rules=WPRDF_RULES, app_uri=WPRDF_REASONER_APP, author_uri=WPRDF_REASONER_AUTHOR):
+        """Empty closure state; pass it to materialize_wprdf to keep inferences incremental"""
+        empty = pd.DataFrame({'s': [], 'p': [], 'o': []}, dtype='int64')
+        return {
+            'rules': tuple(rules), 'app': app_uri, 'author': author_uri,
+            'terms': pd.Index([RDF_TYPE, RDFS_SUBCLASS_OF, RDFS_SUBPROPERTY_OF, OWL_SAME_AS], dtype=object),
+            'literals': pd.DataFrame(columns=['object_type', 'object', 'literal_value']),
+            'asserted': empty, 'closure': empty,
+        }
+
+    def _decode_triples(state, triples):
+        terms = state['terms']
+        # Object columns are built once per distinct object term, then gathered
+        codes, object_ids = pd.factorize(triples['o'])
+        keys = pd.Series(terms.take(object_ids), dtype=object)
+        is_literal = keys.str.startswith('"')
+        literals = state['literals'].reindex(keys[is_literal].to_numpy())
+        objects = pd.DataFrame({
+            'object_type': keys.str.startswith('_:').map({True: 'bnode', False: 'iri'}),
+            'object': keys.map(lambda v: base64.b64encode(v.encode('utf-8')).decode('utf-8')),
+            'literal_value': keys,
+        })
+        objects.loc[is_literal, ['object_type', 'object', 'literal_value']] = literals.to_numpy()
+        objects = objects.take(codes).reset_index(drop=True)
+        now = datetime.now().isoformat()
+        return pd.DataFrame({
+            'subject': terms.take(triples['s'].to_numpy()),
+            'predicate': terms.take(triples['p'].to_numpy()),
+            'object_type': objects['object_type'],
+            'object': objects['object'],
+            'literal_value': objects['literal_value'],
+            'technical_timestamp': now,
+            'business_validity_from': now,
+            'business_validity_to': None,
+            'author': state['author'],
+            'app': state['app'],
+        })
+
+    def materialize_wprdf(df, state=None, rules=WPRDF_RULES, app_uri=WPRDF_REASONER_APP, author_uri=WPRDF_REASONER_AUTHOR):
+        """
+        Materialize RDFS/OWL-lite inferences over a WPRDF frame.
+
+        Computes subClassOf/subPropertyOf/sameAs closures (plus rdf:type
+        propagation and sameAs replication) by semi-naive evaluation. Returns
+        (inferred_df, state): only triples not inferred before are returned,
+        tagged with app_uri/author_uri. Pass the state back with the next batch
+        of triples to extend the closure incrementally; retractions are not
+        propagated, so re-run without state after removing triples.
+        """
+        state = create_materialization_state(rules, app_uri, author_uri) if state is None else state
+        df = decode_typed_literals(expand_wprdf(df))
+        # Only open, asserted triples are premises
+        df = df[df['business_validity_to'].isna() & (df['app'] != state['app'])]
+
+        literal_rows = ~df['object_type'].isin(['iri', 'bnode'])
+        object_keys = _object_keys(df)
+        literals = df.loc[literal_rows, ['object_type', 'object', 'literal_value']].set_index(object_keys[literal_rows])
+        state['literals'] = pd.concat([state['literals'], literals[~literals.index.duplicated()]])
+        state['literals'] = state['literals'][~state['literals'].index.duplicated()]
+
+        asserted = pd.DataFrame({
+            's': _encode_terms(state, df['subject'].astype(str).to_numpy()),
+            'p': _encode_terms(state, df['predicate'].astype(str).to_numpy()),
+            'o': _encode_terms(state, object_keys.to_numpy()),
+        }).drop_duplicates()
+        ids = dict(zip(['type', 'subclass', 'subproperty', 'sameas'], range(4)))
+
+        state['asserted'] = pd.concat([state['asserted'], _anti_join(asserted, state['asserted'])], ignore_index=True)
+        total = state['closure']
+        delta = _anti_join(asserted, total)
+        inferred = []
+        while len(delta):
+            total = pd.concat([total, delta], ignore_index=True)
+            delta = _anti_join(_derive(delta, total, ids, state['rules']), total)
+            inferred.append(delta)
+        state['closure'] = total
+
+        inferred = [d for d in inferred if len(d)]
+        if not inferred:
+            return pd.DataFrame(columns=WPRDF_COLUMNS), state
+        return _decode_triples(state, pd.concat(inferred, ignore_index=True)), state
+
+    return (
+        OWL,
+        OWL_SAME_AS,
+        RDF,
+        RDFS,
+        RDFS_SUBCLASS_OF,
+        RDFS_SUBPROPERTY_OF,
+        RDF_TYPE,
+        WPRDF_COLUMNS,
+        WPRDF_LITERAL_COLUMNS,
+        WPRDF_REASONER_APP,
+        WPRDF_REASONER_AUTHOR,
+        WPRDF_RULES,
+        WPRDF_RUN_COLUMNS,
+        base64,
+        create_materialization_state,
+        datetime,
+        decode_typed_literals,
+        expand_wprdf,
+        io,
+        materialize_wprdf,
+        pd,
+    )
+
+@app.cell(hide_code=True)
+def __(mo):
+    mo.md(
+        r"""
+        # 🧠 WPRDF Reasoner
+
+        Materializes RDFS/OWL-lite inferences over WPRDF triples.
+
+        ### Usage:
+        ```python
+        import wprdf_reasoner
+
+        inferred, state = wprdf_reasoner.materialize_wprdf(df)
+
+        # Later: only the consequences of the new triples are computed
+        more_inferred, state = wprdf_reasoner.materialize_wprdf(new_df, state=state)
+        ```
+
+        ### Features:
+        - **Closures**: `rdfs:subClassOf`, `rdfs:subPropertyOf` and `owl:sameAs` (symmetric, transitive) closures, `rdf:type` propagation to superclasses, sub-property entailment and `sameAs` replication of subjects and objects.
+        - **Semi-Naive Evaluation**: Each round only joins the triples derived in the previous round, on integer term ids.
+        - **Provenance**: Inferred triples are tagged with `app = urn:wprdf:app:reasoner` and are ignored as premises when fed back in.
+        - **Incremental**: The returned state keeps the closure; new triples only trigger the rounds they affect. Retractions need a fresh run.
+        - **Layouts**: Wide, compact (`run_id`) and typed (`value_*`) WPRDF inputs are accepted; closed triples (`business_validity_to` set) are skipped.
+        """
+    )
+    return
+
+@app.cell
+def __(mo):
+    wprdf_reasoner_file_input = mo.ui.file(label="Upload WPRDF Parquet", filetypes=[".parquet"])
+    return (wprdf_reasoner_file_input,)
+
+@app.cell
+def __(io, materialize_wprdf, pd, wprdf_reasoner_file_input):
+    wprdf_reasoner_output_df = (
+        materialize_wprdf(pd.read_parquet(io.BytesIO(wprdf_reasoner_file_input.value[0].contents)))[0]
+        if wprdf_reasoner_file_input.value
+        else None
+    )
+    return (wprdf_reasoner_output_df,)
+
+@app.cell
+def __(mo, wprdf_reasoner_file_input, wprdf_reasoner_output_df):
+    mo.vstack([
+        mo.md("# 🧠 WPRDF Reasoner"),
+        wprdf_reasoner_file_input,
+        mo.hstack([
+            mo.md(f"**{len(wprdf_reasoner_output_df):,}** inferred triples"),
+            mo.download(
+                label="Download Inferred WPRDF Parquet",
+                filename="inferred.parquet",
+                data=lambda: wprdf_reasoner_output_df.to_parquet(index=False)
+            )
+        ]) if wprdf_reasoner_output_df is not None else mo.md(""),
+        mo.ui.table(wprdf_reasoner_output_df) if wprdf_reasoner_output_df is not None else mo.md("_Upload a WPRDF Parquet file to materialize its inferences_")
+    ])
+    return
+
+if __name__ == "__main__":
+    app.run()
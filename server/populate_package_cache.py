@@ -0,0 +1,203 @@
+"""
+Populate the local package cache served at /packages.
+
+Mirrors everything a notebook needs to start without network access:
+- the Pyodide runtime and the Pyodide packages marimo boots with, plus the
+  ones pinned in wasm_packages.txt (with their dependencies); a pin that
+  does not match the version Pyodide ships stops the run
+- pure-Python wheels pinned in wasm_packages.txt, for micropip
+- sql.js for the WPRDF wrapper page
+
+The marimo lock file is rewritten to point at the mirrored files, and the
+exported marimo assets are rewritten to load Pyodide from /packages instead
+of the CDN. Files already present with the right hash are not downloaded
+again, so re-running is cheap.
+
+Run from the server directory (setup_marimo_wasm.sh does this):
+    uv run python populate_package_cache.py
+"""
+import hashlib
+import json
+import os
+import re
+import sys
+import urllib.request
+from importlib.metadata import version
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent
+WASM_DIR = BASE_DIR / "wasm_editor"
+ASSETS_DIR = WASM_DIR / "marimo" / "assets"
+PACKAGES_DIR = WASM_DIR / "packages"
+PINS_FILE = BASE_DIR / "wasm_packages.txt"
+
+PYODIDE_CDN = "https://cdn.jsdelivr.net/pyodide/"
+MARIMO_LOCK_URL = "https://wasm.marimo.app/pyodide-lock.json?v={marimo}&pyodide=v{pyodide}"
+PYODIDE_CORE_FILES = ["pyodide.asm.js", "pyodide.asm.wasm", "python_stdlib.zip"]
+# Packages marimo's worker passes to loadPyodide
+MARIMO_BOOT_PACKAGES = ["micropip", "msgspec", "marimo-base", "markdown", "pymdown-extensions", "narwhals", "packaging"]
+
+SQLJS_VERSION = "1.10.2"
+SQLJS_URL = "https://cdn.jsdelivr.net/npm/sql.js@{version}/dist/{file}"
+SQLJS_FILES = ["sql-wasm.js", "sql-wasm.wasm"]
+
+TIMEOUT = int(os.getenv("WPRDF_PACKAGE_TIMEOUT", "120"))
+
+
+def normalize(name):
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fetch(url):
+    with urllib.request.urlopen(url, timeout=TIMEOUT) as response:
+        return response.read()
+
+
+def download(url, dest, sha256=None):
+    """Download url to dest unless it is already there (with the expected hash)"""
+    if dest.exists() and (sha256 is None or sha256_file(dest) == sha256):
+        return False
+    data = fetch(url)
+    if sha256 is not None and hashlib.sha256(data).hexdigest() != sha256:
+        raise ValueError(f"sha256 mismatch for {url}")
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(dest.name + ".part")
+    tmp.write_bytes(data)
+    tmp.replace(dest)
+    return True
+
+
+def read_pins():
+    """name -> pinned version (None when unpinned) from wasm_packages.txt"""
+    pins = {}
+    for line in PINS_FILE.read_text().splitlines():
+        line = line.split("#", 1)[0].strip()
+        if line:
+            name, _, pinned = line.partition("==")
+            pins[name.strip()] = pinned.strip() or None
+    return pins
+
+
+def detect_pyodide_version():
+    """The Pyodide version the exported marimo worker loads"""
+    if os.getenv("PYODIDE_VERSION"):
+        return os.getenv("PYODIDE_VERSION").lstrip("v")
+    for worker in sorted(ASSETS_DIR.glob("worker-*.js")):
+        match = re.search(r"=`(\d+\.\d+\.\d+)`;async function \w+\(\w+=\{", worker.read_text(errors="ignore"))
+        if match:
+            return match.group(1)
+    return None
+
+
+def mirror_sqljs():
+    target = PACKAGES_DIR / "sql.js" / SQLJS_VERSION
+    for file in SQLJS_FILES:
+        if download(SQLJS_URL.format(version=SQLJS_VERSION, file=file), target / file):
+            print(f"  sql.js/{SQLJS_VERSION}/{file}")
+
+
+def mirror_pyodide(pyodide_version, pins):
+    """Mirror the Pyodide runtime and the dependency closure of the pins it ships; returns the other pins"""
+    cdn = f"{PYODIDE_CDN}v{pyodide_version}/full/"
+    target = PACKAGES_DIR / "pyodide" / f"v{pyodide_version}" / "full"
+    for file in PYODIDE_CORE_FILES:
+        if download(cdn + file, target / file):
+            print(f"  pyodide/{file}")
+
+    lock = json.loads(fetch(MARIMO_LOCK_URL.format(marimo=version("marimo"), pyodide=pyodide_version)))
+    packages = {normalize(key): key for key in lock["packages"]}
+    names = [name for name in pins if normalize(name) in packages]
+    mismatched = []
+    for name in names:
+        shipped = lock["packages"][packages[normalize(name)]]["version"]
+        if pins[name] != shipped:
+            mismatched.append(f"{name}=={shipped} (pinned: {pins[name] or 'unpinned'})")
+    if mismatched:
+        raise ValueError(f"wasm_packages.txt does not match Pyodide v{pyodide_version}: {', '.join(mismatched)}")
+
+    wanted, missing, pending = set(), [], [normalize(n) for n in MARIMO_BOOT_PACKAGES + names]
+    while pending:
+        name = pending.pop()
+        if name in wanted:
+            continue
+        if name not in packages:
+            missing.append(name)
+            continue
+        wanted.add(name)
+        pending.extend(normalize(dep) for dep in lock["packages"][packages[name]].get("depends", []))
+
+    for key, package in lock["packages"].items():
+        file_name = package["file_name"]
+        url = file_name if "://" in file_name else cdn + file_name
+        if normalize(key) in wanted:
+            local = url.rsplit("/", 1)[-1].split("?", 1)[0]
+            if download(url, target / local, package.get("sha256")):
+                print(f"  pyodide/{local}")
+            package["file_name"] = local
+        else:
+            # Not mirrored: still loadable from the CDN when online
+            package["file_name"] = url
+    (target / "pyodide-lock.json").write_text(json.dumps(lock))
+    if missing:
+        print(f"WARNING: dependencies missing from the Pyodide lock: {', '.join(sorted(missing))}")
+    return {name: pinned for name, pinned in pins.items() if name not in names}
+
+
+def mirror_wheels(pins):
+    """Fetch pinned pure-Python wheels (name -> version) from PyPI"""
+    target = PACKAGES_DIR / "wheels"
+    for name, pinned in pins.items():
+        if pinned is None:
+            raise ValueError(f"{name} is not in the Pyodide distribution, pin it as {name}==version")
+        release = json.loads(fetch(f"https://pypi.org/pypi/{name}/{pinned}/json"))
+        wheels = [f for f in release["urls"] if f["filename"].endswith("-none-any.whl")]
+        if not wheels:
+            raise ValueError(f"{name}=={pinned} has no pure-Python wheel")
+        wheel = wheels[0]
+        if download(wheel["url"], target / wheel["filename"], wheel["digests"]["sha256"]):
+            print(f"  wheels/{wheel['filename']}")
+
+
+def rewrite_marimo_assets(pyodide_version):
+    """Point the exported marimo worker at the mirrored Pyodide and lock file"""
+    lock_url = re.compile(r"https://wasm\.marimo\.app/pyodide-lock\.json\?v=\$\{\w+\.version\}&pyodide=\$\{(\w+)\.pyodideVersion\}")
+    for asset in ASSETS_DIR.glob("*.js"):
+        text = asset.read_text()
+        rewritten = lock_url.sub(r"/packages/pyodide/${\1.pyodideVersion}/full/pyodide-lock.json", text)
+        rewritten = rewritten.replace(PYODIDE_CDN, "/packages/pyodide/")
+        if rewritten != text:
+            asset.write_text(rewritten)
+            print(f"  rewrote {asset.name}")
+
+
+def main():
+    pins = read_pins()
+    PACKAGES_DIR.mkdir(parents=True, exist_ok=True)
+
+    print("Mirroring sql.js...")
+    mirror_sqljs()
+
+    pyodide_version = detect_pyodide_version()
+    if pyodide_version is None:
+        # Without the lock the pins cannot be checked or told apart from PyPI wheels
+        print("ERROR: could not detect the Pyodide version of the marimo export; set PYODIDE_VERSION")
+        return 1
+    print(f"Mirroring Pyodide v{pyodide_version}...")
+    wheels = mirror_pyodide(pyodide_version, pins)
+    rewrite_marimo_assets(pyodide_version)
+
+    print("Mirroring pinned wheels...")
+    mirror_wheels(wheels)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
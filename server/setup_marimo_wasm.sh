@@ -67,6 +67,12 @@ with open("./wasm_editor/marimo/index.html", "w") as f:
     f.write(content.replace("<head>", "<head>" + bootloader))
 '
 
+# Populate the local package cache (Pyodide runtime + packages, pinned wheels,
+# sql.js) so notebooks start without network access
+echo "Populating local package cache (wasm_packages.txt)..."
+uv run python populate_package_cache.py || \
+    echo "WARNING: package cache incomplete, notebooks will fall back to the CDN"
+
 cp ./wasm_injections/wprdf.css ./wasm_editor/wprdf/
 cp ./wasm_injections/wprdf.js ./wasm_editor/wprdf/
 
@@ -82,6 +88,10 @@ echo "  ├── index.html (WPRDF wrapper - loads marimo in iframe)"
 echo "  ├── marimo/ (Clean marimo WASM editor)"
 echo "  │   ├── index.html"
 echo "  │   └── assets/"
+echo "  ├── packages/ (Local package cache, served with long-lived caching)"
+echo "  │   ├── pyodide/"
+echo "  │   ├── wheels/"
+echo "  │   └── sql.js/"
 echo "  └── wprdf/"
 echo "      ├── wprdf.css"
 echo "      └── wprdf.js"
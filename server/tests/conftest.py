@@ -0,0 +1,38 @@
+"""
+Notebook templates are marimo apps, not packages: tests load a notebook's
+Core Logic cell into a fresh module, like wprdf_import does in the editor.
+"""
+import ast
+import functools
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+NOTEBOOKS_DIR = Path(__file__).parent.parent / "notebook_templates"
+
+
+def wprdf_import(notebook_name, member_name=None):
+    """Test stand-in for the wprdf_import that wprdf.js injects"""
+    module = load_notebook(notebook_name)
+    return getattr(module, member_name) if member_name else module
+
+
+@functools.cache
+def load_notebook(name: str) -> types.ModuleType:
+    """Run the Core Logic cell of notebook_templates/<name>.py and return it as a module"""
+    path = NOTEBOOKS_DIR / f"{name}.py"
+    code = path.read_text()
+    module = types.ModuleType(name)
+    module.__dict__.update(sys=sys, wprdf_import=wprdf_import)
+    for node in ast.parse(code).body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and "Core Logic" in ast.get_source_segment(code, node):
+            body = node.body[:-1] if isinstance(node.body[-1], ast.Return) else node.body
+            exec(compile(ast.Module(body=body, type_ignores=[]), str(path), "exec"), module.__dict__)
+    return module
+
+
+@pytest.fixture
+def notebook():
+    return load_notebook
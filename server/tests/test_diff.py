@@ -0,0 +1,37 @@
+import pandas as pd
+import pytest
+
+
+def convert(nb, df, **config):
+    return nb.dr2wprdf(df, "urn:author", "urn:app", {"subject_col": "id", **config})
+
+
+@pytest.mark.parametrize('config', [{}, {'compact': True, 'typed': True}])
+def test_integral_float_drift_is_no_change(notebook, config):
+    nb = notebook('excel2wprdf')
+    previous = convert(nb, pd.DataFrame({'id': [1, 2], 'age': [40.0, None]}), **config)
+    current = convert(nb, pd.DataFrame({'id': [1, 2], 'age': [40, 41]}), previous=previous, **config)
+
+    # Only the new value for subject 2 is inserted; 40.0 -> 40 is not a change
+    assert current['subject'].tolist() == ['urn:row:2']
+    assert nb.decode_typed_literals(current)['literal_value'].tolist() == ['41']
+
+
+@pytest.mark.parametrize('previous_config, config', [
+    ({}, {'compact': True, 'typed': True}),
+    ({'compact': True, 'typed': True}, {}),
+    ({'typed': True}, {'compact': True}),
+])
+def test_delta_keeps_requested_layout(notebook, previous_config, config):
+    nb = notebook('excel2wprdf')
+    previous = convert(nb, pd.DataFrame({'id': [1, 2], 'name': ['a', 'b']}), **previous_config)
+    delta = convert(nb, pd.DataFrame({'id': [1, 2], 'name': ['a', 'c']}), previous=previous, **config)
+    expected = convert(nb, pd.DataFrame({'id': [1], 'name': ['a']}), **config)
+
+    assert list(delta.columns) == list(expected.columns)
+    assert ('run_id' in delta.columns) == bool(config.get('compact'))
+    assert len(delta) == 2 and delta['business_validity_to'].notna().sum() == 1
+    if 'run_id' in delta.columns:
+        # Every run the delta references is in its run table
+        assert set(delta['run_id']) <= set(delta.attrs['wprdf_runs'])
+    assert nb.expand_wprdf(delta)['author'].notna().all()
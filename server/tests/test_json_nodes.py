@@ -0,0 +1,51 @@
+import json
+
+import pandas as pd
+import pytest
+
+DOCUMENT = json.dumps({
+    "user": {"name": "Ada", "tags": ["math", "code"]},
+    "items": [{"id": 1, "price": 2.5}, {"id": 2, "price": 4.0}],
+}).encode('utf-8')
+AUTHOR, APP = "urn:wprdf:user:test", "urn:wprdf:app:test"
+
+
+@pytest.fixture
+def frames(notebook):
+    json2wprdf = notebook('json2wprdf')
+    return (
+        json2wprdf.json2wprdf(DOCUMENT, AUTHOR, APP),
+        json2wprdf.json2wprdf(DOCUMENT, AUTHOR, APP, nodes=True),
+    )
+
+
+def test_node_layout_keeps_subject_node(frames):
+    paths, nodes = frames
+    assert 'subject' not in nodes.columns
+    assert nodes.attrs['wprdf_nodes']['base'] == "urn:json:root"
+    assert len(nodes) == len(paths)
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_merge_nodes_frame(notebook, compact):
+    json2wprdf, merge_wprdf = notebook('json2wprdf'), notebook('merge_wprdf')
+    paths = json2wprdf.json2wprdf(DOCUMENT, AUTHOR, APP, compact=compact)
+    nodes = json2wprdf.json2wprdf(DOCUMENT, AUTHOR, APP, compact=compact, nodes=True)
+
+    merged = merge_wprdf.merge_wprdf(nodes, validate=True)
+    assert sorted(merged['subject']) == sorted(paths['subject'])
+    # The same triples from both layouts deduplicate against each other
+    both = merge_wprdf.merge_wprdf(paths, nodes)
+    assert len(both) == len(merge_wprdf.merge_wprdf(paths))
+
+
+def test_consumers_expand_nodes(notebook, frames):
+    paths, nodes = frames
+    merge_wprdf = notebook('merge_wprdf')
+    assert merge_wprdf.validate_wprdf(nodes).empty
+    assert merge_wprdf.wprdf_stats(nodes)['subjects'] == merge_wprdf.wprdf_stats(paths)['subjects']
+    pd.testing.assert_frame_equal(notebook('excel2wprdf').wprdf2wide(nodes), notebook('excel2wprdf').wprdf2wide(paths))
+    rdf = notebook('wprdf2rdf')
+    assert rdf.wprdf2ntriples(nodes) == rdf.wprdf2ntriples(paths)
+    parquet = nodes.to_parquet(index=False)
+    assert rdf.wprdf2ntriples(parquet) == rdf.wprdf2ntriples(paths)
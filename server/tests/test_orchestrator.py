@@ -0,0 +1,28 @@
+import types
+
+
+def notebook_module(name, code, **imports):
+    """A module built the way wprdf_import builds notebooks (no __file__)"""
+    module = types.ModuleType(name)
+    module.__dict__.update(imports)
+    exec(compile(code, name, "exec"), module.__dict__)
+    return module
+
+
+def test_code_hash_follows_imported_helpers(notebook):
+    pipeline_code_hash = notebook('wprdf_orchestrator').pipeline_code_hash
+    step_code = "helper = shared.helper\n\ndef step(df):\n    return helper(df)\n"
+
+    def step(helper_body):
+        shared = notebook_module("shared", f"def helper(df):\n    return {helper_body}\n")
+        return notebook_module("step", step_code, shared=shared).step
+
+    assert pipeline_code_hash(step("df")) == pipeline_code_hash(step("df"))
+    assert pipeline_code_hash(step("df")) != pipeline_code_hash(step("df.copy()"))
+
+
+def test_code_hash_covers_merge_helpers(notebook):
+    excel2wprdf, merge_wprdf = notebook('excel2wprdf'), notebook('merge_wprdf')
+    functions = notebook('wprdf_orchestrator')._pipeline_functions(excel2wprdf.dr2wprdf)
+    assert merge_wprdf.expand_wprdf in functions.values()
+    assert merge_wprdf.wprdf_stats in functions.values()
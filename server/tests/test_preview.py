@@ -0,0 +1,32 @@
+import pandas as pd
+import pytest
+
+
+@pytest.mark.parametrize('name', ['excel2wprdf', 'json2wprdf'])
+def test_converters_share_merge_preview(notebook, name):
+    merge_wprdf = notebook('merge_wprdf')
+    converter = notebook(name)
+    assert converter.read_wprdf_preview is merge_wprdf.read_wprdf_preview
+    assert converter.wprdf_preview_source is merge_wprdf.wprdf_preview_source
+
+    df = pd.DataFrame({'subject': [f"urn:s{i}" for i in range(120)], 'predicate': 'urn:p'})
+    source = converter.wprdf_preview_source(df, row_group_size=16)
+    # urn:s1, urn:s10..s19 and urn:s100..s119 match
+    page, total = converter.read_wprdf_preview(source, page=2, page_size=20, search='urn:s1')
+    assert total == 31
+    assert page['subject'].tolist() == [f"urn:s{i}" for i in range(109, 120)]
+
+
+def test_ntriples_import_is_paged_from_parquet(notebook):
+    wprdf2rdf = notebook('wprdf2rdf')
+    assert wprdf2rdf.read_wprdf_preview is notebook('merge_wprdf').read_wprdf_preview
+
+    nt = "".join(f'<urn:s{i}> <urn:p> "v{i}" .\n' for i in range(40)).encode('utf-8')
+    sink = wprdf2rdf.pa.BufferOutputStream()
+    wprdf2rdf.ntriples2wprdf_parquet(nt, sink, "urn:author", "urn:app", row_group_size=16)
+    source = sink.getvalue().to_pybytes()
+
+    assert wprdf2rdf.pq.ParquetFile(wprdf2rdf.pa.BufferReader(source)).num_row_groups == 3
+    page, total = wprdf2rdf.read_wprdf_preview(source, page=2, page_size=10)
+    assert total == 40
+    assert page['subject'].tolist() == [f"urn:s{i}" for i in range(10, 20)]
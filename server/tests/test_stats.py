@@ -0,0 +1,9 @@
+def test_excel_parquet_carries_merge_stats_catalog(notebook):
+    excel2wprdf, merge_wprdf = notebook('excel2wprdf'), notebook('merge_wprdf')
+    assert excel2wprdf.wprdf_stats is merge_wprdf.wprdf_stats
+
+    df = excel2wprdf.csv2wprdf(b"id,name\n1,a\n2,b\n", "urn:author", "urn:app", {"subject_col": "id"})
+    data = excel2wprdf.write_wprdf_parquet(df)
+    catalog = merge_wprdf.read_wprdf_stats(data)
+    assert catalog['rows'] == len(df)
+    assert set(catalog['predicates']) == set(df['predicate'])
@@ -0,0 +1,53 @@
+import json
+
+import pandas as pd
+import pytest
+
+
+def wprdf_frame(object_types, literals):
+    n = len(literals)
+    return pd.DataFrame({
+        'subject': [f"urn:s{i}" for i in range(n)], 'predicate': ['urn:p'] * n,
+        'object_type': object_types, 'object': [''] * n, 'literal_value': literals,
+        'technical_timestamp': ['2024-01-01T00:00:00'] * n, 'business_validity_from': ['2024-01-01T00:00:00'] * n,
+        'business_validity_to': [None] * n, 'author': ['urn:author'] * n, 'app': ['urn:app'] * n,
+    })
+
+
+@pytest.mark.parametrize('name', ['excel2wprdf', 'json2wprdf'])
+def test_timestamp_offsets_round_trip(notebook, name):
+    nb = notebook(name)
+    literals = ['2024-01-02T03:00:00+02:00', '2024-01-02 03:00:00', '2024-01-02 03:00:00.500000']
+    typed = nb.encode_typed_literals(wprdf_frame(['Timestamp'] * 3, literals))
+
+    # The offset is kept verbatim, the naive values stay typed
+    assert typed['value_string'].tolist()[0] == literals[0]
+    assert typed['value_timestamp'].notna().tolist() == [False, True, True]
+    assert nb.decode_typed_literals(typed)['literal_value'].tolist() == literals
+
+
+@pytest.mark.parametrize('name', ['excel2wprdf', 'json2wprdf'])
+def test_dates_round_trip(notebook, name):
+    nb = notebook(name)
+    literals = ['2024-01-02', '2024-01-02 05:00:00']
+    typed = nb.encode_typed_literals(wprdf_frame(['date', 'datetime'], literals))
+
+    assert typed['value_timestamp'].notna().all()
+    assert nb.decode_typed_literals(typed)['literal_value'].tolist() == literals
+
+
+
+@pytest.mark.parametrize('name', ['excel2wprdf', 'json2wprdf'])
+def test_ints_outside_int64_stay_strings(notebook, name):
+    nb = notebook(name)
+    literals = [str(2**63), '123456789012345678901234567890', 'inf', '9007199254740993', 'x', '-40']
+    typed = nb.encode_typed_literals(wprdf_frame(['int'] * 6, literals))
+
+    assert typed['value_int'].notna().tolist() == [False, False, False, False, False, True]
+    assert nb.decode_typed_literals(typed)['literal_value'].tolist() == literals
+
+
+def test_json_big_integers(notebook):
+    nb = notebook('json2wprdf')
+    df = nb.json2wprdf(json.dumps({"a": 2**63}).encode(), 'u', 'a', typed=True)
+    assert df['value_string'].tolist() == [str(2**63)]
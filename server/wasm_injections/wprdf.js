@@ -6,6 +6,12 @@ const wprdf = {
     serverUrl: window.location.origin,
     _isReloading: false, // Flag to prevent detection during reload
     _footprint: null, // Browser footprint hash
+    // sql.js comes from the local package cache; the page falls back to the CDN when it is not populated
+    sqlJsBase: window.WPRDF_SQLJS_BASE || '/packages/sql.js/1.10.2/',
+    registryVersion: null, // Server registry version the local DB is up to date with
+    _events: null, // WebSocket to /api/notebooks/events
+    _eventsRetry: 1000,
+    _eventQueue: Promise.resolve(), // Applies events one at a time, in order
     
     async init() {
         if (this.initialized) return;
@@ -16,15 +22,18 @@ const wprdf = {
             this._footprint = await this.generateFootprint();
             console.log('Browser Footprint:', this._footprint);
             
-            // Initialize SQLite with CORRECT CDN URL
+            // Initialize SQLite from the same place sql-wasm.js was loaded from
             const SQL = await initSqlJs({
-                locateFile: file => `https://cdn.jsdelivr.net/npm/sql.js@1.10.2/dist/${file}`
+                locateFile: file => `${this.sqlJsBase}${file}`
             });
             
             const savedDb = localStorage.getItem('wprdf_codebase');
             if (savedDb) {
                 const arr = Uint8Array.from(atob(savedDb), c => c.charCodeAt(0));
                 this.db = new SQL.Database(arr);
+                this.createSchema();
+                const savedVersion = localStorage.getItem('wprdf_registry_version');
+                this.registryVersion = savedVersion !== null ? Number(savedVersion) : null;
             } else {
                 this.db = new SQL.Database();
                 this.createSchema();
@@ -39,6 +48,9 @@ const wprdf = {
                 await this.loadDefaultNotebooks();
             }
             
+            // Server pushes registry changes from here on; no polling
+            this.watchRegistry();
+            
             // Listen for messages from Marimo iframe
             window.addEventListener('message', this.handleMarimoMessage.bind(this));
             
@@ -196,36 +208,142 @@ const wprdf = {
             if (response.ok) {
                 const data = await response.json();
                 if (data.notebooks && data.notebooks.length > 0) {
-                    data.notebooks.forEach(nb => {
-                        // If force is true, we overwrite everything. 
-                        // Otherwise, we only update if the hash is different.
-                        if (force) {
-                            this.db.run(
-                                `INSERT OR REPLACE INTO notebooks (name, hash, code, updated_at) 
-                                 VALUES (?, ?, ?, CURRENT_TIMESTAMP)`,
-                                [nb.name, nb.hash, nb.code]
-                            );
-                        } else {
-                            this.db.run(
-                                `INSERT INTO notebooks (name, hash, code, updated_at) 
-                                 VALUES (?, ?, ?, CURRENT_TIMESTAMP)
-                                 ON CONFLICT(name) DO UPDATE SET 
-                                    hash = excluded.hash,
-                                    code = excluded.code,
-                                    updated_at = CURRENT_TIMESTAMP
-                                 WHERE hash != excluded.hash`,
-                                [nb.name, nb.hash, nb.code]
-                            );
-                        }
-                    });
-                    this.saveDB();
-                    this.showStatus(`Synced ${data.notebooks.length} notebooks from server`, 'success');
+                    const conflicts = this.storeNotebooks(data.notebooks, force);
+                    this.showStatus(`Synced ${data.notebooks.length - conflicts.length} notebooks from server`, 'success');
+                    this.reportConflicts(conflicts);
+                }
+                if (data.version !== undefined && data.version !== null) {
+                    this.setRegistryVersion(data.version);
                 }
             }
         } catch (e) {
             console.error('Failed to load default notebooks:', e);
         }
     },
+    
+    // server_hash is the hash last synced from the server. A notebook is only
+    // replaced while it still has that hash; local edits are kept and the
+    // newer server hash is parked in server_pending until the user decides.
+    // force overwrites regardless. Returns the names left in conflict.
+    storeNotebooks(notebooks, force = false) {
+        const conflicts = [];
+        notebooks.forEach(nb => {
+            const [hash, serverHash] = this.getNotebookSync(nb.name);
+            if (force || hash === null || hash === nb.hash || hash === serverHash) {
+                this.db.run(
+                    `INSERT INTO notebooks (name, hash, code, server_hash, updated_at) 
+                     VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                     ON CONFLICT(name) DO UPDATE SET 
+                        hash = excluded.hash,
+                        code = excluded.code,
+                        server_hash = excluded.server_hash,
+                        server_pending = NULL,
+                        updated_at = CASE WHEN hash != excluded.hash THEN CURRENT_TIMESTAMP ELSE updated_at END`,
+                    [nb.name, nb.hash, nb.code, nb.hash]
+                );
+            } else {
+                this.db.run("UPDATE notebooks SET server_pending = ? WHERE name = ?", [nb.hash, nb.name]);
+                conflicts.push(nb.name);
+            }
+        });
+        this.saveDB();
+        return conflicts;
+    },
+    
+    reportConflicts(conflicts) {
+        if (conflicts.length === 0) return;
+        this.showStatus(
+            `Kept local edits of ${conflicts.map(name => `"${name}"`).join(', ')}; ` +
+            'the server has a newer version (use "Take server" in the list to replace them)',
+            'error'
+        );
+    },
+    
+    async takeServerVersion(name) {
+        if (!confirm(`Replace your local edits of "${name}" with the server version?`)) return;
+        try {
+            await this.fetchNotebooks([name], true);
+        } catch (e) {
+            this.showStatus(e.message, 'error');
+        }
+    },
+    
+    setRegistryVersion(version) {
+        this.registryVersion = version;
+        localStorage.setItem('wprdf_registry_version', String(version));
+    },
+    
+    // Live registry updates: the server pushes (name, hash) change events and
+    // only notebooks whose hash differs locally are fetched. A reconnect sends
+    // the last registry version seen, so changes made while offline are
+    // replayed (or a full resync is requested if the server log is too short).
+    watchRegistry() {
+        const url = new URL('/api/notebooks/events', this.serverUrl);
+        url.protocol = url.protocol === 'https:' ? 'wss:' : 'ws:';
+        if (this.registryVersion !== null) {
+            url.searchParams.set('since', this.registryVersion);
+        }
+        
+        const socket = new WebSocket(url);
+        socket.onopen = () => { this._eventsRetry = 1000; };
+        socket.onmessage = (message) => {
+            const event = JSON.parse(message.data);
+            this._eventQueue = this._eventQueue
+                .then(() => this.applyRegistryEvent(event))
+                .catch(e => {
+                    // registryVersion was not advanced: reconnecting replays this event
+                    console.error('Failed to apply registry event:', e);
+                    socket.close();
+                });
+        };
+        socket.onclose = () => {
+            // Back off up to 30s; the next connection resumes from registryVersion
+            setTimeout(() => this.watchRegistry(), this._eventsRetry);
+            this._eventsRetry = Math.min(this._eventsRetry * 2, 30000);
+        };
+        this._events = socket;
+    },
+    
+    async applyRegistryEvent(event) {
+        if (event.type === 'resync') {
+            await this.loadDefaultNotebooks();
+        } else if (event.type === 'changes') {
+            // Skip notebooks already synced to (or already in conflict with) this hash
+            const stale = event.changes
+                .filter(change => {
+                    const [, serverHash, pending] = this.getNotebookSync(change.name);
+                    return serverHash !== change.hash && pending !== change.hash;
+                })
+                .map(change => change.name);
+            if (stale.length > 0) {
+                await this.fetchNotebooks(stale);
+            }
+        }
+        this.setRegistryVersion(event.version);
+    },
+    
+    // [hash, server_hash, server_pending] of a local notebook, nulls if absent
+    getNotebookSync(name) {
+        const result = this.db.exec("SELECT hash, server_hash, server_pending FROM notebooks WHERE name = ?", [name]);
+        return result[0] && result[0].values[0] ? result[0].values[0] : [null, null, null];
+    },
+    
+    async fetchNotebooks(names, force = false) {
+        const params = new URLSearchParams();
+        names.forEach(name => params.append('names', name));
+        const response = await fetch(`/api/notebooks?${params}`);
+        if (!response.ok) {
+            throw new Error(`Fetching changed notebooks failed: HTTP ${response.status}`);
+        }
+        const data = await response.json();
+        const conflicts = this.storeNotebooks(data.notebooks, force);
+        const updated = data.notebooks.map(nb => nb.name).filter(name => !conflicts.includes(name));
+        if (updated.length > 0) {
+            const current = updated.includes(this.currentNotebook) ? ` (including "${this.currentNotebook}", reload it to update)` : '';
+            this.showStatus(`Updated ${updated.length} notebook${updated.length !== 1 ? 's' : ''} from server${current}`, 'info');
+        }
+        this.reportConflicts(conflicts);
+    },
 
     createSchema() {
         if (!this.db) return;
@@ -238,6 +356,13 @@ const wprdf = {
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         `);
+        // Registry sync columns, added in place for databases created before them
+        const columns = this.db.exec("PRAGMA table_info(notebooks)")[0].values.map(column => column[1]);
+        ['server_hash', 'server_pending'].forEach(column => {
+            if (!columns.includes(column)) {
+                this.db.run(`ALTER TABLE notebooks ADD COLUMN ${column} TEXT`);
+            }
+        });
     },
     
     saveDB() {
@@ -271,7 +396,7 @@ const wprdf = {
     
     updateNotebookList() {
         if (!this.db) return;
-        const result = this.db.exec("SELECT name, hash FROM notebooks ORDER BY updated_at DESC");
+        const result = this.db.exec("SELECT name, hash, server_pending FROM notebooks ORDER BY updated_at DESC");
         const count = result[0] ? result[0].values.length : 0;
         
         document.getElementById('wprdf-count').textContent = `${count} notebook${count !== 1 ? 's' : ''}`;
@@ -293,7 +418,7 @@ const wprdf = {
         
         const search = document.getElementById('wprdf-search').value.toLowerCase();
         
-        result[0].values.forEach(([name, hash]) => {
+        result[0].values.forEach(([name, hash, pending]) => {
             if (search && !name.toLowerCase().includes(search)) return;
             
             const div = document.createElement('div');
@@ -302,8 +427,11 @@ const wprdf = {
             
             div.innerHTML = `
                 <div class="wprdf-notebook-name">${this.escapeHtml(name)}</div>
-                <div class="wprdf-notebook-hash">${hash.slice(0, 12)}</div>
+                <div class="wprdf-notebook-hash">${hash.slice(0, 12)}${pending ? ' ⚠️ edited locally, server has ' + pending.slice(0, 12) : ''}</div>
                 <div class="wprdf-notebook-actions">
+                    ${pending ? `<button class="wprdf-btn wprdf-btn-danger wprdf-btn-sm" onclick="wprdf.takeServerVersion('${this.escapeHtml(name)}'); event.stopPropagation();">
+                        Take server
+                    </button>` : ''}
                     <button class="wprdf-btn wprdf-btn-primary wprdf-btn-sm" onclick="wprdf.loadNotebook('${this.escapeHtml(name)}'); event.stopPropagation();">
                         ${this.currentNotebook === name ? '✓ Active' : 'Load'}
                     </button>
@@ -357,11 +485,20 @@ def __():
     import sys
     import marimo as mo
     
+    # Resolve micropip installs from the server's pinned package cache first
+    if "pyodide" in sys.modules:
+        try:
+            _micropip = sys.modules.get("micropip") or __import__("micropip")
+            _origin = (sys.modules.get("js") or __import__("js")).location.origin
+            _micropip.set_index_urls([f"{_origin}/packages/simple/{{package_name}}/", "https://pypi.org/pypi/{package_name}/json"])
+        except (ImportError, AttributeError):
+            pass
+    
     def wprdf_import(notebook_name, member_name=None):
         if "pyodide" not in sys.modules: return None
         types = sys.modules.get("types") or __import__("types")
         js = sys.modules.get("js") or __import__("js")
-        re = sys.modules.get("re") or __import__("re")
+        ast = sys.modules.get("ast") or __import__("ast")
         importlib_abc = sys.modules.get("importlib.abc") or __import__("importlib.abc").abc
         importlib_util = sys.modules.get("importlib.util") or __import__("importlib.util").util
         
@@ -369,13 +506,17 @@ def __():
             def __init__(self, name, code):
                 self.name, self.code = name, code
             def exec_module(self, module):
-                flat_code = self.code
-                if "app = marimo.App" in flat_code:
-                    bodies = re.findall(r'@app\\\\.cell(?:\\\\(.*?\\\\))?\\\\n(?:async )?def __\\\\(.*?\\\\):\\\\n(.*?)\\\\n\\\\s+return', flat_code, re.DOTALL)
-                    core_bodies = [b[2].replace("\\\\n    ", "\\\\n") for b in bodies 
-                                 if "micropip.install" not in b[2] and not any(x in b[2] for x in ["mo.md", "mo.vstack", "mo.ui"])]
-                    flat_code = "\\\\n\\\\n".join(core_bodies)
-                exec(flat_code, module.__dict__)
+                # Core Logic cells may import other notebooks in turn
+                module.__dict__.update(sys=sys, wprdf_import=wprdf_import)
+                code = self.code
+                if "app = marimo.App" in code:
+                    # Only the "Core Logic" cell bodies; infrastructure and UI cells are skipped
+                    body = []
+                    for node in ast.parse(code).body:
+                        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and "Core Logic" in (ast.get_source_segment(code, node) or ""):
+                            body.extend(node.body[:-1] if isinstance(node.body[-1], ast.Return) else node.body)
+                    code = compile(ast.Module(body=body, type_ignores=[]), self.name, "exec")
+                exec(code, module.__dict__)
 
         class WPRDFPathFinder(importlib_abc.MetaPathFinder):
             def find_spec(self, fullname, path, target=None):
@@ -507,8 +648,10 @@ if __name__ == "__main__":
         }
 
         const hash = await this.calculateHash(code);
+        // Upsert rather than replace so the registry sync columns survive
         this.db.run(
-            "INSERT OR REPLACE INTO notebooks (name, hash, code, updated_at) VALUES (?, ?, ?, CURRENT_TIMESTAMP)",
+            `INSERT INTO notebooks (name, hash, code, updated_at) VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+             ON CONFLICT(name) DO UPDATE SET hash = excluded.hash, code = excluded.code, updated_at = CURRENT_TIMESTAMP`,
             [this.currentNotebook, hash, code]
         );
         this.saveDB();
@@ -531,29 +674,60 @@ if __name__ == "__main__":
         if (!this.db) return;
         try {
             this.showStatus('Pushing to server...', 'info');
-            const result = this.db.exec("SELECT name, hash, code FROM notebooks");
-            if (!result[0]) {
+            const result = this.db.exec("SELECT COUNT(*) FROM notebooks");
+            if (!result[0] || result[0].values[0][0] === 0) {
                 this.showStatus('No notebooks to sync', 'info');
                 return;
             }
 
-            const notebooks = result[0].values.map(([name, hash, code]) => ({ name, hash, code }));
-            const response = await fetch('/api/notebooks/sync', {
+            // Chunked to stay below the argument limit of String.fromCharCode
+            const data = this.db.export();
+            let binary = '';
+            for (let i = 0; i < data.length; i += 0x8000) {
+                binary += String.fromCharCode.apply(null, data.subarray(i, i + 0x8000));
+            }
+            const response = await fetch('/api/sync/upload', {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ notebooks })
+                body: JSON.stringify({ db: btoa(binary) })
             });
 
-            if (response.ok) {
-                this.showStatus('Successfully synced to server', 'success');
-            } else {
+            if (!response.ok) {
                 this.showStatus('Sync failed: ' + response.statusText, 'error');
+                return;
+            }
+
+            // The server merges in a background job (202 + job id)
+            const { job_id } = await response.json();
+            const job = await this.waitForJob(job_id, (progress) => {
+                this.showStatus(`Merging on server... ${progress.done}/${progress.total}`, 'info');
+            });
+            if (job.status === 'succeeded') {
+                const warnings = job.result.warnings || [];
+                this.showStatus(
+                    `Successfully synced to server (${job.result.notebook_count} notebooks)` +
+                    (warnings.length ? ': ' + warnings.join('; ') : ''),
+                    'success'
+                );
+            } else {
+                this.showStatus('Sync failed: ' + job.error, 'error');
             }
         } catch (e) {
             this.showStatus('Sync error: ' + e.message, 'error');
         }
     },
 
+    async waitForJob(jobId, onProgress = null, interval = 500) {
+        while (true) {
+            const progress = await (await fetch(`/api/jobs/${jobId}/progress`)).json();
+            if (progress.status === 'succeeded' || progress.status === 'failed') {
+                return await (await fetch(`/api/jobs/${jobId}`)).json();
+            }
+            if (onProgress) onProgress(progress);
+            await new Promise(resolve => setTimeout(resolve, interval));
+        }
+    },
+
     async syncFromServer() {
         if (!this.db) return;
         await this.loadDefaultNotebooks(true);
@@ -588,6 +762,7 @@ if __name__ == "__main__":
     resetLocalDatabase() {
         if (!confirm("This will delete ALL local notebooks and reload defaults. Continue?")) return;
         localStorage.removeItem('wprdf_codebase');
+        localStorage.removeItem('wprdf_registry_version');
         window.location.reload();
     },
 
@@ -633,7 +808,7 @@ if __name__ == "__main__":
                         const arr = new Uint8Array(event.target.result);
                         // We need to ensure initSqlJs is available or use the existing one
                         initSqlJs({
-                            locateFile: file => `https://cdn.jsdelivr.net/npm/sql.js@1.10.2/dist/${file}`
+                            locateFile: file => `${this.sqlJsBase}${file}`
                         }).then(SQL => {
                             this.db = new SQL.Database(arr);
                             this.saveDB();
@@ -1,13 +1,22 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
 from pydantic import BaseModel
 import aiosqlite
+import asyncio
 import base64
+import binascii
+import collections
+import json
+import uuid
 from pathlib import Path
 import logging
 import os
+import re
+import io
+import hashlib
 import mimetypes
+import pyarrow as pa
 
 # Add proper MIME types for JavaScript
 mimetypes.add_type('application/javascript', '.js')
@@ -26,7 +35,35 @@ IS_DEV = os.getenv("ENV", "development") == "development"
 BASE_DIR = Path(__file__).parent.parent
 ROOT_DIR = BASE_DIR.parent
 DB_PATH = ROOT_DIR / "dev_data" / "notebooks.db"
+TERMS_DB_PATH = ROOT_DIR / "dev_data" / "terms.db"
+JOBS_DB_PATH = ROOT_DIR / "dev_data" / "jobs.db"
+JOBS_DIR = ROOT_DIR / "dev_data" / "jobs"
 WASM_DIR = BASE_DIR / "wasm_editor"
+PACKAGES_DIR = WASM_DIR / "packages"
+DATASETS_DIR = ROOT_DIR / "dev_data" / "datasets"
+
+ARROW_STREAM_MIME = "application/vnd.apache.arrow.stream"
+DATASET_NAME = re.compile(r"^[A-Za-z0-9_.-]+$")
+# Stay well below SQLite's bound-parameter limit
+SQL_BATCH = 500
+
+JOB_WORKERS = int(os.getenv("WPRDF_JOB_WORKERS", "2"))
+JOB_QUEUE_SIZE = int(os.getenv("WPRDF_JOB_QUEUE_SIZE", "32"))
+
+REGISTRY_CACHE_ENTRIES = int(os.getenv("WPRDF_CACHE_ENTRIES", "256"))
+REGISTRY_CACHE_BYTES = int(os.getenv("WPRDF_CACHE_BYTES", str(64 * 1024 * 1024)))
+
+# Registry change feed: how many versions of the change log are kept for
+# resuming clients, how often other processes' writes are looked for, and
+# how many undelivered events a slow subscriber may have before it is dropped
+REGISTRY_CHANGES_KEEP = int(os.getenv("WPRDF_CHANGES_KEEP", "10000"))
+REGISTRY_FEED_POLL = float(os.getenv("WPRDF_FEED_POLL", "1.0"))
+REGISTRY_FEED_QUEUE = int(os.getenv("WPRDF_FEED_QUEUE", "64"))
+
+# Cached packages live under versioned paths and never change in place; only
+# the lock files and the package index are revalidated
+PACKAGE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+PYPI_SIMPLE_JSON = "application/vnd.pypi.simple.v1+json"
 
 # Ensure wasm_editor exists
 if not WASM_DIR.exists():
@@ -34,6 +71,8 @@ if not WASM_DIR.exists():
     logger.warning("Run ./setup_marimo_wasm.sh to generate it")
 
 DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+DATASETS_DIR.mkdir(parents=True, exist_ok=True)
+JOBS_DIR.mkdir(parents=True, exist_ok=True)
 
 class SyncUpload(BaseModel):
     db: str
@@ -43,6 +82,18 @@ class SyncResult(BaseModel):
     notebook_count: int
     warnings: list[str] = []
 
+class JobAccepted(BaseModel):
+    job_id: str
+    status: str
+    status_url: str
+
+class TermEncode(BaseModel):
+    iris: list[str]
+    create: bool = True
+
+class TermDecode(BaseModel):
+    ids: list[int]
+
 async def init_db():
     """Initialize the database schema"""
     async with aiosqlite.connect(DB_PATH) as db:
@@ -55,91 +106,487 @@ async def init_db():
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
+        # Registry version: every write path (sync_upload, dev/populate_db.py)
+        # bumps it in the same transaction as its notebook writes
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS registry_meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+        """)
+        await db.execute("INSERT OR IGNORE INTO registry_meta (key, value) VALUES ('version', 0)")
+        # Change log: the (name, hash) of every notebook a write path touched,
+        # by registry version. changes_since is the oldest version a client
+        # can resume from; the log starts empty at the current version.
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS registry_changes (
+                version INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                hash TEXT NOT NULL
+            )
+        """)
+        await db.execute("CREATE INDEX IF NOT EXISTS registry_changes_version ON registry_changes (version)")
+        await db.execute("""
+            INSERT OR IGNORE INTO registry_meta (key, value)
+            SELECT 'changes_since', value FROM registry_meta WHERE key = 'version'
+        """)
+        await db.commit()
+    
+    # Term dictionary lives in its own file so /api/sync/download stays small
+    async with aiosqlite.connect(TERMS_DB_PATH) as db:
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS terms (
+                id INTEGER PRIMARY KEY,
+                iri TEXT NOT NULL UNIQUE
+            )
+        """)
+        await db.commit()
+    
+    async with aiosqlite.connect(JOBS_DB_PATH) as db:
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,
+                done INTEGER NOT NULL DEFAULT 0,
+                total INTEGER NOT NULL DEFAULT 0,
+                result TEXT,
+                error TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
         await db.commit()
 
+async def bump_registry_version(db, changes=()) -> int:
+    """
+    Increment the registry version and log the (name, hash) pairs written;
+    call inside the writing transaction. Returns the new version.
+    """
+    await db.execute("UPDATE registry_meta SET value = value + 1 WHERE key = 'version'")
+    async with db.execute("SELECT value FROM registry_meta WHERE key = 'version'") as cursor:
+        version = (await cursor.fetchone())[0]
+    await db.executemany(
+        "INSERT INTO registry_changes (version, name, hash) VALUES (?, ?, ?)",
+        [(version, name, hash) for name, hash in changes]
+    )
+    # Older clients get a resync instead of a replay
+    oldest = version - REGISTRY_CHANGES_KEEP
+    if oldest > 0:
+        await db.execute("DELETE FROM registry_changes WHERE version <= ?", (oldest,))
+        await db.execute(
+            "UPDATE registry_meta SET value = MAX(value, ?) WHERE key = 'changes_since'", (oldest,)
+        )
+    return version
+
+async def read_registry_version() -> int:
+    async with aiosqlite.connect(DB_PATH) as db:
+        try:
+            async with db.execute("SELECT value FROM registry_meta WHERE key = 'version'") as cursor:
+                row = await cursor.fetchone()
+        except aiosqlite.OperationalError:
+            # Registry created by an older populate_db.py, before versioning
+            return 0
+    return row[0] if row else 0
+
+async def read_registry_changes(since: int) -> tuple[int, list | None]:
+    """
+    Registry version and the latest hash of every notebook written after
+    version since, oldest first. The list is None when the change log does
+    not reach back to since (pruned, or the registry was reset).
+    """
+    async with aiosqlite.connect(DB_PATH) as db:
+        # One read transaction: the version and the log come from the same snapshot
+        await db.execute("BEGIN")
+        try:
+            async with db.execute("SELECT key, value FROM registry_meta") as cursor:
+                meta = dict(await cursor.fetchall())
+            version = meta.get("version", 0)
+            if "changes_since" not in meta or not meta["changes_since"] <= since <= version:
+                return version, None
+            # SQLite returns name/hash from the row holding MAX(version)
+            async with db.execute(
+                "SELECT name, hash, MAX(version) AS changed FROM registry_changes WHERE version > ? "
+                "GROUP BY name ORDER BY changed", (since,)
+            ) as cursor:
+                changes = [{"name": name, "hash": hash} for name, hash, _ in await cursor.fetchall()]
+        except aiosqlite.OperationalError:
+            # Registry created by an older populate_db.py, before the change log
+            return 0, None
+    return version, changes
+
+def db_file_signature(path: Path):
+    """Changes whenever SQLite commits to (or something replaces) the file"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+def estimate_size(value) -> int:
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_size(v) for v in value)
+    return 16
+
+class RegistryCache:
+    """
+    In-process LRU read-through cache for registry reads.
+
+    Entries are only valid for the registry version they were read at. A
+    stat() of the database file tells whether anything may have been written;
+    only then is the version re-read, and a new version (or a replaced file,
+    e.g. after dev/reset_db.sh) drops every entry. Hits never touch SQLite.
+    """
+
+    def __init__(self, path: Path, max_entries: int, max_bytes: int):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = collections.OrderedDict()
+        self.bytes = 0
+        self.version = None
+        self.signature = None
+
+    def file_signature(self):
+        return db_file_signature(self.path)
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+
+    def invalidate(self):
+        """Force a version check on the next read (used by in-process writers)"""
+        self.signature = None
+
+    async def validate(self):
+        signature = self.file_signature()
+        if signature is not None and signature == self.signature:
+            return
+        version = await read_registry_version() if signature is not None else None
+        replaced = signature is None or self.signature is None or signature[0] != self.signature[0]
+        if version != self.version or replaced:
+            self.clear()
+        self.version, self.signature = version, signature
+
+    async def get(self, key: str, loader):
+        await self.validate()
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return self.entries[key][0]
+        
+        version = self.version
+        value = await loader()
+        size = estimate_size(value)
+        # Don't cache a value read while a write moved the registry on
+        if self.version == version and self.file_signature() == self.signature and size <= self.max_bytes:
+            self.entries[key] = (value, size)
+            self.bytes += size
+            while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.bytes -= evicted_size
+        return value
+
+registry_cache = RegistryCache(DB_PATH, REGISTRY_CACHE_ENTRIES, REGISTRY_CACHE_BYTES)
+
+class RegistryFeed:
+    """
+    Pushes registry change events to WebSocket subscribers.
+
+    In-process writers call notify() after committing; commits by other
+    processes (dev/populate_db.py) are noticed by a stat() of the database
+    file every poll_interval seconds. Each event carries the new registry
+    version and the (name, hash) pairs written since the previous one.
+    Subscribers have bounded queues: one that falls behind gets None and is
+    dropped, and resumes from its last version when it reconnects.
+    """
+
+    def __init__(self, path: Path, poll_interval: float, queue_size: int):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self.subscribers: set[asyncio.Queue] = set()
+        self.version = None
+        self.signature = None
+        self.wakeup = asyncio.Event()
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self.subscribers.discard(queue)
+
+    def notify(self):
+        """Check for new changes now instead of at the next poll"""
+        self.wakeup.set()
+
+    async def publish(self):
+        signature = db_file_signature(self.path)
+        if signature == self.signature:
+            return
+        self.signature = signature
+        if signature is None:
+            return
+        if not self.subscribers:
+            self.version = await read_registry_version()
+            return
+        version, changes = await read_registry_changes(self.version)
+        if version == self.version:
+            return
+        self.version = version
+        if changes is None:
+            event = {"type": "resync", "version": version}
+        else:
+            event = {"type": "changes", "version": version, "changes": changes}
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.unsubscribe(queue)
+                queue.get_nowait()
+                queue.put_nowait(None)
+
+    async def run(self):
+        # Signature first: a commit in between is picked up by the first check
+        self.signature = db_file_signature(self.path)
+        self.version = await read_registry_version()
+        while True:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+            try:
+                await self.publish()
+            except Exception as e:
+                logger.error(f"Registry feed error: {e}")
+
+registry_feed = RegistryFeed(DB_PATH, REGISTRY_FEED_POLL, REGISTRY_FEED_QUEUE)
+registry_feed_task: asyncio.Task | None = None
+
+# Background jobs: heavy requests persist their input under JOBS_DIR, enqueue
+# the job id and return 202; a bounded pool of workers drains the queue.
+job_queue: asyncio.Queue | None = None
+job_workers: list[asyncio.Task] = []
+# Registry writes from concurrent jobs must not interleave (rename detection)
+registry_lock = asyncio.Lock()
+
+async def update_job(job_id: str, **fields):
+    assignments = ", ".join(f"{column} = ?" for column in fields)
+    async with aiosqlite.connect(JOBS_DB_PATH) as db:
+        await db.execute(
+            f"UPDATE jobs SET {assignments}, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+            (*fields.values(), job_id)
+        )
+        await db.commit()
+
+async def enqueue_job(kind: str, job_id: str) -> JobAccepted:
+    async with aiosqlite.connect(JOBS_DB_PATH) as db:
+        await db.execute(
+            "INSERT INTO jobs (id, kind, status) VALUES (?, ?, 'queued')", (job_id, kind)
+        )
+        await db.commit()
+    try:
+        job_queue.put_nowait(job_id)
+    except asyncio.QueueFull:
+        await update_job(job_id, status="failed", error="Job queue is full")
+        job_input_path(job_id).unlink(missing_ok=True)
+        raise HTTPException(503, "Server busy: job queue is full, retry later")
+    return JobAccepted(job_id=job_id, status="queued", status_url=f"/api/jobs/{job_id}")
+
+def job_input_path(job_id: str) -> Path:
+    return JOBS_DIR / f"{job_id}.input"
+
+async def job_worker():
+    while True:
+        job_id = await job_queue.get()
+        try:
+            async with aiosqlite.connect(JOBS_DB_PATH) as db:
+                async with db.execute("SELECT kind FROM jobs WHERE id = ?", (job_id,)) as cursor:
+                    row = await cursor.fetchone()
+            if row is None:
+                continue
+            await update_job(job_id, status="running")
+            try:
+                result = await JOB_HANDLERS[row[0]](job_id, job_input_path(job_id))
+                await update_job(job_id, status="succeeded", result=json.dumps(result))
+            except Exception as e:
+                logger.error(f"Job {job_id} ({row[0]}) failed: {e}")
+                await update_job(job_id, status="failed", error=str(e))
+            finally:
+                job_input_path(job_id).unlink(missing_ok=True)
+        except Exception as e:
+            logger.error(f"Job worker error on {job_id}: {e}")
+        finally:
+            job_queue.task_done()
+
+async def start_job_workers():
+    global job_queue
+    job_queue = asyncio.Queue(maxsize=JOB_QUEUE_SIZE)
+    
+    async with aiosqlite.connect(JOBS_DB_PATH) as db:
+        # A running job was cut off mid-write; re-running it could rename notebooks twice
+        await db.execute(
+            "UPDATE jobs SET status = 'failed', error = 'Interrupted by server restart', "
+            "updated_at = CURRENT_TIMESTAMP WHERE status = 'running'"
+        )
+        await db.commit()
+        async with db.execute("SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at") as cursor:
+            pending = [row[0] for row in await cursor.fetchall()]
+    
+    for job_id in pending:
+        if job_input_path(job_id).exists() and not job_queue.full():
+            job_queue.put_nowait(job_id)
+        else:
+            await update_job(job_id, status="failed", error="Job input lost on server restart")
+    
+    for _ in range(JOB_WORKERS):
+        job_workers.append(asyncio.create_task(job_worker()))
+
 @app.on_event("startup")
 async def startup():
+    global registry_feed_task
     await init_db()
+    await start_job_workers()
+    registry_feed_task = asyncio.create_task(registry_feed.run())
     logger.info("WPRDF Sync Server running")
     logger.info(f"Database: {DB_PATH}")
     if IS_DEV:
         logger.info("http://localhost:8080")
 
-@app.post("/api/sync/upload", response_model=SyncResult)
+@app.on_event("shutdown")
+async def shutdown():
+    for worker in job_workers:
+        worker.cancel()
+    if registry_feed_task is not None:
+        registry_feed_task.cancel()
+
+def write_job_input(path: Path, db_base64: str):
+    path.write_bytes(base64.b64decode(db_base64, validate=True))
+
+@app.post("/api/sync/upload", status_code=202, response_model=JobAccepted)
 async def sync_upload(data: SyncUpload):
-    """Upload and merge client database to server"""
+    """Queue a merge of the uploaded client database; poll the returned job for the SyncResult"""
+    job_id = uuid.uuid4().hex
+    try:
+        # Decoding and writing a large database would block the event loop
+        await asyncio.to_thread(write_job_input, job_input_path(job_id), data.db)
+    except binascii.Error as e:
+        raise HTTPException(400, f"Invalid base64 database: {str(e)}")
+    return await enqueue_job("sync_upload", job_id)
+
+async def run_sync_upload(job_id: str, client_db_path: Path) -> dict:
+    """Merge a client database into the server registry"""
     warnings = []
     
-    try:
-        client_db_bytes = base64.b64decode(data.db)
-        temp_client_db = DB_PATH.parent / f"temp_client_{os.getpid()}.db"
-        temp_client_db.write_bytes(client_db_bytes)
-        
-        try:
-            async with aiosqlite.connect(temp_client_db) as client_db:
-                async with client_db.execute(
-                    "SELECT name, hash, code FROM notebooks"
-                ) as cursor:
-                    client_notebooks = await cursor.fetchall()
+    async with aiosqlite.connect(client_db_path) as client_db:
+        async with client_db.execute(
+            "SELECT name, hash, code FROM notebooks"
+        ) as cursor:
+            client_notebooks = await cursor.fetchall()
+    await update_job(job_id, total=len(client_notebooks))
+    
+    async with registry_lock:
+        async with aiosqlite.connect(DB_PATH) as server_db:
+            async with server_db.execute("SELECT name, hash FROM notebooks") as cursor:
+                server_hashes = dict(await cursor.fetchall())
             
-            async with aiosqlite.connect(DB_PATH) as server_db:
-                for original_name, client_hash, code in client_notebooks:
-                    async with server_db.execute(
-                        "SELECT 1 FROM notebooks WHERE name = ? AND hash = ?", 
-                        (original_name, client_hash)
-                    ) as cursor:
-                        exact_match = await cursor.fetchone()
-                    
-                    if exact_match:
-                        continue
-                    
-                    async with server_db.execute(
-                        "SELECT hash FROM notebooks WHERE name = ?", (original_name,)
-                    ) as cursor:
-                        name_collision = await cursor.fetchone()
-                    
-                    if not name_collision:
-                        name = original_name
-                    else:
-                        index = 1
-                        while True:
-                            candidate_name = f"{original_name}_{index}"
-                            async with server_db.execute(
-                                "SELECT 1 FROM notebooks WHERE name = ?", (candidate_name,)
-                            ) as cursor:
-                                exists = await cursor.fetchone()
-                            
-                            if not exists:
-                                name = candidate_name
-                                break
-                            index += 1
-                        
-                        warnings.append(f"Renamed '{original_name}' to '{name}'")
-                    
-                    await server_db.execute(
-                        "INSERT INTO notebooks (name, hash, code, updated_at) VALUES (?, ?, ?, CURRENT_TIMESTAMP)",
-                        (name, client_hash, code)
-                    )
+            inserts = []
+            for done, (original_name, client_hash, code) in enumerate(client_notebooks):
+                if done % 100 == 0:
+                    await update_job(job_id, done=done)
                 
-                await server_db.commit()
-            
-            async with aiosqlite.connect(DB_PATH) as db:
-                async with db.execute("SELECT COUNT(*) FROM notebooks") as cursor:
-                    total_count = (await cursor.fetchone())[0]
+                if server_hashes.get(original_name) == client_hash:
+                    continue
+                
+                if original_name not in server_hashes:
+                    name = original_name
+                else:
+                    index = 1
+                    while f"{original_name}_{index}" in server_hashes:
+                        index += 1
+                    name = f"{original_name}_{index}"
+                    warnings.append(f"Renamed '{original_name}' to '{name}'")
+                
+                inserts.append((name, client_hash, code))
+                server_hashes[name] = client_hash
             
-            return SyncResult(
-                status="success",
-                notebook_count=total_count,
-                warnings=warnings
+            await server_db.executemany(
+                "INSERT INTO notebooks (name, hash, code, updated_at) VALUES (?, ?, ?, CURRENT_TIMESTAMP)",
+                inserts
             )
+            if inserts:
+                await bump_registry_version(server_db, [(name, hash) for name, hash, _ in inserts])
+            await server_db.commit()
+            registry_cache.invalidate()
+            registry_feed.notify()
             
-        finally:
-            if temp_client_db.exists():
-                temp_client_db.unlink()
+            async with server_db.execute("SELECT COUNT(*) FROM notebooks") as cursor:
+                total_count = (await cursor.fetchone())[0]
     
-    except Exception as e:
-        logger.error(f"Sync upload failed: {e}")
-        raise HTTPException(500, f"Sync failed: {str(e)}")
+    await update_job(job_id, done=len(client_notebooks))
+    return SyncResult(
+        status="success",
+        notebook_count=total_count,
+        warnings=warnings
+    ).model_dump()
+
+JOB_HANDLERS = {
+    "sync_upload": run_sync_upload,
+}
+
+def job_status(row) -> dict:
+    job_id, kind, status, done, total, result, error, created_at, updated_at = row
+    return {
+        "job_id": job_id,
+        "kind": kind,
+        "status": status,
+        "done": done,
+        "total": total,
+        "progress": done / total if total else (1.0 if status == "succeeded" else 0.0),
+        "result": json.loads(result) if result else None,
+        "error": error,
+        "created_at": created_at,
+        "updated_at": updated_at
+    }
+
+@app.get("/api/jobs")
+async def list_jobs(limit: int = 50):
+    """Most recent background jobs"""
+    async with aiosqlite.connect(JOBS_DB_PATH) as db:
+        async with db.execute(
+            "SELECT * FROM jobs ORDER BY created_at DESC, rowid DESC LIMIT ?", (limit,)
+        ) as cursor:
+            rows = await cursor.fetchall()
+    return {"jobs": [job_status(row) for row in rows]}
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status, progress and (once finished) result or error of a background job"""
+    async with aiosqlite.connect(JOBS_DB_PATH) as db:
+        async with db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)) as cursor:
+            row = await cursor.fetchone()
+    if row is None:
+        raise HTTPException(404, f"Job not found: {job_id}")
+    return job_status(row)
+
+@app.get("/api/jobs/{job_id}/progress")
+async def get_job_progress(job_id: str):
+    """Lightweight progress poll for a background job"""
+    async with aiosqlite.connect(JOBS_DB_PATH) as db:
+        async with db.execute(
+            "SELECT status, done, total FROM jobs WHERE id = ?", (job_id,)
+        ) as cursor:
+            row = await cursor.fetchone()
+    if row is None:
+        raise HTTPException(404, f"Job not found: {job_id}")
+    status, done, total = row
+    return {"status": status, "done": done, "total": total}
 
 @app.get("/api/sync/download")
 async def sync_download():
@@ -176,12 +623,16 @@ async def sync_download():
 @app.get("/api/template")
 async def get_template():
     """Get the notebook template from the database"""
-    try:
+    async def load_template():
         async with aiosqlite.connect(DB_PATH) as db:
             async with db.execute("SELECT code FROM notebooks WHERE name = 'template'") as cursor:
                 row = await cursor.fetchone()
-                if row:
-                    return {"code": row[0]}
+        return row[0] if row else None
+    
+    try:
+        code = await registry_cache.get("template", load_template)
+        if code is not None:
+            return {"code": code}
     except Exception as e:
         logger.error(f"Failed to fetch template from DB: {e}")
     
@@ -222,29 +673,300 @@ async def get_default_notebooks():
     if not DB_PATH.exists():
         return {"notebooks": []}
     
-    notebooks = []
-    async with aiosqlite.connect(DB_PATH) as db:
-        async with db.execute("SELECT name, hash, code FROM notebooks") as cursor:
-            async for row in cursor:
-                notebooks.append({
-                    "name": row[0],
-                    "hash": row[1],
-                    "code": row[2]
-                })
-    return {"notebooks": notebooks}
+    async def load_notebooks():
+        notebooks = []
+        async with aiosqlite.connect(DB_PATH) as db:
+            async with db.execute("SELECT name, hash, code FROM notebooks") as cursor:
+                async for row in cursor:
+                    notebooks.append({
+                        "name": row[0],
+                        "hash": row[1],
+                        "code": row[2]
+                    })
+        return notebooks
+    
+    notebooks = await registry_cache.get("notebooks", load_notebooks)
+    # The version the cached list was read at; clients resume the event feed from it
+    return {"notebooks": notebooks, "version": registry_cache.version}
+
+@app.get("/api/notebooks")
+async def get_notebooks(names: list[str] = Query(...)):
+    """Only the named notebooks, e.g. the ones a registry change event reported"""
+    def loader(name):
+        async def load_notebook():
+            async with aiosqlite.connect(DB_PATH) as db:
+                async with db.execute("SELECT name, hash, code FROM notebooks WHERE name = ?", (name,)) as cursor:
+                    row = await cursor.fetchone()
+            return {"name": row[0], "hash": row[1], "code": row[2]} if row else None
+        return load_notebook
+    
+    notebooks = [await registry_cache.get(f"notebook:{name}", loader(name)) for name in dict.fromkeys(names)]
+    return {"notebooks": [notebook for notebook in notebooks if notebook is not None]}
+
+@app.websocket("/api/notebooks/events")
+async def notebook_events(websocket: WebSocket, since: int | None = None):
+    """
+    Push channel for registry changes, instead of polling /api/notebooks/defaults.
+
+    Every message is {"type": "changes", "version": n, "changes": [{"name",
+    "hash"}, ...]} or {"type": "resync", "version": n}. The first one answers
+    ?since=<last version seen> with the notebooks written since then; resync
+    means the change log does not reach back that far (or no version was
+    given) and the client should fetch /api/notebooks/defaults again.
+    """
+    await websocket.accept()
+    # Subscribe before reading the snapshot so no commit falls in between
+    queue = registry_feed.subscribe()
+    
+    async def send_events():
+        if since is None:
+            version, changes = await read_registry_version(), None
+        else:
+            version, changes = await read_registry_changes(since)
+        if changes is None:
+            await websocket.send_json({"type": "resync", "version": version})
+        else:
+            await websocket.send_json({"type": "changes", "version": version, "changes": changes})
+        while True:
+            event = await queue.get()
+            if event is None:
+                await websocket.close(code=1013, reason="Too far behind, reconnect to resume")
+                return
+            # Events the snapshot already covered are skipped; a resync always goes out
+            if event["type"] == "resync" or event["version"] > version:
+                await websocket.send_json(event)
+                version = event["version"]
+    
+    async def receive_until_closed():
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+    
+    tasks = [asyncio.create_task(send_events()), asyncio.create_task(receive_until_closed())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if not task.cancelled() and task.exception() and not isinstance(task.exception(), WebSocketDisconnect):
+                logger.error(f"Registry event stream error: {task.exception()}")
+    finally:
+        for task in tasks:
+            task.cancel()
+        registry_feed.unsubscribe(queue)
+
+def dataset_path(name: str) -> Path:
+    if not DATASET_NAME.match(name) or name.startswith("."):
+        raise HTTPException(400, f"Invalid dataset name: {name}")
+    return DATASETS_DIR / f"{name}.arrows"
+
+def iter_file_chunks(path: Path, chunk_size: int = 1024 * 1024):
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            yield chunk
+
+def iter_ipc_slice(path: Path, offset: int, limit: int | None):
+    """Re-encode rows [offset, offset + limit) of a stored stream, one record batch at a time"""
+    with pa.memory_map(str(path)) as source:
+        reader = pa.ipc.open_stream(source)
+        sink = io.BytesIO()
+        writer = pa.ipc.new_stream(sink, reader.schema)
+        position = 0
+        for batch in reader:
+            start = max(offset - position, 0)
+            position += batch.num_rows
+            if start >= batch.num_rows:
+                continue
+            length = batch.num_rows - start if limit is None else min(batch.num_rows - start, limit)
+            writer.write_batch(batch.slice(start, length))
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+            if limit is not None:
+                limit -= length
+                if limit <= 0:
+                    break
+        writer.close()
+        yield sink.getvalue()
+
+def count_ipc_rows(path: Path) -> int:
+    """Validate an Arrow IPC stream without materializing it (zero-copy over the memory map)"""
+    rows = 0
+    with pa.memory_map(str(path)) as source:
+        reader = pa.ipc.open_stream(source)
+        for batch in reader:
+            rows += batch.num_rows
+    return rows
+
+@app.put("/api/datasets/{name}")
+async def upload_dataset(name: str, request: Request):
+    """Store a WPRDF dataset sent as an Arrow IPC stream"""
+    path = dataset_path(name)
+    # Unique per request so concurrent uploads of the same name don't share a file
+    temp_path = DATASETS_DIR / f".upload_{name}_{uuid.uuid4().hex}.arrows"
+    try:
+        # File I/O runs in worker threads to keep the event loop responsive
+        f = await asyncio.to_thread(open, temp_path, "wb")
+        try:
+            async for chunk in request.stream():
+                await asyncio.to_thread(f.write, chunk)
+        finally:
+            await asyncio.to_thread(f.close)
+        
+        rows = await asyncio.to_thread(count_ipc_rows, temp_path)
+        await asyncio.to_thread(temp_path.replace, path)
+        return {"name": name, "rows": rows, "bytes": path.stat().st_size}
+    
+    except pa.ArrowInvalid as e:
+        raise HTTPException(400, f"Invalid Arrow IPC stream: {str(e)}")
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+
+@app.get("/api/datasets")
+async def list_datasets():
+    """List stored WPRDF datasets"""
+    return {"datasets": [
+        {"name": path.stem, "bytes": path.stat().st_size}
+        for path in sorted(DATASETS_DIR.glob("*.arrows"))
+    ]}
+
+@app.get("/api/datasets/{name}")
+async def download_dataset(name: str, offset: int = 0, limit: int | None = None):
+    """
+    Stream a WPRDF dataset as Arrow IPC record batches.
+    
+    Without offset/limit the stored stream is sent as-is; with them only the
+    requested rows are re-encoded, so clients can page in large previews.
+    """
+    path = dataset_path(name)
+    if not path.exists():
+        raise HTTPException(404, f"Dataset not found: {name}")
+    
+    if offset == 0 and limit is None:
+        body = iter_file_chunks(path)
+    else:
+        body = iter_ipc_slice(path, max(offset, 0), limit)
+    return StreamingResponse(body, media_type=ARROW_STREAM_MIME)
+
+@app.delete("/api/datasets/{name}")
+async def delete_dataset(name: str):
+    """Delete a stored WPRDF dataset"""
+    path = dataset_path(name)
+    if not path.exists():
+        raise HTTPException(404, f"Dataset not found: {name}")
+    path.unlink()
+    return {"status": "deleted", "name": name}
+
+async def lookup_terms(db, key_column: str, value_column: str, keys: list) -> dict:
+    found = {}
+    for start in range(0, len(keys), SQL_BATCH):
+        chunk = keys[start:start + SQL_BATCH]
+        placeholders = ",".join("?" * len(chunk))
+        async with db.execute(
+            f"SELECT {key_column}, {value_column} FROM terms WHERE {key_column} IN ({placeholders})", chunk
+        ) as cursor:
+            found.update(await cursor.fetchall())
+    return found
+
+@app.post("/api/terms/encode")
+async def encode_terms(data: TermEncode):
+    """
+    Map IRIs to their int64 term ids.
+    
+    Unknown IRIs are assigned new ids when create is set, otherwise they map to null.
+    Ids are stable: an IRI keeps its id for the lifetime of the dictionary.
+    """
+    unique = list(dict.fromkeys(data.iris))
+    try:
+        async with aiosqlite.connect(TERMS_DB_PATH) as db:
+            if data.create:
+                await db.executemany(
+                    "INSERT OR IGNORE INTO terms (iri) VALUES (?)", [(iri,) for iri in unique]
+                )
+                await db.commit()
+            ids = await lookup_terms(db, "iri", "id", unique)
+    except Exception as e:
+        logger.error(f"Term encoding failed: {e}")
+        raise HTTPException(500, f"Term encoding failed: {str(e)}")
+    return {"ids": [ids.get(iri) for iri in data.iris]}
+
+@app.post("/api/terms/decode")
+async def decode_terms(data: TermDecode):
+    """Map int64 term ids back to IRIs (unknown ids map to null)"""
+    unique = list(dict.fromkeys(data.ids))
+    try:
+        async with aiosqlite.connect(TERMS_DB_PATH) as db:
+            iris = await lookup_terms(db, "id", "iri", unique)
+    except Exception as e:
+        logger.error(f"Term decoding failed: {e}")
+        raise HTTPException(500, f"Term decoding failed: {str(e)}")
+    return {"iris": [iris.get(term_id) for term_id in data.ids]}
+
+@app.get("/api/terms")
+async def term_stats():
+    """Size of the term dictionary"""
+    async with aiosqlite.connect(TERMS_DB_PATH) as db:
+        async with db.execute("SELECT COUNT(*), COALESCE(MAX(id), 0) FROM terms") as cursor:
+            count, max_id = await cursor.fetchone()
+    return {"term_count": count, "max_id": max_id}
 
 @app.get("/health")
 async def health():
     """Health check endpoint"""
-    async with aiosqlite.connect(DB_PATH) as db:
-        async with db.execute("SELECT COUNT(*) FROM notebooks") as cursor:
-            count = (await cursor.fetchone())[0]
+    async def load_count():
+        async with aiosqlite.connect(DB_PATH) as db:
+            async with db.execute("SELECT COUNT(*) FROM notebooks") as cursor:
+                return (await cursor.fetchone())[0]
+    
+    count = await registry_cache.get("notebook_count", load_count)
     return {
         "status": "ok",
         "mode": "development" if IS_DEV else "production",
-        "notebook_count": count
+        "notebook_count": count,
+        "registry_version": registry_cache.version
     }
 
+# ========================================
+# Local package cache (populated by setup_marimo_wasm.sh)
+# ========================================
+
+def normalize_project(name: str) -> str:
+    """PEP 503 project name normalization"""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+def sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+@app.get("/packages/simple/{project}/")
+async def package_index(project: str, request: Request):
+    """PEP 691 JSON simple index over the pinned wheels, used as micropip's first index"""
+    wheels_dir = PACKAGES_DIR / "wheels"
+    name = normalize_project(project)
+    wheels = sorted(
+        path for path in wheels_dir.glob("*.whl")
+        if normalize_project(path.name.split("-", 1)[0]) == name
+    ) if wheels_dir.exists() else []
+    if not wheels:
+        raise HTTPException(404, f"Package {project} is not in the local cache")
+
+    files = []
+    for path in wheels:
+        files.append({
+            "filename": path.name,
+            "url": f"{request.base_url}packages/wheels/{path.name}",
+            "hashes": {"sha256": await asyncio.to_thread(sha256_file, path)}
+        })
+    return JSONResponse(
+        {"meta": {"api-version": "1.0"}, "name": name, "files": files},
+        media_type=PYPI_SIMPLE_JSON,
+        headers={"Cache-Control": "no-cache"}
+    )
+
 # Custom StaticFiles class with proper MIME types
 class FixedStaticFiles(StaticFiles):
     async def get_response(self, path: str, scope):
@@ -266,6 +988,14 @@ class FixedStaticFiles(StaticFiles):
         
         return response
 
+class PackageStaticFiles(FixedStaticFiles):
+    async def get_response(self, path: str, scope):
+        response = await super().get_response(path, scope)
+        if response.status_code == 200:
+            # Lock files may change when pins change; everything else is immutable
+            response.headers['cache-control'] = 'no-cache' if path.endswith('.json') else PACKAGE_CACHE_CONTROL
+        return response
+
 # Mount static directories
 if WASM_DIR.exists():
     marimo_dir = WASM_DIR / "marimo"
@@ -282,6 +1012,10 @@ if WASM_DIR.exists():
         if assets_dir.exists():
             app.mount("/assets", FixedStaticFiles(directory=assets_dir), name="assets")
     
+    # Serve the local package cache (Pyodide, wheels, sql.js)
+    if PACKAGES_DIR.exists():
+        app.mount("/packages", PackageStaticFiles(directory=PACKAGES_DIR), name="packages")
+    
     # Serve wprdf static files
     wprdf_dir = WASM_DIR / "wprdf"
     if wprdf_dir.exists():
@@ -302,5 +1036,7 @@ else:
             "message": "Run ./setup_marimo_wasm.sh to generate the editor",
             "health": "/health",
             "sync_upload": "/api/sync/upload",
-            "sync_download": "/api/sync/download"
+            "jobs": "/api/jobs",
+            "sync_download": "/api/sync/download",
+            "notebook_events": "/api/notebooks/events"
         }
\ No newline at end of file